@@ -0,0 +1,58 @@
+"""
+Size and speed benchmark of the players file formats.
+
+Writes synthetic players.json records in every registered format (see
+pybet/helpers/Serializers.py) to a temporary directory and measures:
+    - the file size;
+    - the time to write it (FileManager.write_file);
+    - the time to load it whole (FileManager.read_file_serialized);
+    - the time to stream it record by record (FileManager.iter_file_serialized).
+Every format is checked to load back exactly the records written. Run from
+the project root:
+
+    python -m benchmarks.bench_player_formats                # 200,000 players
+    python -m benchmarks.bench_player_formats --size 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable
+
+from benchmarks.bench_player_memory import make_records
+from pybet.helpers.FileManager import FileManager
+from pybet.helpers.Serializers import SERIALIZERS
+
+
+def timed(func: Callable[[], Any]) -> tuple:
+    """Runs func once and returns (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=200_000, help="number of players (default 200,000)")
+    args = parser.parse_args()
+
+    records = make_records(args.size)
+    print(f"\n{args.size:,} players")
+    print(f"  {'format':<14} {'size':>10} {'B/player':>9} {'write':>8} {'load':>8} {'stream':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, serializer in SERIALIZERS.items():
+            path = os.path.join(directory, "players" + serializer.suffix)
+            result, write = timed(lambda: FileManager.write_file(path, records, serializer=name))
+            assert result.ok, result.error
+            result, load = timed(lambda: FileManager.read_file_serialized(path, name))
+            assert result.ok and result.data == records, f"{name} does not round-trip"
+            count, stream = timed(lambda: sum(1 for _ in FileManager.iter_file_serialized(path, name)))
+            assert count == len(records)
+            size = os.path.getsize(path)
+            print(f"  {name:<14} {size / 2**20:7.1f} MiB {size / args.size:9.1f} "
+                  f"{write:7.2f}s {load:7.2f}s {stream:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
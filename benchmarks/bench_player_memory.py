@@ -0,0 +1,88 @@
+"""
+Memory benchmark of the in-memory player representations.
+
+Builds synthetic players.json records and measures, with tracemalloc, the
+memory retained once the raw records are dropped by:
+    - a list of Player objects (what DataPersistence.load_all_players returns);
+    - a columnar PlayerTable (DataPersistence.load_player_table).
+Run from the project root:
+
+    python -m benchmarks.bench_player_memory                # 1,000,000 players
+    python -m benchmarks.bench_player_memory --size 100000
+"""
+
+import argparse
+import datetime
+import gc
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from pybet.models.Player import Player
+from pybet.models.PlayerTable import PlayerTable
+
+FIRST_NAMES = ["Ana", "Luis", "María", "José", "Carlos", "Lucía", "Pedro", "Sofía", "Diego", "Valentina"]
+GAMES = ["Tragamonedas", "Ruleta", "Blackjack", "Dados"]
+
+
+def make_records(size: int, seed: int = 42) -> Dict[str, Dict[str, Any]]:
+    """Builds `size` player records as they are parsed from players.json."""
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    records = {}
+    for i in range(size):
+        player_id = f"P{i:07d}"
+        records[player_id] = {
+            "id": player_id,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.randint(1, 500)}",
+            "account_balance": round(rng.uniform(0, 10_000), 2),
+            "created_at": (start + datetime.timedelta(seconds=rng.randint(0, 30_000_000),
+                                                      microseconds=rng.randint(0, 999_999))).isoformat(),
+            "history": [f"{rng.choice(GAMES)}: {rng.choice(['won', 'lost'])} {rng.randint(1, 100)}"
+                        for _ in range(rng.randint(0, 10))],
+        }
+    return records
+
+
+def measure(label: str, size: int, build: Callable[[Dict[str, Dict[str, Any]]], Any]) -> None:
+    """
+    Generates the records, builds a representation from them, drops the records
+    and prints the memory still held by the representation (strings and history
+    lists included).
+    """
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    records = make_records(size)
+    start = time.perf_counter()
+    built = build(records)
+    elapsed = time.perf_counter() - start
+    del records
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    print(f"  {label:<16} {retained / 2**20:10.1f} MiB  {retained / size:8.1f} B/player  build {elapsed:7.2f} s")
+    del built
+
+
+def as_players(records: Dict[str, Dict[str, Any]]) -> List[Player]:
+    return [Player.from_dict(record) for record in records.values()]
+
+
+def as_table(records: Dict[str, Dict[str, Any]]) -> PlayerTable:
+    return PlayerTable.from_records(records.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000, help="number of players (default 1,000,000)")
+    args = parser.parse_args()
+
+    print(f"\n{args.size:,} players")
+    measure("List[Player]", args.size, as_players)
+    measure("PlayerTable", args.size, as_table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark of the Algorithms sorts against the built-in sorted().
+
+Sorts synthetic player-like records by balance (integer cents) with a key
+function, ascending and descending. The quadratic sorts are only run on a small
+sample. Run from the project root:
+
+    python -m benchmarks.bench_sorting                # 1,000,000 records
+    python -m benchmarks.bench_sorting --size 100000
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from pybet.logic.Algorithms import Algorithms
+
+QUADRATIC_SAMPLE = 2_000
+
+
+def make_records(size: int, seed: int = 42) -> List[dict]:
+    """Builds `size` records with a random balance in cents (0 to 10,000,000)."""
+    rng = random.Random(seed)
+    return [{"id": f"P{i:07d}", "cents": rng.randint(0, 10_000_000)} for i in range(size)]
+
+
+def timed(label: str, func: Callable[[], List[dict]], expected: List[dict]) -> None:
+    """Runs func once, checks the result against `expected` and prints the elapsed time."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    status = "ok" if result == expected else "MISMATCH"
+    print(f"  {label:<32} {elapsed:9.3f} s  [{status}]")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000, help="number of records (default 1,000,000)")
+    args = parser.parse_args()
+
+    records = make_records(args.size)
+    key = lambda r: r["cents"]
+
+    for reverse in (False, True):
+        print(f"\n{args.size:,} records, reverse={reverse}")
+        expected = sorted(records, key=key, reverse=reverse)
+        timed("sorted()", lambda: sorted(records, key=key, reverse=reverse), expected)
+        timed("RadixSort", lambda: Algorithms.RadixSort(records, key=key, reverse=reverse), expected)
+        timed("MergeSortBottomUp", lambda: Algorithms.MergeSortBottomUp(records, key=key, reverse=reverse), expected)
+        timed("MergeSort", lambda: Algorithms.MergeSort(records, key=key, reverse=reverse), expected)
+        copy = records.copy()
+        timed("MergeSortBottomUp (in_place)",
+              lambda: Algorithms.MergeSortBottomUp(copy, key=key, reverse=reverse, in_place=True), expected)
+
+    sample = records[:QUADRATIC_SAMPLE]
+    expected = sorted(sample, key=key)
+    print(f"\n{len(sample):,} records (quadratic sorts)")
+    timed("sorted()", lambda: sorted(sample, key=key), expected)
+    timed("InsertionSort", lambda: Algorithms.InsertionSort(sample, key=key), expected)
+    timed("BubbleSort", lambda: Algorithms.BubbleSort(sample, key=key), expected)
+
+
+if __name__ == "__main__":
+    main()
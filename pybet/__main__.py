@@ -0,0 +1,21 @@
+"""
+Entry point for `python -m pybet`.
+
+Creates the logs and data directories (as run.py does) and hands over to the
+command line interface; without arguments the interactive menus are started.
+"""
+
+import sys
+from pathlib import Path
+
+Path("./pybet/logs").mkdir(parents=True, exist_ok=True)
+Path("./pybet/logs/log.log").touch(exist_ok=True)
+Path("./pybet/data").mkdir(parents=True, exist_ok=True)
+for fname, initial_content in [("players.json", "{}"), ("queue.json", "[]")]:
+    fpath = Path(f"./pybet/data/{fname}")
+    if not fpath.exists():
+        fpath.write_text(initial_content, encoding="utf-8")
+
+from pybet.cli import main
+
+sys.exit(main())
@@ -0,0 +1,378 @@
+"""
+Non-interactive command line interface for the PyBet application.
+
+Meant for cron and batch jobs: reports are computed with the single-pass
+ReportEngine and streamed to files without going through the menus.
+
+Usage:
+    python -m pybet                                   # interactive menus
+    python -m pybet report top_balances --format csv --top 100 --no-render
+    python -m pybet report history --player ABC123 --format json
+    python -m pybet report all --format jsonl --gzip --no-render
+    python -m pybet report loss_counts --force        # ignore the report cache
+    python -m pybet reshard 8                         # split the players into 8 files
+    python -m pybet convert binary                    # store the players in the compact binary format
+    python -m pybet rebuild-balances                  # recover the balance slot map
+    python -m pybet balance-at 2024-05-01T22:00 --player ABC123
+    python -m pybet audit-balances                    # check the balance journal
+    python -m pybet archived-history ABC123 --since 2024-05-01 --until 2024-05-31T23:59
+    python -m pybet events --from 0 --type balance_changed   # print the change events (JSON lines)
+    python -m pybet events --consumer leaderboard            # only events new to this consumer
+
+Exit status:
+    0  every requested report was generated (or the maintenance command succeeded).
+    1  a report failed (players could not be loaded, write error, unknown player)
+       or resharding / converting / rebuilding the balances failed, the balance
+       journal does not cover the requested time, the audit found a problem, or
+       the event log could not be read.
+    2  invalid command line arguments.
+"""
+
+import argparse
+import datetime
+import json
+import sys
+from functools import partial
+from typing import List, Optional
+
+from pybet.helpers.EarningsTracker import EarningsTracker
+from pybet.logic.ReportCache import ReportCache
+from pybet.logic.ReportEngine import (
+    REPORTS_DIR,
+    ReportAggregator,
+    TopBalancesAggregator,
+    EarningsRankingAggregator,
+    PlayerHistoryAggregator,
+    AllHistoriesAggregator,
+    LossCountsAggregator,
+    GameParticipationAggregator,
+)
+from pybet.helpers.Serializers import SERIALIZERS
+from pybet.models.DataPersistence import DataPersistence
+from pybet.models.EventBus import EventBus
+from pybet.models.EventLog import EVENT_TYPES
+from pybet.models.OperationResult import OperationResult
+from pybet.models.PlayerManager import PlayerManager
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+
+REPORT_NAMES: List[str] = [
+    'top_balances', 'earnings_ranking', 'history', 'loss_counts', 'game_participation', 'all',
+]
+FORMATS: List[str] = ['json', 'jsonl', 'csv']
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser for `python -m pybet`.
+    """
+    parser = argparse.ArgumentParser(prog='python -m pybet', description='PyBet casino management.')
+    commands = parser.add_subparsers(dest='command')
+
+    report = commands.add_parser('report', help='generate a report without the interactive menus')
+    report.add_argument('name', choices=REPORT_NAMES, help='report to generate ("all" runs every report in one scan)')
+    report.add_argument('--format', dest='formats', action='append', choices=FORMATS,
+                        help='output format; repeat for several (default: json and csv)')
+    report.add_argument('--top', type=int, default=None, metavar='N', help='keep only the first N rows of each report')
+    report.add_argument('--player', default=None, help='player ID (required for the "history" report)')
+    report.add_argument('--output-dir', default=REPORTS_DIR, help=f'directory for the exported files (default: {REPORTS_DIR})')
+    report.add_argument('--gzip', action='store_true', help='gzip the exported files')
+    report.add_argument('--no-render', action='store_true', help='do not print the first page of each report table')
+    report.add_argument('--force', action='store_true', help='regenerate even if the data has not changed')
+
+    reshard = commands.add_parser('reshard', help='change the number of player storage files (run while PyBet is not in use)')
+    reshard.add_argument('shards', type=int, help='number of shard files (1 = a single players.json)')
+
+    convert = commands.add_parser('convert', help='change the format of the player storage files (run while PyBet is not in use)')
+    convert.add_argument('storage_format', choices=list(SERIALIZERS), metavar='FORMAT',
+                         help=f'one of: {", ".join(SERIALIZERS)} (default json is indented)')
+
+    balances = commands.add_parser('rebuild-balances', help='rebuild the balance slot map from players.json')
+    balances.add_argument('--reset', action='store_true',
+                          help='also reset every balance to the last value saved in players.json')
+
+    balance_at = commands.add_parser('balance-at', help='show balances at a past time, from the balance journal')
+    balance_at.add_argument('when', type=datetime.datetime.fromisoformat,
+                            help='local time, e.g. 2024-05-01T22:00')
+    balance_at.add_argument('--player', default=None, help='only this player ID (default: every player)')
+
+    commands.add_parser('audit-balances', help='check the balance journal against the balances and earnings')
+
+    archived = commands.add_parser('archived-history', help="print a player's complete history from the history archive")
+    archived.add_argument('player', help='player ID')
+    archived.add_argument('--since', type=datetime.datetime.fromisoformat, default=None, help='local time, e.g. 2024-05-01')
+    archived.add_argument('--until', type=datetime.datetime.fromisoformat, default=None, help='local time, e.g. 2024-05-31T23:59')
+
+    events = commands.add_parser('events', help='print change events from the event log, one JSON object per line')
+    events.add_argument('--from', dest='offset', type=int, default=0, metavar='OFFSET',
+                        help='first offset to print (default 0; ignored with --consumer)')
+    events.add_argument('--consumer', default=None,
+                        help='print the events after the offset of this consumer and advance it')
+    events.add_argument('--type', dest='types', action='append', choices=EVENT_TYPES,
+                        help='only this event type; repeat for several (default: all)')
+    events.add_argument('--limit', type=int, default=None, metavar='N', help='read at most N events')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the CLI.
+
+    Args:
+        argv (Optional[List[str]]): Arguments (defaults to sys.argv[1:]).
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        from pybet.main import main as interactive_main
+        interactive_main()
+        return EXIT_OK
+    if args.command == 'reshard':
+        return run_reshard(args)
+    if args.command == 'convert':
+        return run_convert(args)
+    if args.command == 'rebuild-balances':
+        return run_rebuild_balances(args)
+    if args.command == 'balance-at':
+        return run_balance_at(args)
+    if args.command == 'audit-balances':
+        return run_audit_balances(args)
+    if args.command == 'archived-history':
+        return run_archived_history(args)
+    if args.command == 'events':
+        return run_events(args)
+    return run_report(args)
+
+
+def run_reshard(args: argparse.Namespace) -> int:
+    """
+    Redistributes the players into the requested number of shard files.
+
+    Returns:
+        int: Process exit status.
+    """
+    if args.shards < 1:
+        _error('the number of shards must be at least 1.')
+        return EXIT_USAGE
+
+    before = DataPersistence.shard_count()
+    res: OperationResult = DataPersistence.reshard(args.shards)
+    if not res.ok:
+        _error(res.error)
+        return EXIT_FAILURE
+    print(f"{res.data} players: {before} → {args.shards} shard(s) ({', '.join(DataPersistence.shard_paths())})")
+    return EXIT_OK
+
+
+def run_convert(args: argparse.Namespace) -> int:
+    """
+    Rewrites the player files in another format, keeping the shard count.
+
+    Returns:
+        int: Process exit status.
+    """
+    before = DataPersistence.storage_format()
+    res: OperationResult = DataPersistence.reshard(DataPersistence.shard_count(), args.storage_format)
+    if not res.ok:
+        _error(res.error)
+        return EXIT_FAILURE
+    print(f"{res.data} players: {before} → {args.storage_format} ({', '.join(DataPersistence.shard_paths())})")
+    return EXIT_OK
+
+
+def run_rebuild_balances(args: argparse.Namespace) -> int:
+    """
+    Rebuilds the balance ledger's slot map (and, with --reset, its balances) from players.json.
+
+    Returns:
+        int: Process exit status.
+    """
+    res: OperationResult = DataPersistence.rebuild_balances(reset=args.reset)
+    if not res.ok:
+        _error(res.error)
+        return EXIT_FAILURE
+    print(f"Balance slots rebuilt ({res.data} player(s) given a new slot"
+          f"{', balances reset from players.json' if args.reset else ''}).")
+    return EXIT_OK
+
+
+def run_balance_at(args: argparse.Namespace) -> int:
+    """
+    Prints the balance of one player (or of every player) at a past time.
+
+    Returns:
+        int: Process exit status.
+    """
+    if args.player:
+        res: OperationResult = DataPersistence.balance_at(args.player, args.when)
+        if not res.ok:
+            _error(res.error)
+            return EXIT_FAILURE
+        if res.data is None:
+            print(f"{args.player}: no account at {args.when.isoformat()}")
+        else:
+            print(f"{args.player}: {res.data:.2f}")
+        return EXIT_OK
+
+    res = DataPersistence.balances_at(args.when)
+    if not res.ok:
+        _error(res.error)
+        return EXIT_FAILURE
+    for player_id, balance in sorted(res.data.items()):
+        print(f"{player_id}: {balance:.2f}")
+    print(f"{len(res.data)} player(s), total {sum(res.data.values()):.2f}")
+    return EXIT_OK
+
+
+def run_audit_balances(args: argparse.Namespace) -> int:
+    """
+    Audits the balance journal and prints what does not match.
+
+    Returns:
+        int: Process exit status (EXIT_FAILURE if the audit found a problem).
+    """
+    res: OperationResult = DataPersistence.audit_balances()
+    if not res.ok:
+        _error(res.error)
+        return EXIT_FAILURE
+    report = res.data
+    print(f"{report['entries']} journal entries checked.")
+    for number in report['broken']:
+        print(f"  entry {number}: previous balance plus amount does not give its balance")
+    for player_id, (journal, current) in sorted(report['balance_drift'].items()):
+        print(f"  {player_id}: balance {current:.2f}, journal says {journal:.2f}")
+    for player_id, (bets, earnings) in sorted(report['earnings_drift'].items()):
+        print(f"  {player_id}: earnings total {earnings:.2f}, journal bets add up to {bets:.2f}")
+    for account, total in sorted(report['accounts'].items()):
+        print(f"  account {account}: {total:.2f}")
+    # Earnings recorded before the journal started are expected to differ
+    return EXIT_FAILURE if report['broken'] or report['balance_drift'] else EXIT_OK
+
+
+def run_archived_history(args: argparse.Namespace) -> int:
+    """
+    Prints a player's archived history entries, oldest first.
+
+    Returns:
+        int: Process exit status.
+    """
+    res: OperationResult = DataPersistence.history_entries(args.player, args.since, args.until)
+    if not res.ok:
+        _error(res.error)
+        return EXIT_FAILURE
+    for item in res.data:
+        print(f"{item['at']}  {item['entry']}")
+    print(f"{len(res.data)} entr{'y' if len(res.data) == 1 else 'ies'}")
+    return EXIT_OK
+
+
+def run_events(args: argparse.Namespace) -> int:
+    """
+    Prints events from the event log as JSON lines, from an offset or from
+    where a consumer left off (advancing its offset).
+
+    Returns:
+        int: Process exit status.
+    """
+    def show(event: dict) -> None:
+        print(json.dumps(event, ensure_ascii=False))
+
+    if args.consumer is not None:
+        res: OperationResult = EventBus.consume(args.consumer, show, args.types, args.limit)
+        if not res.ok:
+            _error(res.error)
+            return EXIT_FAILURE
+        return EXIT_OK
+    try:
+        for event in EventBus.read(args.offset, args.types, args.limit):
+            show(event)
+    except (OSError, ValueError) as e:
+        _error(f"Error reading events: {e}")
+        return EXIT_FAILURE
+    return EXIT_OK
+
+
+def run_report(args: argparse.Namespace) -> int:
+    """
+    Generates the report(s) selected by the parsed arguments.
+
+    Returns:
+        int: Process exit status.
+    """
+    if args.top is not None and args.top < 0:
+        _error('--top must be zero or positive.')
+        return EXIT_USAGE
+    if args.name == 'history' and not args.player:
+        _error('the "history" report requires --player.')
+        return EXIT_USAGE
+
+    aggregators = _build_aggregators(args.name, args.top, args.player)
+    if args.top is not None:
+        for aggregator in aggregators:
+            aggregator.limit = args.top
+
+    formats = tuple(args.formats or ['json', 'csv'])
+    # Every report reads the same pinned state, while games keep saving
+    snapshot_res: OperationResult = PlayerManager().snapshot()
+    if not snapshot_res.ok:
+        _error(snapshot_res.error)
+        return EXIT_FAILURE
+    with snapshot_res.data as snapshot:
+        res: OperationResult = ReportCache(args.output_dir).generate(
+            partial(snapshot.iter_players, lazy=True), aggregators, formats=formats, compress=args.gzip,
+            force=args.force, snapshot=snapshot
+        )
+    if not res.ok:
+        _error(res.error)
+        return EXIT_FAILURE
+
+    status = EXIT_OK
+    for result in res.data:
+        if not result.paths:
+            _error(f"Player ID '{result.aggregator.player_id}' not found.")
+            status = EXIT_FAILURE
+            continue
+        if not args.no_render:
+            # Imported here so that --no-render runs never load Rich
+            from pybet.menus.ReportsMenu import render_report
+            render_report(result, interactive=False)
+        print(f"{result.name}: {len(result)} rows ({result.status}) → {', '.join(result.paths)}")
+    return status
+
+
+def _build_aggregators(name: str, top: Optional[int], player_id: Optional[str]) -> List[ReportAggregator]:
+    """
+    Maps a report name to the aggregators that produce it.
+    """
+    if name == 'top_balances':
+        return [TopBalancesAggregator(top)]
+    if name == 'earnings_ranking':
+        return [EarningsRankingAggregator(EarningsTracker.get_all_earnings())]
+    if name == 'history':
+        return [PlayerHistoryAggregator(player_id)]
+    if name == 'loss_counts':
+        return [LossCountsAggregator()]
+    if name == 'game_participation':
+        return [GameParticipationAggregator()]
+
+    aggregators: List[ReportAggregator] = [
+        TopBalancesAggregator(top),
+        LossCountsAggregator(),
+        GameParticipationAggregator(),
+        AllHistoriesAggregator(),
+    ]
+    earnings = EarningsTracker.get_all_earnings()
+    if earnings:
+        aggregators.append(EarningsRankingAggregator(earnings))
+    return aggregators
+
+
+def _error(message: str) -> None:
+    """Prints an error message to stderr."""
+    print(f"error: {message}", file=sys.stderr)
@@ -20,12 +20,12 @@ Steps:
     - If guess == secret → award = 4×bet, break and win.
     - If guess ≠ secret and attempts remain → inform higher or lower.
 6. If user did not guess in X attempts → they lose the bet.
-7. Update balance accordingly, record a descriptive string in PlayerHistory, display result.
+7. Update balance accordingly, record a descriptive string in the player's history, display result.
 
 Docstring tags:
     - Manager: PlayerManager instance
     - OperationResult: for reading/updating JSON
-    - PlayerHistory: to push a descriptive string
+    - PlayerSession: to update balance and history in one write
 """
 
 import random
@@ -36,7 +36,6 @@ from rich.text import Text
 
 from pybet.models.PlayerManager import PlayerManager
 from pybet.models.OperationResult import OperationResult
-from pybet.logic.PlayerHistory import PlayerHistory
 
 # Add this import to enable earning history tracking
 from pybet.helpers.EarningsTracker import EarningsTracker
@@ -90,7 +89,7 @@ def play_guessing(manager: PlayerManager) -> None:
             c. If guess < secret → print “Más alto.”
             If guess > secret → print “Más bajo.”
         6. If user never guessed in X attempts → they lose (reward = –bet).
-        7. Update player balance and record one descriptive string in PlayerHistory:
+        7. Update player balance and record one descriptive string in the history (one session commit):
             e.g. “Adivinanzas: Range=1–N, bet=B, secret=S, outcome=won/lost, balance=…”
         8. Print final result.
 
@@ -99,7 +98,8 @@ def play_guessing(manager: PlayerManager) -> None:
     """
     console.print("[bold cyan]=== Adivinanzas (Guessing Game) ===[/bold cyan]")
     player_id = console.input("[yellow]ID de jugador:[/yellow] ").strip()
-    get_res: OperationResult = manager.get_player_by_id(player_id)
+    session = manager.session()
+    get_res: OperationResult = session.get(player_id)
     if not get_res.ok:
         console.print(f"[red]Error:[/] {get_res.error}")
         return
@@ -183,18 +183,14 @@ def play_guessing(manager: PlayerManager) -> None:
 
     result_str = f"Adivinanzas: Rango 1–{N}, apostó {bet}, {outcome_str}"
 
-    # Update the player’s balance in JSON
-    upd_res: OperationResult = manager.update_player(player_id, None, new_balance)
-    if not upd_res.ok:
-        console.print(f"[red]Error al actualizar balance:[/] {upd_res.error}")
+    # Update balance and record in player's history, in one write
+    player.account_balance = new_balance
+    player.history.append(result_str)
+    commit_res: OperationResult = session.commit(game="Adivinanzas")
+    if not commit_res.ok:
+        console.print(f"[red]Error al guardar la jugada:[/] {commit_res.error}")
         return
 
-    # Record in player's history
-    hist = PlayerHistory(player_id)
-    push_res: OperationResult = hist.push(result_str)
-    if not push_res.ok:
-        console.print(f"[red]Error al registrar historial:[/] {push_res.error}")
-
     # to update earnings history
     EarningsTracker.update_earnings(player_id, reward)
 
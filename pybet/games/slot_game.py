@@ -17,7 +17,7 @@ Dependencies:
     - random: for spinning each reel
     - PlayerManager: to load/update player data in JSON
     - OperationResult: to handle success/failure of updates
-    - PlayerHistory: to record a descriptive string for each play
+    - PlayerSession: to save balance and history of each play in one write
 
 All code is pure Python standard library.
 """
@@ -27,7 +27,6 @@ from typing import List, Tuple
 
 from pybet.models.PlayerManager import PlayerManager
 from pybet.models.OperationResult import OperationResult
-from pybet.logic.PlayerHistory import PlayerHistory
 
 # Import EarningsTracker to update earnings history
 from pybet.helpers.EarningsTracker import EarningsTracker
@@ -58,8 +57,8 @@ def play_slot(manager: PlayerManager) -> None:
         3. “Spin” by randomly choosing one symbol per reel.
         4. Check if (symbol1, symbol2, symbol3) is in WINNING_COMBINATIONS.
         5. If win: reward = bet; else: reward = -bet.
-        6. Update the player’s balance via PlayerManager.
-        7. Record a descriptive string in PlayerHistory.
+        6. Update the player’s balance in a PlayerSession.
+        7. Record a descriptive string in the player's history and commit both at once.
         8. Display spin result and updated balance.
         9. Update the player's earnings history in a JSON file.
 
@@ -67,7 +66,8 @@ def play_slot(manager: PlayerManager) -> None:
         manager (PlayerManager): Instance to load/update players.json.
     """
     player_id = input("ID de jugador: ").strip()
-    get_res: OperationResult = manager.get_player_by_id(player_id)
+    session = manager.session()
+    get_res: OperationResult = session.get(player_id)
     if not get_res.ok:
         print("Error:", get_res.error)
         return
@@ -113,18 +113,14 @@ def play_slot(manager: PlayerManager) -> None:
         f"new balance {new_balance}"
     )
 
-    # Update balance in JSON
-    upd_res: OperationResult = manager.update_player(player_id, None, new_balance)
-    if not upd_res.ok:
-        print("Error al actualizar balance:", upd_res.error)
+    # Update balance and record the play in player's history, in one write
+    player.account_balance = new_balance
+    player.history.append(result_str)
+    commit_res: OperationResult = session.commit(game="Tragamonedas")
+    if not commit_res.ok:
+        print("Error al guardar la jugada:", commit_res.error)
         return
 
-    # Record the play in player's history
-    hist = PlayerHistory(player_id)
-    push_res: OperationResult = hist.push(result_str)
-    if not push_res.ok:
-        print("Error al registrar historial:", push_res.error)
-
     # Update the player's earnings history
     EarningsTracker.update_earnings(player_id, reward)
 
@@ -7,13 +7,18 @@ This module provides the EarningsTracker class, which offers static methods to u
 import json
 import os
 
+from pybet.helpers.FileManager import log
+from pybet.models.EventBus import EventBus
+from pybet.models.EventLog import EARNINGS_UPDATED
+
 EARNINGS_FILE = './pybet/data/reports/earnings_totals.json'
 
 class EarningsTracker:
     @staticmethod
     def update_earnings(player_id: str, amount: float) -> None:
         """
-        Update the earnings for a given player by adding the specified amount.
+        Update the earnings for a given player by adding the specified amount,
+        and publish the change on the EventBus.
 
         Args:
             player_id (str): The unique identifier for the player.
@@ -32,6 +37,10 @@ class EarningsTracker:
         with open(EARNINGS_FILE, 'w', encoding='utf-8') as f:
             json.dump(earnings, f, indent=4)
 
+        publish_res = EventBus.publish([(EARNINGS_UPDATED, {"player_id": player_id, "amount": amount, "total": earnings[player_id]})])
+        if not publish_res.ok:
+            log.log(publish_res.error)
+
     @staticmethod
     def get_all_earnings() -> dict:
         """
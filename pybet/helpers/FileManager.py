@@ -1,18 +1,83 @@
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, IO, Set, Tuple
+import atexit
 import csv
+import gzip
 import json
+import os
+import stat
+import tempfile
+import threading
+import time
 from chromologger import Logger as Log
 from chromolog import Print
 from pybet.models.OperationResult import OperationResult
+from pybet.helpers.Serializers import Serializer, get_serializer
 
 # Logger to save errors and information
 log: Log = Log('./pybet/logs/log.log')
 # Printer to show colored messages on console
 printer: Print = Print()
+# Characters read at a time by the streaming JSON readers
+JSON_CHUNK_SIZE: int = 64 * 1024
+
+# Durability of write_file:
+#   'none'       - no fsync; fastest, a power failure may lose recent writes (or
+#                  leave a file written just before it empty).
+#   'per-commit' - fsync the file (and its directory) before write_file returns.
+#   'batched'    - group commit: as safe as 'per-commit', but writes arriving within
+#                  GROUP_COMMIT_WINDOW of each other wait for one shared round of
+#                  fsyncs instead of each running their own.
+# Files are always replaced atomically (temp file + rename), whatever the mode; in
+# every mode but 'none' the temp file is fsynced before the rename.
+DURABILITY_MODES: Tuple[str, ...] = ('none', 'per-commit', 'batched')
+DEFAULT_DURABILITY: str = os.environ.get('PYBET_DURABILITY', 'per-commit')
+GROUP_COMMIT_WINDOW: float = 0.01
 
 class FileManager:
     """Manage files (plain text, JSON, CSV), returning OperationResult."""
 
+    durability: str = DEFAULT_DURABILITY if DEFAULT_DURABILITY in DURABILITY_MODES else 'per-commit'
+
+    @staticmethod
+    def set_durability(mode: str, window: Optional[float] = None) -> OperationResult:
+        """
+        Chooses how write_file trades latency for safety (see DURABILITY_MODES).
+
+        Args:
+            mode (str): 'none', 'per-commit' or 'batched'.
+            window (Optional[float]): Group commit window in seconds (batched mode).
+
+        Returns:
+            OperationResult: ok True if applied; error otherwise.
+        """
+        if mode not in DURABILITY_MODES:
+            return OperationResult(ok=False, error=f'Invalid durability "{mode}".')
+        if FileManager.durability == 'batched' and mode != 'batched':
+            # Do not leave writes of the previous mode unsynced
+            _group_commit.flush()
+        FileManager.durability = mode
+        if window is not None:
+            _group_commit.window = window
+        return OperationResult(ok=True)
+
+    @staticmethod
+    def sync() -> OperationResult:
+        """
+        Forces the pending group-commit fsyncs (batched mode) to happen now,
+        without waiting for the rest of the commit window.
+
+        Returns:
+            OperationResult: ok True if every pending file was synced; error otherwise.
+        """
+        result = OperationResult(ok=False)
+        try:
+            _group_commit.flush()
+            result.ok = True
+        except Exception as e:
+            FileManager.__save_data_error(result, f'sync(): {e}', e)
+        return result
+
     @staticmethod
     def read_file_plain(filename: str) -> OperationResult:
         """
@@ -40,14 +105,24 @@ class FileManager:
         return result
 
     @staticmethod
-    def write_file(file_name: str, content: any = None, mode: str = 'w') -> OperationResult:
+    def write_file(file_name: str, content: any = None, mode: str = 'w',
+                   serializer: Optional[str] = None) -> OperationResult:
         """
-        Writes content to a file. If .json extension, serializes as JSON; otherwise writes plain text.
+        Writes content to a file. If .json extension, serializes as JSON; otherwise writes plain text
+        (or, if content is bytes, the bytes as they are).
+        With a serializer (see Serializers.get_serializer), content is encoded in that format instead.
+
+        In 'w' mode the content goes to a temporary file in the same directory,
+        which then atomically replaces the target: a crash leaves either the old
+        or the new file, never a truncated one. When the data reaches the disk
+        depends on FileManager.durability.
 
         Args:
             file_name (str): Path to the file.
             content (any): Data to write.
             mode (str): 'w' or 'a'.
+            serializer (str, optional): Format name, e.g. 'json-compact' or 'binary'
+                (default: 'json' for .json files, plain text otherwise).
 
         Returns:
             OperationResult: ok True if written; error otherwise.
@@ -57,34 +132,73 @@ class FileManager:
             FileManager.__save_data_error(result, f'Invalid mode "{mode}".')
             return result
 
-        is_json = Path(file_name).suffix == '.json'
+        if serializer is None and Path(file_name).suffix == '.json':
+            serializer = 'json'
+        temp_name = None
         try:
+            encoder = get_serializer(serializer) if serializer is not None else None
+            binary = encoder.binary if encoder is not None else isinstance(content, (bytes, bytearray))
             # Ensure directory exists
             Path(file_name).parent.mkdir(parents=True, exist_ok=True)
-            with open(file_name, mode, encoding='utf-8') as f:
-                if is_json:
-                    json.dump(content, f, indent=4, ensure_ascii=False)
+            if mode == 'w':
+                fd, temp_name = tempfile.mkstemp(dir=Path(file_name).parent, prefix=f'.{Path(file_name).name}.', suffix='.tmp')
+                # mkstemp creates the file private (0600): keep the target's permissions
+                os.chmod(temp_name, stat.S_IMODE(os.stat(file_name).st_mode) if os.path.exists(file_name) else 0o644)
+                f = os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8')
+            else:
+                f = open(file_name, mode + 'b') if binary else open(file_name, mode, encoding='utf-8')
+            with f:
+                if encoder is not None:
+                    encoder.dump(content, f)
+                elif binary:
+                    f.write(content)
                 else:
                     f.write(str(content))
+                f.flush()
+                if FileManager.durability == 'per-commit':
+                    os.fsync(f.fileno())
+            if FileManager.durability == 'batched':
+                # The data must be on disk before the rename makes it the file's content
+                _group_commit.sync(temp_name or file_name)
+            if temp_name is not None:
+                os.replace(temp_name, file_name)
+                temp_name = None
+                if FileManager.durability == 'per-commit':
+                    _fsync_directory(Path(file_name).parent)
+                elif FileManager.durability == 'batched':
+                    _group_commit.sync(str(Path(file_name).parent), directory=True)
             result.ok = True
         except Exception as e:
             FileManager.__save_data_error(result, f'write_file(): {e}', e)
             FileManager.print_exception_message()
+        finally:
+            if temp_name is not None and os.path.exists(temp_name):
+                os.remove(temp_name)
         return result
 
     @staticmethod
-    def read_file_csv(csv_filename: str) -> OperationResult:
+    def read_file_csv(csv_filename: str, stream: bool = False) -> OperationResult:
         """
         Reads a CSV file (skipping optional header) and returns rows as List[List[str]].
 
         Args:
             csv_filename (str): Path to CSV.
+            stream (bool): Return a lazy iterator over the rows instead of a list;
+                only opening the file is checked up front (an empty file simply
+                yields nothing).
 
         Returns:
-            OperationResult: ok/data (List[List[str]]) or error.
+            OperationResult: ok/data (List[List[str]], or iterator when streaming) or error.
         """
         result = OperationResult(ok=False)
         try:
+            if stream:
+                f = FileManager._open_text(csv_filename, 'r', newline='')
+                reader_csv = csv.reader(f)
+                next(reader_csv, None)  # Skip header if present
+                result.ok = True
+                result.data = FileManager._closing(f, reader_csv)
+                return result
             with open(csv_filename, 'r', encoding='utf-8') as f:
                 reader_csv = csv.reader(f)
                 next(reader_csv, None)  # Skip header if present
@@ -101,9 +215,20 @@ class FileManager:
         return result
 
     @staticmethod
-    def write_file_csv(file_name: str, rows: list[list[str]], header: list[str] | None = None, mode: str = 'w') -> OperationResult:
+    def write_file_csv(file_name: str, rows: Iterable[list[str]], header: list[str] | None = None,
+                       mode: str = 'w', compress: Optional[bool] = None) -> OperationResult:
         """
-        Writes a list of rows (optionally with header) to a CSV file.
+        Writes rows (optionally with header) to a CSV file, one row at a time.
+
+        Args:
+            file_name (str): Path to the file.
+            rows (Iterable[list[str]]): Rows to write; may be a generator.
+            header (list[str] | None): Optional header row.
+            mode (str): 'w' or 'a'.
+            compress (bool | None): Gzip the output; by default only when file_name ends with ".gz".
+
+        Returns:
+            OperationResult: ok/data (int, rows written) or error.
         """
         result = OperationResult(ok=False)
         if mode not in ('w', 'a'):
@@ -111,30 +236,75 @@ class FileManager:
             return result
         try:
             Path(file_name).parent.mkdir(parents=True, exist_ok=True)
-            with open(file_name, mode, newline='', encoding='utf-8') as f:
+            count = 0
+            with FileManager._open_text(file_name, mode, compress, newline='') as f:
                 writer = csv.writer(f)
                 if header:
                     writer.writerow(header)
-                writer.writerows(rows)
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
             result.ok = True
+            result.data = count
         except Exception as e:
             FileManager.__save_data_error(result, f'write_file_csv(): {e}', e)
             FileManager.print_exception_message()
         return result
 
     @staticmethod
-    def read_file_json(json_filename: str) -> OperationResult:
+    def write_file_json_stream(file_name: str, items: Iterable[Any], compress: Optional[bool] = None) -> OperationResult:
+        """
+        Writes a JSON array incrementally, one compact item per line.
+
+        Unlike write_file, the array is never held in memory, so `items` may be a generator.
+
+        Args:
+            file_name (str): Path to the file.
+            items (Iterable[Any]): JSON-serializable array items.
+            compress (bool | None): Gzip the output; by default only when file_name ends with ".gz".
+
+        Returns:
+            OperationResult: ok/data (int, items written) or error.
+        """
+        result = OperationResult(ok=False)
+        try:
+            Path(file_name).parent.mkdir(parents=True, exist_ok=True)
+            count = 0
+            with FileManager._open_text(file_name, 'w', compress) as f:
+                f.write('[')
+                for item in items:
+                    f.write(',\n' if count else '\n')
+                    f.write(json.dumps(item, ensure_ascii=False))
+                    count += 1
+                f.write('\n]\n' if count else ']\n')
+            result.ok = True
+            result.data = count
+        except Exception as e:
+            FileManager.__save_data_error(result, f'write_file_json_stream(): {e}', e)
+            FileManager.print_exception_message()
+        return result
+
+    @staticmethod
+    def read_file_json(json_filename: str, stream: bool = False) -> OperationResult:
         """
         Reads a JSON file and returns the parsed object (dict or list).
 
         Args:
             json_filename (str): Path to JSON.
+            stream (bool): Instead of parsing the whole file, return a lazy iterator
+                over the top-level array items or (key, value) object entries
+                (see iter_file_json); only opening the file is checked up front.
 
         Returns:
-            OperationResult: ok/data or error.
+            OperationResult: ok/data (object, or iterator when streaming) or error.
         """
         result = OperationResult(ok=False)
         try:
+            if stream:
+                f = FileManager._open_text(json_filename, 'r')
+                result.ok = True
+                result.data = FileManager._closing(f, _JsonChunks(f, JSON_CHUNK_SIZE).items('[{'))
+                return result
             with open(json_filename, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             # If data is empty list or dict, warn but still return ok with empty data
@@ -147,6 +317,159 @@ class FileManager:
             FileManager.print_exception_message()
         return result
 
+    @staticmethod
+    def iter_file_json(json_filename: str, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Any]:
+        """
+        Lazily yields the items of a top-level JSON array, or the (key, value)
+        entries of a top-level JSON object.
+
+        The file is read in chunks through a buffered raw-decode loop and each
+        item is decoded as soon as it is complete, so memory is bounded by the
+        chunk size and the largest item, not by the file. Files ending with ".gz"
+        are decompressed on the fly.
+
+        Args:
+            json_filename (str): Path to JSON.
+            chunk_size (int): Characters read at a time.
+
+        Yields:
+            Any: One array item, or one (key, value) tuple, at a time, in file order.
+
+        Raises:
+            OSError, ValueError: If the file cannot be read or is not a valid JSON array/object.
+        """
+        with FileManager._open_text(json_filename, 'r') as f:
+            yield from _JsonChunks(f, chunk_size).items('[{')
+
+    @staticmethod
+    def iter_file_json_object(json_filename: str, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+        """
+        Lazily yields the (key, value) entries of a file holding one JSON object
+        (see iter_file_json).
+
+        Raises:
+            OSError, ValueError: If the file cannot be read or is not a valid JSON object.
+        """
+        with FileManager._open_text(json_filename, 'r') as f:
+            yield from _JsonChunks(f, chunk_size).items('{')
+
+    @staticmethod
+    def read_file_serialized(file_name: str, serializer: str = 'json') -> OperationResult:
+        """
+        Reads a file written by write_file with the given serializer.
+
+        Args:
+            file_name (str): Path to the file.
+            serializer (str): Format name (see Serializers.get_serializer).
+
+        Returns:
+            OperationResult: ok/data (decoded object) or error.
+        """
+        result = OperationResult(ok=False)
+        try:
+            decoder = get_serializer(serializer)
+            with FileManager._open_serialized(file_name, decoder) as f:
+                result.data = decoder.load(f)
+            result.ok = True
+        except Exception as e:
+            FileManager.__save_data_error(result, f'read_file_serialized(): {e}', e)
+            FileManager.print_exception_message()
+        return result
+
+    @staticmethod
+    def iter_file_serialized(file_name: str, serializer: str = 'json') -> Iterator[Tuple[str, Any]]:
+        """
+        Lazily yields the (key, value) entries of a mapping written by write_file
+        with the given serializer. JSON formats are streamed like
+        iter_file_json_object; the binary format decodes one record at a time.
+
+        Raises:
+            OSError, ValueError: If the file cannot be read or is not in that format.
+        """
+        decoder = get_serializer(serializer)
+        if decoder.suffix == '.json':
+            yield from FileManager.iter_file_json_object(file_name)
+            return
+        with FileManager._open_serialized(file_name, decoder) as f:
+            yield from decoder.iter_items(f)
+
+    @staticmethod
+    def write_file_jsonl(file_name: str, records: Iterable[Any], mode: str = 'w',
+                         compress: Optional[bool] = None) -> OperationResult:
+        """
+        Writes records as JSON Lines (one compact JSON document per line).
+
+        Records are consumed one at a time, so `records` may be a generator.
+
+        Args:
+            file_name (str): Path to the file.
+            records (Iterable[Any]): JSON-serializable records.
+            mode (str): 'w' or 'a'.
+            compress (bool | None): Gzip the output; by default only when file_name ends with ".gz".
+
+        Returns:
+            OperationResult: ok/data (int, records written) or error.
+        """
+        result = OperationResult(ok=False)
+        if mode not in ('w', 'a'):
+            FileManager.__save_data_error(result, f'Invalid JSONL mode "{mode}"')
+            return result
+        try:
+            Path(file_name).parent.mkdir(parents=True, exist_ok=True)
+            count = 0
+            with FileManager._open_text(file_name, mode, compress) as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False))
+                    f.write('\n')
+                    count += 1
+            result.ok = True
+            result.data = count
+        except Exception as e:
+            FileManager.__save_data_error(result, f'write_file_jsonl(): {e}', e)
+            FileManager.print_exception_message()
+        return result
+
+    @staticmethod
+    def iter_file_jsonl(file_name: str) -> Iterator[Any]:
+        """
+        Lazily yields the records of a JSON Lines file (blank lines are skipped).
+        Files ending with ".gz" are decompressed on the fly.
+
+        Args:
+            file_name (str): Path to the file.
+
+        Yields:
+            Any: One parsed record per line.
+
+        Raises:
+            OSError, json.JSONDecodeError: If the file cannot be read or a line is invalid.
+        """
+        with FileManager._open_text(file_name, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    @staticmethod
+    def iter_file_csv(csv_filename: str, skip_header: bool = True) -> Iterator[list[str]]:
+        """
+        Lazily yields the rows of a CSV file (gzip-decompressed if it ends with ".gz").
+
+        Args:
+            csv_filename (str): Path to CSV.
+            skip_header (bool): Whether the first row is a header to skip.
+
+        Yields:
+            list[str]: One row at a time.
+
+        Raises:
+            OSError, csv.Error: If the file cannot be read or parsed.
+        """
+        with FileManager._open_text(csv_filename, 'r', newline='') as f:
+            reader_csv = csv.reader(f)
+            if skip_header:
+                next(reader_csv, None)
+            yield from reader_csv
+
     @staticmethod
     def print_exception_message() -> None:
         """Prints a generic error message to console."""
@@ -165,6 +488,33 @@ class FileManager:
         else:
             printer.warn('[Warn] No content provided to write')
 
+    @staticmethod
+    def _open_text(file_name: str, mode: str, compress: Optional[bool] = None, newline: Optional[str] = None) -> IO[str]:
+        """
+        Opens a UTF-8 text file, through gzip when compress is True
+        (or, when compress is None, when the file name ends with ".gz").
+        """
+        if compress is None:
+            compress = file_name.endswith('.gz')
+        if compress:
+            return gzip.open(file_name, mode + 't', encoding='utf-8', newline=newline)
+        return open(file_name, mode, encoding='utf-8', newline=newline)
+
+    @staticmethod
+    def _open_serialized(file_name: str, serializer: Serializer) -> IO:
+        """Opens a file for reading in the serializer's mode (binary or UTF-8 text)."""
+        if serializer.binary:
+            return open(file_name, 'rb')
+        return open(file_name, 'r', encoding='utf-8')
+
+    @staticmethod
+    def _closing(handle: IO[str], iterator: Iterator[Any]) -> Iterator[Any]:
+        """Yields from an iterator over an open file, closing the file when done."""
+        try:
+            yield from iterator
+        finally:
+            handle.close()
+
     @staticmethod
     def __save_data_error(result: OperationResult, msg_error: str, error: Exception = None) -> None:
         """
@@ -178,4 +528,210 @@ class FileManager:
         if error is not None:
             log.log_e(error)
         result.ok = False
-        result.error = msg_error
\ No newline at end of file
+        result.error = msg_error
+
+class _JsonChunks:
+    """
+    Incremental JSON tokenizer over a text stream, for FileManager's streaming readers.
+
+    Keeps a buffer that only holds the unparsed tail of the chunks read so far and
+    decodes one value at a time with json.JSONDecoder.raw_decode, reading more
+    when a value is cut at the end of the buffer.
+    """
+    _WHITESPACE = ' \t\n\r'
+    _NUMBER_CHARS = '0123456789+-.eE'
+
+    def __init__(self, stream: IO[str], chunk_size: int) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._consumed = 0
+        self._eof = False
+
+    @property
+    def offset(self) -> int:
+        """Characters consumed so far (for error messages)."""
+        return self._consumed + self._pos
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ('' at end of file)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self._WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._read_more():
+                return self._buffer[self._pos:self._pos + 1]
+
+    def expect(self, chars: str) -> str:
+        """Consumes the next non-whitespace character, which must be one of `chars`."""
+        found = self.peek()
+        if not found or found not in chars:
+            raise ValueError(f'Expected one of "{chars}" at offset {self.offset}, found "{found}"')
+        self._pos += 1
+        return found
+
+    def items(self, openings: str) -> Iterator[Any]:
+        """
+        Yields the items of the top-level array, or the (key, value) entries of the
+        top-level object, then checks that nothing follows it.
+
+        Args:
+            openings (str): Accepted opening characters ('[', '{' or both).
+        """
+        opening = self.expect(openings)
+        closing = ']' if opening == '[' else '}'
+        if self.peek() == closing:
+            self.expect(closing)
+        else:
+            while True:
+                if opening == '{':
+                    key = self.decode()
+                    if not isinstance(key, str):
+                        raise ValueError(f'Expected an object key at offset {self.offset}')
+                    self.expect(':')
+                    yield key, self.decode()
+                else:
+                    yield self.decode()
+                if self.expect(',' + closing) == closing:
+                    break
+        if self.peek() != '':
+            raise ValueError(f'Extra data after the top-level value at offset {self.offset}')
+
+    def decode(self) -> Any:
+        """Decodes the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number cut by the end of the buffer may continue in the next chunk
+                if self._eof or (end < len(self._buffer) and self._buffer[end] not in self._NUMBER_CHARS):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._read_more()
+
+    def _read_more(self) -> bool:
+        """Appends a chunk to the buffer, dropping the consumed part; False at end of file."""
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._consumed += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+
+def _fsync_path(path: str) -> None:
+    """fsyncs a file by name."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """fsyncs a directory so a rename into it is durable (no-op where unsupported)."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _GroupCommit:
+    """
+    Group commit for the 'batched' durability mode.
+
+    write_file calls sync() for each file (and, after a rename, each directory)
+    it needs on disk, and waits. A daemon thread waits for the commit window so
+    that the calls arriving close together form one group, fsyncs each distinct
+    path of the group once, then wakes all of its callers; a failed fsync is
+    raised to the callers of that path.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        # (path, is a directory) of the group being collected
+        self._pending: Set[Tuple[str, bool]] = set()
+        # Groups taken for syncing so far, and groups done
+        self._taken = 0
+        self._done = 0
+        # Group number → path → error, for groups where an fsync failed
+        self._failed: Dict[int, Dict[str, Exception]] = {}
+        self._cond = threading.Condition()
+        self._sync_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def sync(self, path: str, directory: bool = False) -> None:
+        """
+        Returns once `path` is fsynced by the group it joins.
+
+        Raises:
+            OSError: If its fsync failed.
+        """
+        with self._cond:
+            self._pending.add((path, directory))
+            group = self._taken + 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='pybet-group-commit', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+            while self._done < group:
+                self._cond.wait()
+            error = self._failed.get(group, {}).get(path)
+        if error is not None:
+            raise error
+
+    def flush(self) -> None:
+        """fsyncs the group being collected now."""
+        with self._sync_lock:
+            with self._cond:
+                if not self._pending:
+                    return
+                paths, self._pending = self._pending, set()
+                self._taken += 1
+                group = self._taken
+            failed: Dict[str, Exception] = {}
+            try:
+                for path, directory in paths:
+                    try:
+                        if directory:
+                            _fsync_directory(Path(path))
+                        elif os.path.exists(path):
+                            _fsync_path(path)
+                    except OSError as e:
+                        failed[path] = e
+            finally:
+                # Always wake the group's callers, whatever happened
+                with self._cond:
+                    if failed:
+                        self._failed[group] = failed
+                    # Keep the errors of recent groups only
+                    for old in [g for g in self._failed if g < group - 100]:
+                        del self._failed[old]
+                    self._done = group
+                    self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let the rest of the group arrive
+            time.sleep(self.window)
+            try:
+                self.flush()
+            except Exception as e:
+                log.log_e(e)
+
+
+_group_commit = _GroupCommit(GROUP_COMMIT_WINDOW)
+# Pending batched writes are synced before the interpreter exits
+atexit.register(_group_commit.flush)
@@ -0,0 +1,400 @@
+from abc import ABC, abstractmethod
+from itertools import accumulate
+from typing import Any, BinaryIO, Dict, IO, Iterator, List, Optional, Tuple
+import datetime
+import json
+import re
+
+# Epoch and unit of the created_at timestamps stored as integers
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+class Serializer(ABC):
+    """
+    Encodes data to a file and back.
+
+    Attributes:
+        name (str): Name it is registered under (see get_serializer).
+        suffix (str): File extension for files in this format.
+        binary (bool): Whether files are opened in binary mode.
+    """
+    name: str = ''
+    suffix: str = ''
+    binary: bool = False
+
+    @abstractmethod
+    def dump(self, obj: Any, handle: IO) -> None:
+        """Writes `obj` to an open file."""
+
+    @abstractmethod
+    def load(self, handle: IO) -> Any:
+        """Reads back what dump() wrote."""
+
+    def iter_items(self, handle: IO) -> Iterator[Tuple[str, Any]]:
+        """(key, value) entries of a stored mapping (by default after loading it whole)."""
+        yield from self.load(handle).items()
+
+
+class JsonSerializer(Serializer):
+    """JSON text; `indent=None` writes it compact, without any whitespace."""
+    suffix = '.json'
+
+    def __init__(self, name: str, indent: Optional[int]) -> None:
+        self.name = name
+        self.indent = indent
+
+    def dump(self, obj: Any, handle: IO[str]) -> None:
+        if self.indent is None:
+            # Without indentation json uses its C encoder
+            json.dump(obj, handle, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(obj, handle, indent=self.indent, ensure_ascii=False)
+
+    def load(self, handle: IO[str]) -> Any:
+        return json.load(handle)
+
+
+# Record flags of the binary format
+_ID_IS_KEY = 0x01       # "id" equals the mapping key
+_ID = 0x02              # "id" stored as its own string
+_NAME = 0x04
+_CENTS = 0x08           # balance as zigzag varint of cents
+_INT_BALANCE = 0x10     # ... and it was an int
+_FLOAT = 0x20           # balance as the string of a float that is not whole cents
+_CREATED_EPOCH = 0x40   # created_at as zigzag varint of microseconds since 1970
+_CREATED_TEXT = 0x80    # created_at as a string
+_CREATED_NULL = 0x100
+_HISTORY = 0x200
+_SLOT = 0x400
+_EXTRAS = 0x800         # any other fields, as one JSON string
+
+# Fields with their own encoding; the rest go to the extras
+_FIELDS = ('id', 'name', 'account_balance', 'created_at', 'history', 'balance_slot')
+
+# Numbers in history entries become placeholders, so "Ruleta: won 15" and
+# "Ruleta: won 20" share the template "Ruleta: won \0"
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+_PLACEHOLDER = '\0'
+
+# Bytes read at a time when streaming records
+_CHUNK_SIZE = 1 << 20
+
+
+def _put(out: bytearray, value: int) -> None:
+    """Appends an unsigned varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get(data: bytes, pos: int) -> Tuple[int, int]:
+    """Decodes the unsigned varint at pos; returns (value, position after it)."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _varints(data: bytes) -> List[int]:
+    """Decodes a run of varints (a plain byte copy when they are all one byte)."""
+    if max(data, default=0) < 0x80:
+        return list(data)
+    values = []
+    value = shift = 0
+    for byte in data:
+        if byte < 0x80:
+            values.append(value | (byte << shift))
+            value = shift = 0
+        else:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+    return values
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _epoch_micros(value: str) -> Optional[int]:
+    """created_at as microseconds since 1970, or None if it would not round-trip."""
+    try:
+        moment = datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None or moment.isoformat() != value:
+        return None
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+class BinaryPlayerSerializer(Serializer):
+    """
+    Compact binary format for player mappings (player ID → record).
+
+    Layout:
+        magic "PYBP", format version
+        string table: count, UTF-8 size, UTF-8 text of every string, then the
+            length (in characters) of each string
+        record count, then each record as its byte length followed by:
+            flags, key, and the fields present (see the flag constants): strings
+            as string table indexes, the balance as a zigzag varint of cents,
+            created_at as varint microseconds, history entries as a template
+            index plus the index of each of its numbers.
+
+    Every integer is a LEB128 varint, so a record is a plain run of varints.
+    Every string (IDs, names, history templates and numbers) is stored once;
+    records only refer to it. Fields other than the Player ones are kept as
+    one JSON string per record, so any mapping of JSON objects round-trips.
+    """
+    name = 'binary'
+    suffix = '.pybin'
+    binary = True
+
+    MAGIC = b'PYBP\x01'
+
+    def dump(self, obj: Dict[str, Dict[str, Any]], handle: BinaryIO) -> None:
+        if not isinstance(obj, dict):
+            raise TypeError('The binary format only stores mappings of records.')
+        strings: Dict[str, int] = {}
+        # Encoded history entries, which repeat a lot across players
+        entries: Dict[str, bytes] = {}
+
+        def ref(text: str) -> int:
+            index = strings.get(text)
+            if index is None:
+                index = strings[text] = len(strings)
+            return index
+
+        def entry_codes(entry: str) -> bytes:
+            out = bytearray()
+            if _PLACEHOLDER in entry:
+                _put(out, ref(entry) << 1)
+            else:
+                _put(out, (ref(_NUMBER.sub(_PLACEHOLDER, entry)) << 1) | 1)
+                for number in _NUMBER.findall(entry):
+                    _put(out, ref(number))
+            entries[entry] = bytes(out)
+            return entries[entry]
+
+        records = bytearray()
+        for key, record in obj.items():
+            if not isinstance(record, dict):
+                raise TypeError(f'Record "{key}" is not an object.')
+            flags = 0
+            fields = bytearray()
+            _put(fields, ref(key))
+            extras = {field: value for field, value in record.items() if field not in _FIELDS}
+
+            value = record.get('id')
+            if value == key:
+                flags |= _ID_IS_KEY
+            elif isinstance(value, str):
+                flags |= _ID
+                _put(fields, ref(value))
+            elif 'id' in record:
+                extras['id'] = value
+            value = record.get('name')
+            if isinstance(value, str):
+                flags |= _NAME
+                _put(fields, ref(value))
+            elif 'name' in record:
+                extras['name'] = value
+            value = record.get('account_balance')
+            if _is_int(value):
+                flags |= _CENTS | _INT_BALANCE
+                _put(fields, _zigzag(value * 100))
+            elif isinstance(value, float) and round(value * 100) / 100 == value:
+                # Whole cents: decoding them gives back exactly this float
+                flags |= _CENTS
+                _put(fields, _zigzag(round(value * 100)))
+            elif isinstance(value, float):
+                flags |= _FLOAT
+                _put(fields, ref(repr(value)))
+            elif 'account_balance' in record:
+                extras['account_balance'] = value
+            value = record.get('created_at')
+            micros = _epoch_micros(value) if isinstance(value, str) else None
+            if micros is not None:
+                flags |= _CREATED_EPOCH
+                _put(fields, _zigzag(micros))
+            elif isinstance(value, str):
+                flags |= _CREATED_TEXT
+                _put(fields, ref(value))
+            elif 'created_at' in record:
+                if value is None:
+                    flags |= _CREATED_NULL
+                else:
+                    extras['created_at'] = value
+            value = record.get('history')
+            if isinstance(value, list) and all(isinstance(entry, str) for entry in value):
+                flags |= _HISTORY
+                _put(fields, len(value))
+                for entry in value:
+                    fields += entries.get(entry) or entry_codes(entry)
+            elif 'history' in record:
+                extras['history'] = value
+            value = record.get('balance_slot')
+            if _is_int(value) and value >= 0:
+                flags |= _SLOT
+                _put(fields, value)
+            elif 'balance_slot' in record:
+                extras['balance_slot'] = value
+            if extras:
+                flags |= _EXTRAS
+                _put(fields, ref(json.dumps(extras, ensure_ascii=False, separators=(',', ':'))))
+
+            body = bytearray()
+            _put(body, flags)
+            body += fields
+            _put(records, len(body))
+            records += body
+
+        header = bytearray(self.MAGIC)
+        text = ''.join(strings).encode('utf-8')
+        _put(header, len(strings))
+        _put(header, len(text))
+        handle.write(header)
+        handle.write(text)
+        lengths = bytearray()
+        for string in strings:
+            _put(lengths, len(string))
+        _put(lengths, len(obj))
+        handle.write(lengths)
+        handle.write(records)
+
+    def load(self, handle: BinaryIO) -> Dict[str, Dict[str, Any]]:
+        return dict(self.iter_items(handle))
+
+    def iter_items(self, handle: BinaryIO) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Decodes the records one at a time. The string table is read first; the
+        records are then read in chunks and split by their length prefix.
+
+        Raises:
+            ValueError: If the file is not in this format or is truncated.
+        """
+        data = handle.read(_CHUNK_SIZE)
+        if not data.startswith(self.MAGIC):
+            raise ValueError('Not a PyBet binary player file.')
+        try:
+            count, pos = _get(data, len(self.MAGIC))
+            size, pos = _get(data, pos)
+            # The string table is needed whole before any record
+            data = data[pos:] + handle.read(max(0, size - (len(data) - pos)) + _CHUNK_SIZE)
+            text = data[:size].decode('utf-8')
+            pos = size
+            lengths = []
+            for _ in range(count):
+                if len(data) - pos < 10:
+                    data = data[pos:] + handle.read(_CHUNK_SIZE)
+                    pos = 0
+                length, pos = _get(data, pos)
+                lengths.append(length)
+            ends = list(accumulate(lengths))
+            strings: List[str] = [text[start:end] for start, end in zip([0] + ends, ends)]
+            del text, lengths, ends
+            if len(data) - pos < 10:
+                data = data[pos:] + handle.read(_CHUNK_SIZE)
+                pos = 0
+            total, pos = _get(data, pos)
+        except IndexError:
+            raise ValueError('Truncated PyBet binary player file.') from None
+        templates: Dict[int, List[str]] = {}
+
+        for _ in range(total):
+            if len(data) - pos < 10:
+                data = data[pos:] + handle.read(_CHUNK_SIZE)
+                pos = 0
+            try:
+                length, pos = _get(data, pos)
+            except IndexError:
+                raise ValueError('Truncated PyBet binary player file.') from None
+            if len(data) - pos < length:
+                data = data[pos:] + handle.read(max(length, _CHUNK_SIZE))
+                pos = 0
+                if len(data) < length:
+                    raise ValueError('Truncated PyBet binary player file.')
+            values = iter(_varints(data[pos:pos + length]))
+            pos += length
+            take = values.__next__
+
+            flags = take()
+            key = strings[take()]
+            record: Dict[str, Any] = {}
+            if flags & _ID_IS_KEY:
+                record['id'] = key
+            elif flags & _ID:
+                record['id'] = strings[take()]
+            if flags & _NAME:
+                record['name'] = strings[take()]
+            if flags & _CENTS:
+                cents = _unzigzag(take())
+                record['account_balance'] = cents // 100 if flags & _INT_BALANCE else cents / 100
+            elif flags & _FLOAT:
+                record['account_balance'] = float(strings[take()])
+            if flags & _CREATED_EPOCH:
+                record['created_at'] = (_EPOCH + datetime.timedelta(microseconds=_unzigzag(take()))).isoformat()
+            elif flags & _CREATED_TEXT:
+                record['created_at'] = strings[take()]
+            elif flags & _CREATED_NULL:
+                record['created_at'] = None
+            if flags & _HISTORY:
+                history = []
+                for _ in range(take()):
+                    code = take()
+                    if not code & 1:
+                        history.append(strings[code >> 1])
+                        continue
+                    parts = templates.get(code)
+                    if parts is None:
+                        parts = templates[code] = strings[code >> 1].split(_PLACEHOLDER)
+                    entry = parts[0]
+                    for part in parts[1:]:
+                        entry += strings[take()] + part
+                    history.append(entry)
+                record['history'] = history
+            if flags & _SLOT:
+                record['balance_slot'] = take()
+            if flags & _EXTRAS:
+                record.update(json.loads(strings[take()]))
+            yield key, record
+
+
+# Registered serializers by name
+SERIALIZERS: Dict[str, Serializer] = {}
+
+
+def register_serializer(serializer: Serializer) -> None:
+    """Makes a serializer available under its name (replacing any previous one)."""
+    SERIALIZERS[serializer.name] = serializer
+
+
+def get_serializer(name: str) -> Serializer:
+    """
+    Returns a registered serializer.
+
+    Raises:
+        ValueError: If no serializer has that name.
+    """
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f'Unknown format "{name}" (available: {", ".join(SERIALIZERS)}).') from None
+
+
+register_serializer(JsonSerializer('json', indent=4))
+register_serializer(JsonSerializer('json-compact', indent=None))
+register_serializer(BinaryPlayerSerializer())
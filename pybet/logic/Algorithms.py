@@ -1,11 +1,28 @@
-from typing import List, TypeVar
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from pathlib import Path
+import heapq
+import shutil
+import sys
+import tempfile
+
+from pybet.helpers.FileManager import FileManager
 
 T = TypeVar('T')
 
+KeyFunc = Optional[Callable[[T], Any]]
+
+# Most run files ExternalSort reads at once; more runs are merged in several passes
+MERGE_FAN_IN = 64
+
 class Algorithms:
     """
     Collection of classic algorithms: linear search, binary search,
     and simple sorting algorithms implemented from scratch, generic over type T.
+
+    Every sort accepts the same options as the built-in sorted():
+        key (Callable | None): Extracts the comparison key of each element (computed once per element).
+        reverse (bool): Sort in descending order. Equal elements keep their original order.
+        in_place (bool): Sort `data` itself instead of a copy; the same list is returned.
     """
 
     @staticmethod
@@ -49,94 +66,425 @@ class Algorithms:
         return -1
 
     @staticmethod
-    def BubbleSort(data: List[T]) -> List[T]:
+    def BubbleSort(data: List[T], key: KeyFunc = None, reverse: bool = False, in_place: bool = False) -> List[T]:
         """
         Sorts a list using the bubble sort algorithm.
 
         Args:
             data (List[T]): The list to sort.
+            key (Callable | None): Comparison key function.
+            reverse (bool): Sort descending.
+            in_place (bool): Sort `data` itself.
 
         Returns:
-            List[T]: A new list containing the sorted elements.
+            List[T]: The sorted list (a new one unless in_place).
         """
-        arr = data.copy()
+        arr, keys = Algorithms._prepare(data, key, in_place)
         n = len(arr)
         for i in range(n):
+            swapped = False
             for j in range(0, n - i - 1):
-                if arr[j] > arr[j + 1]:
+                if Algorithms._before(keys[j + 1], keys[j], reverse):
                     arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                    keys[j], keys[j + 1] = keys[j + 1], keys[j]
+                    swapped = True
+            if not swapped:
+                break
         return arr
 
     @staticmethod
-    def SelectionSort(data: List[T]) -> List[T]:
+    def SelectionSort(data: List[T], key: KeyFunc = None, reverse: bool = False, in_place: bool = False) -> List[T]:
         """
-        Sorts a list using the selection sort algorithm.
+        Sorts a list using the selection sort algorithm (not stable).
 
         Args:
             data (List[T]): The list to sort.
+            key (Callable | None): Comparison key function.
+            reverse (bool): Sort descending.
+            in_place (bool): Sort `data` itself.
 
         Returns:
-            List[T]: A new list containing the sorted elements.
+            List[T]: The sorted list (a new one unless in_place).
         """
-        arr = data.copy()
+        arr, keys = Algorithms._prepare(data, key, in_place)
         n = len(arr)
         for i in range(n):
             min_idx = i
             for j in range(i + 1, n):
-                if arr[j] < arr[min_idx]:
+                if Algorithms._before(keys[j], keys[min_idx], reverse):
                     min_idx = j
             arr[i], arr[min_idx] = arr[min_idx], arr[i]
+            keys[i], keys[min_idx] = keys[min_idx], keys[i]
         return arr
 
     @staticmethod
-    def InsertionSort(data: List[T]) -> List[T]:
+    def InsertionSort(data: List[T], key: KeyFunc = None, reverse: bool = False, in_place: bool = False) -> List[T]:
         """
         Sorts a list using the insertion sort algorithm.
 
         Args:
             data (List[T]): The list to sort.
+            key (Callable | None): Comparison key function.
+            reverse (bool): Sort descending.
+            in_place (bool): Sort `data` itself.
 
         Returns:
-            List[T]: A new list containing the sorted elements.
+            List[T]: The sorted list (a new one unless in_place).
         """
-        arr = data.copy()
+        arr, keys = Algorithms._prepare(data, key, in_place)
         for i in range(1, len(arr)):
-            key = arr[i]
+            item, item_key = arr[i], keys[i]
             j = i - 1
-            while j >= 0 and arr[j] > key:
+            while j >= 0 and Algorithms._before(item_key, keys[j], reverse):
                 arr[j + 1] = arr[j]
+                keys[j + 1] = keys[j]
                 j -= 1
-            arr[j + 1] = key
+            arr[j + 1] = item
+            keys[j + 1] = item_key
+        return arr
+
+    @staticmethod
+    def MergeSort(data: List[T], key: KeyFunc = None, reverse: bool = False, in_place: bool = False) -> List[T]:
+        """
+        Sorts a list using the (top-down) merge sort algorithm.
+
+        Works on index ranges instead of slices and merges through a single
+        auxiliary buffer allocated once for the whole sort.
+
+        Args:
+            data (List[T]): The list to sort.
+            key (Callable | None): Comparison key function.
+            reverse (bool): Sort descending.
+            in_place (bool): Sort `data` itself.
+
+        Returns:
+            List[T]: The sorted list (a new one unless in_place).
+        """
+        arr, keys = Algorithms._prepare(data, key, in_place)
+        n = len(arr)
+        if n <= 1:
+            return arr
+        aux, aux_keys = [None] * n, [None] * n
+
+        def sort_range(low: int, high: int) -> None:
+            # Sorts arr[low:high]
+            if high - low <= 1:
+                return
+            mid = (low + high) // 2
+            sort_range(low, mid)
+            sort_range(mid, high)
+            Algorithms._merge(arr, keys, aux, aux_keys, low, mid, high, reverse)
+
+        sort_range(0, n)
         return arr
 
     @staticmethod
-    def MergeSort(data: List[T]) -> List[T]:
+    def MergeSortBottomUp(data: List[T], key: KeyFunc = None, reverse: bool = False, in_place: bool = False) -> List[T]:
         """
-        Sorts a list using the merge sort algorithm.
+        Sorts a list using iterative (bottom-up) merge sort.
+
+        Merges runs of width 1, 2, 4, ... without recursion, reusing one
+        auxiliary buffer for every pass.
 
         Args:
             data (List[T]): The list to sort.
+            key (Callable | None): Comparison key function.
+            reverse (bool): Sort descending.
+            in_place (bool): Sort `data` itself.
 
         Returns:
-            List[T]: A new list containing the sorted elements.
-        """
-        def merge(left: List[T], right: List[T]) -> List[T]:
-            merged: List[T] = []
-            i = j = 0
-            while i < len(left) and j < len(right):
-                if left[i] <= right[j]:
-                    merged.append(left[i])
-                    i += 1
-                else:
-                    merged.append(right[j])
-                    j += 1
-            merged.extend(left[i:])
-            merged.extend(right[j:])
-            return merged
-
-        if len(data) <= 1:
-            return data.copy()
-        mid = len(data) // 2
-        left_sorted = Algorithms.MergeSort(data[:mid])
-        right_sorted = Algorithms.MergeSort(data[mid:])
-        return merge(left_sorted, right_sorted)
\ No newline at end of file
+            List[T]: The sorted list (a new one unless in_place).
+        """
+        arr, keys = Algorithms._prepare(data, key, in_place)
+        n = len(arr)
+        if n <= 1:
+            return arr
+        aux, aux_keys = [None] * n, [None] * n
+        width = 1
+        while width < n:
+            for low in range(0, n - width, 2 * width):
+                mid = low + width
+                high = min(low + 2 * width, n)
+                # Skip runs that are already in order
+                if Algorithms._before(keys[mid], keys[mid - 1], reverse):
+                    Algorithms._merge(arr, keys, aux, aux_keys, low, mid, high, reverse)
+            width *= 2
+        return arr
+
+    @staticmethod
+    def RadixSort(data: List[T], key: KeyFunc = None, reverse: bool = False, in_place: bool = False) -> List[T]:
+        """
+        Sorts a list of integer keys with a stable LSD radix sort (base 256).
+
+        Meant for integer amounts such as balances in cents
+        (key=lambda p: Algorithms.to_cents(p.account_balance)). Negative keys are
+        supported by offsetting every key by the minimum. Runs in O(n · bytes of the key range).
+
+        Args:
+            data (List[T]): The list to sort.
+            key (Callable | None): Function returning an int for each element.
+            reverse (bool): Sort descending.
+            in_place (bool): Sort `data` itself.
+
+        Returns:
+            List[T]: The sorted list (a new one unless in_place).
+
+        Raises:
+            TypeError: If a key is not an int.
+        """
+        arr, keys = Algorithms._prepare(data, key, in_place)
+        n = len(arr)
+        if n <= 1:
+            return arr
+        for k in keys:
+            if not isinstance(k, int):
+                raise TypeError(f"RadixSort requires integer keys, got {type(k).__name__}.")
+
+        low, high = min(keys), max(keys)
+        # Descending order is the ascending order of (high - k), which keeps ties stable
+        if reverse:
+            digits = [high - k for k in keys]
+        else:
+            digits = [k - low for k in keys]
+
+        order = list(range(n))
+        span, shift = high - low, 0
+        while span >> shift:
+            counts = [0] * 257
+            for i in order:
+                counts[((digits[i] >> shift) & 0xFF) + 1] += 1
+            for b in range(256):
+                counts[b + 1] += counts[b]
+            placed = [0] * n
+            for i in order:
+                b = (digits[i] >> shift) & 0xFF
+                placed[counts[b]] = i
+                counts[b] += 1
+            order = placed
+            shift += 8
+
+        sorted_items = [arr[i] for i in order]
+        arr[:] = sorted_items
+        return arr
+
+    @staticmethod
+    def CountingSort(data: List[T], key: KeyFunc = None, reverse: bool = False, in_place: bool = False) -> List[T]:
+        """
+        Sorts a list of small integer keys (e.g. loss counts) with a stable counting sort.
+
+        Runs in O(n + k), where k is the difference between the largest and smallest key.
+
+        Args:
+            data (List[T]): The list to sort.
+            key (Callable | None): Function returning an int for each element.
+            reverse (bool): Sort descending.
+            in_place (bool): Sort `data` itself.
+
+        Returns:
+            List[T]: The sorted list (a new one unless in_place).
+
+        Raises:
+            TypeError: If a key is not an int.
+        """
+        arr, keys = Algorithms._prepare(data, key, in_place)
+        if len(arr) <= 1:
+            return arr
+        for k in keys:
+            if not isinstance(k, int):
+                raise TypeError(f"CountingSort requires integer keys, got {type(k).__name__}.")
+
+        low, high = min(keys), max(keys)
+        buckets: List[List[T]] = [[] for _ in range(high - low + 1)]
+        for item, k in zip(arr, keys):
+            buckets[k - low].append(item)
+        if reverse:
+            buckets.reverse()
+        arr[:] = [item for bucket in buckets for item in bucket]
+        return arr
+
+    @staticmethod
+    def ExternalSort(records: Iterable[T], key: KeyFunc = None, reverse: bool = False,
+                     memory_budget: int = 64 * 1024 * 1024, run_format: str = 'jsonl',
+                     temp_dir: Optional[str] = None, max_fan_in: int = MERGE_FAN_IN) -> Iterator[T]:
+        """
+        Sorts a stream of records that may not fit in memory (external merge sort).
+
+        Records are buffered until their estimated size reaches `memory_budget`;
+        each full buffer is sorted and spilled as a run to a temporary file through
+        FileManager. The runs are then k-way merged with a heap and yielded one by
+        one; with more than `max_fan_in` runs, consecutive groups of them are first
+        merged into longer runs, so that no more than `max_fan_in` files are ever
+        open at once. If everything fits in the budget nothing is written to disk.
+        The sort is stable, and temporary files are removed once the generator
+        finishes or is closed.
+
+        Args:
+            records (Iterable[T]): Records to sort, consumed lazily.
+            key (Callable | None): Comparison key function.
+            reverse (bool): Sort descending.
+            memory_budget (int): Approximate bytes of records held in memory at once.
+            run_format (str): 'jsonl' for JSON-serializable records, or 'csv' for rows
+                (lists of strings). CSV runs are read back as lists of str, so `key`
+                must accept that form.
+            temp_dir (str | None): Directory for the run files (system temp dir by default).
+            max_fan_in (int): Most runs merged at once (at least 2).
+
+        Yields:
+            T: Records in sorted order.
+
+        Raises:
+            ValueError: If run_format is not 'jsonl' or 'csv', or max_fan_in is below 2.
+            OSError: If a run cannot be written.
+        """
+        if run_format not in ('jsonl', 'csv'):
+            raise ValueError(f'Invalid run format "{run_format}".')
+        if max_fan_in < 2:
+            raise ValueError('max_fan_in must be at least 2.')
+
+        run_dir: Optional[str] = None
+        run_files: List[str] = []
+        buffer: List[T] = []
+        used = 0
+        try:
+            for record in records:
+                buffer.append(record)
+                used += Algorithms._approx_size(record)
+                if used >= memory_budget:
+                    if run_dir is None:
+                        run_dir = tempfile.mkdtemp(prefix='pybet_sort_', dir=temp_dir)
+                    run_files.append(Algorithms._spill_run(buffer, key, reverse, run_dir, len(run_files), run_format))
+                    buffer, used = [], 0
+
+            buffer.sort(key=key, reverse=reverse)
+            if not run_files:
+                yield from buffer
+                return
+
+            if buffer:
+                run_files.append(Algorithms._spill_run(buffer, key, reverse, run_dir, len(run_files), run_format))
+                buffer = []
+            # Consecutive runs are merged together, which keeps the sort stable
+            merges = 0
+            while len(run_files) > max_fan_in:
+                merged: List[str] = []
+                for start in range(0, len(run_files), max_fan_in):
+                    group = run_files[start:start + max_fan_in]
+                    if len(group) == 1:
+                        merged.append(group[0])
+                        continue
+                    path = str(Path(run_dir) / f'merge_{merges:05d}.{run_format}')
+                    merges += 1
+                    runs = [Algorithms._read_run(run, run_format) for run in group]
+                    Algorithms._write_run(path, heapq.merge(*runs, key=key, reverse=reverse), run_format)
+                    for run in group:
+                        Path(run).unlink()
+                    merged.append(path)
+                run_files = merged
+            runs = [Algorithms._read_run(path, run_format) for path in run_files]
+            yield from heapq.merge(*runs, key=key, reverse=reverse)
+        finally:
+            if run_dir is not None:
+                shutil.rmtree(run_dir, ignore_errors=True)
+
+    @staticmethod
+    def to_cents(amount: float) -> int:
+        """
+        Converts a monetary amount to integer cents (for RadixSort keys).
+
+        Args:
+            amount (float): Amount in currency units.
+
+        Returns:
+            int: Amount rounded to the nearest cent.
+        """
+        return int(round(amount * 100))
+
+    @staticmethod
+    def _prepare(data: List[T], key: KeyFunc, in_place: bool) -> Tuple[List[T], List[Any]]:
+        """
+        Returns the list to sort (data or a copy) and the list of its keys.
+
+        Keys are computed once; without a key function the elements are their own keys.
+        """
+        arr = data if in_place else data.copy()
+        keys = [key(item) for item in arr] if key is not None else arr.copy()
+        return arr, keys
+
+    @staticmethod
+    def _spill_run(buffer: List[T], key: KeyFunc, reverse: bool, run_dir: str, index: int, run_format: str) -> str:
+        """
+        Sorts a buffer and writes it as run file number `index`.
+
+        Returns:
+            str: Path of the written run.
+        """
+        buffer.sort(key=key, reverse=reverse)
+        path = str(Path(run_dir) / f'run_{index:05d}.{run_format}')
+        Algorithms._write_run(path, buffer, run_format)
+        return path
+
+    @staticmethod
+    def _write_run(path: str, records: Iterable[T], run_format: str) -> None:
+        """Writes sorted records as a run file, raising OSError if it cannot be written."""
+        if run_format == 'csv':
+            res = FileManager.write_file_csv(path, rows=records, mode='w')
+        else:
+            res = FileManager.write_file_jsonl(path, records, mode='w')
+        if not res.ok:
+            raise OSError(res.error)
+
+    @staticmethod
+    def _read_run(path: str, run_format: str) -> Iterator[T]:
+        """Lazily reads back the records of a run file."""
+        if run_format == 'csv':
+            return FileManager.iter_file_csv(path, skip_header=False)
+        return FileManager.iter_file_jsonl(path)
+
+    @staticmethod
+    def _approx_size(value: Any) -> int:
+        """
+        Rough in-memory size of a record in bytes, following nested dicts, lists and tuples.
+        """
+        size = sys.getsizeof(value)
+        if isinstance(value, dict):
+            for k, v in value.items():
+                size += sys.getsizeof(k) + Algorithms._approx_size(v)
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                size += Algorithms._approx_size(v)
+        return size
+
+    @staticmethod
+    def _before(a: Any, b: Any, reverse: bool) -> bool:
+        """
+        True if key `a` must be placed strictly before key `b`.
+
+        Only strict comparisons are used, so equal keys never move past each other.
+        """
+        return b < a if reverse else a < b
+
+    @staticmethod
+    def _merge(arr: List[T], keys: List[Any], aux: List[Any], aux_keys: List[Any],
+               low: int, mid: int, high: int, reverse: bool) -> None:
+        """
+        Stable merge of the sorted ranges arr[low:mid] and arr[mid:high] through aux.
+
+        Only the left run is copied to the buffer; the merged output is written back
+        into arr starting at low.
+        """
+        left_len = mid - low
+        aux[:left_len] = arr[low:mid]
+        aux_keys[:left_len] = keys[low:mid]
+        i, j, k = 0, mid, low
+        while i < left_len and j < high:
+            if Algorithms._before(keys[j], aux_keys[i], reverse):
+                arr[k], keys[k] = arr[j], keys[j]
+                j += 1
+            else:
+                arr[k], keys[k] = aux[i], aux_keys[i]
+                i += 1
+            k += 1
+        while i < left_len:
+            arr[k], keys[k] = aux[i], aux_keys[i]
+            i += 1
+            k += 1
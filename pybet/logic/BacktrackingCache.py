@@ -0,0 +1,175 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pybet.helpers.FileManager import FileManager
+from pybet.logic.Backtracking import Backtracking
+
+CACHE_FILE = './pybet/data/backtracking_cache.json'
+
+CacheKey = Tuple[int, Tuple[int, ...]]
+
+
+class BacktrackingCache:
+    """
+    LRU cache of solved optimal-betting-path queries.
+
+    Queries are normalized to (balance, sorted options) so that the same set of
+    bet options entered in a different order hits the same entry. Besides exact
+    hits, results are reused monotonically for the same option set:
+        - A solution for a larger balance answers a smaller one when its total
+          still fits in the smaller balance.
+        - A solution for a smaller balance that already takes every option
+          answers any larger balance.
+    Both rules only hold when no option is negative (a negative bet can make a
+    larger total reachable only through a path pruned for a smaller balance), so
+    option sets with one are only ever answered by exact hits.
+    """
+
+    def __init__(self, capacity: int = 128, persist: bool = False, cache_file: str = CACHE_FILE) -> None:
+        """
+        Initializes the cache, loading persisted entries when enabled.
+
+        Args:
+            capacity (int): Maximum number of entries kept (least recently used are evicted).
+            persist (bool): Whether entries are saved to and loaded from cache_file.
+            cache_file (str): Path of the JSON file used for persistence.
+        """
+        self.capacity: int = max(1, capacity)
+        self.persist: bool = persist
+        self.cache_file: str = cache_file
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[List[int], int]]" = OrderedDict()
+        # options tuple → sorted list of cached balances, used for monotone lookups
+        self._balances: Dict[Tuple[int, ...], List[int]] = {}
+        if self.persist:
+            self._load()
+
+    @staticmethod
+    def normalize(balance: int, options: List[int]) -> CacheKey:
+        """
+        Builds the cache key for a query.
+
+        Args:
+            balance (int): Initial balance.
+            options (List[int]): Bet options in any order.
+
+        Returns:
+            CacheKey: (balance, options sorted ascending).
+        """
+        return int(balance), tuple(sorted(int(o) for o in options))
+
+    def solve(self, balance: int, options: List[int]) -> Tuple[List[int], int]:
+        """
+        Returns the optimal betting path, solving with Backtracking only on a cache miss.
+
+        Args:
+            balance (int): Initial balance.
+            options (List[int]): Bet options.
+
+        Returns:
+            Tuple[List[int], int]: Chosen bets and their total.
+        """
+        key = self.normalize(balance, options)
+        cached = self.lookup(key)
+        if cached is not None:
+            self.hits += 1
+            return list(cached[0]), cached[1]
+
+        self.misses += 1
+        best_seq, best_total = Backtracking(key[0], list(key[1])).findOptimalPath()
+        self._put(key, best_seq, best_total)
+        if self.persist:
+            self._save()
+        return list(best_seq), best_total
+
+    def lookup(self, key: CacheKey) -> Optional[Tuple[List[int], int]]:
+        """
+        Finds a cached answer for a normalized key, exactly or via monotone reuse.
+
+        Args:
+            key (CacheKey): Normalized (balance, options) key.
+
+        Returns:
+            Optional[Tuple[List[int], int]]: Cached (sequence, total) or None.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        balance, options = key
+        balances = self._balances.get(options)
+        if not balances or (options and options[0] < 0):
+            return None
+
+        # Smallest cached balance above ours: totals grow with the balance, so if
+        # this one's total fits, it is the best any subset can reach.
+        idx = bisect_right(balances, balance)
+        if idx < len(balances):
+            seq, total = self._entries[(balances[idx], options)]
+            if total <= balance:
+                return self._reuse(key, seq, total)
+
+        # Largest cached balance below ours: if it already takes every option,
+        # a bigger balance cannot do better.
+        idx = bisect_left(balances, balance) - 1
+        if idx >= 0:
+            seq, total = self._entries[(balances[idx], options)]
+            if total == sum(options):
+                return self._reuse(key, seq, total)
+        return None
+
+    def clear(self) -> None:
+        """
+        Drops every cached entry (and the persisted file contents when enabled).
+        """
+        self._entries.clear()
+        self._balances.clear()
+        self.hits = self.misses = 0
+        if self.persist:
+            self._save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _reuse(self, key: CacheKey, seq: List[int], total: int) -> Tuple[List[int], int]:
+        """Stores a monotone reuse under its own key so the next query is an exact hit."""
+        self._put(key, seq, total)
+        return self._entries[key]
+
+    def _put(self, key: CacheKey, seq: List[int], total: int) -> None:
+        """Inserts an entry, evicting the least recently used one when full."""
+        if key not in self._entries:
+            insort(self._balances.setdefault(key[1], []), key[0])
+        self._entries[key] = (list(seq), total)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            (old_balance, old_options), _ = self._entries.popitem(last=False)
+            balances = self._balances[old_options]
+            balances.pop(bisect_left(balances, old_balance))
+            if not balances:
+                del self._balances[old_options]
+
+    def _load(self) -> None:
+        """Loads persisted entries (oldest first) if the cache file exists."""
+        if not Path(self.cache_file).exists():
+            return
+        res = FileManager.read_file_json(self.cache_file)
+        if not res.ok or not isinstance(res.data, list):
+            return
+        for item in res.data:
+            try:
+                key = self.normalize(item["balance"], item["options"])
+                self._put(key, item["sequence"], int(item["total"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def _save(self) -> None:
+        """Persists entries in LRU order (least recently used first)."""
+        data = [
+            {"balance": balance, "options": list(options), "sequence": seq, "total": total}
+            for (balance, options), (seq, total) in self._entries.items()
+        ]
+        FileManager.write_file(self.cache_file, data, mode='w')
@@ -1,11 +1,16 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Set
+import datetime
 from pybet.helpers.FileManager import FileManager
 from pybet.models.OperationResult import OperationResult
 from pybet.models.DataPersistence import DataPersistence
+from pybet.models.EventLog import HISTORY_POPPED
 
 class PlayerHistory:
     """
     Manages a single player's action history embedded in players.json.
+
+    players.json keeps the last `max_size` actions; every action pushed is also
+    kept in the history archive (see get_archived()).
     """
 
     def __init__(self, player_id: str, max_size: int = 10) -> None:
@@ -17,50 +22,48 @@ class PlayerHistory:
 
     def push(self, action: str) -> OperationResult:
         """
-        Appends an action to the player's history (keeping only last max_size entries).
+        Appends an action to the player's history (keeping only last max_size entries
+        in players.json, and every one in the history archive).
 
         Returns:
             OperationResult: ok=True if saved; data=None; error otherwise.
         """
-        map_res = self._load_map()
-        if not map_res.ok:
-            return map_res
-
-        players_map = map_res.data
-        if self.player_id not in players_map:
-            return OperationResult(ok=False, error="Player not found.")
+        def append(players_map: Dict[str, Any], changed: Set[str]) -> OperationResult:
+            if self.player_id not in players_map:
+                return OperationResult(ok=False, error="Player not found.")
 
-        history_list: List[str] = players_map[self.player_id].get("history", [])
-        history_list.append(action)
-        # Keep only last `max_size`
-        history_list = history_list[-self.max_size:]
-        players_map[self.player_id]["history"] = history_list
+            history_list: List[str] = players_map[self.player_id].get("history", [])
+            history_list.append(action)
+            DataPersistence.record_history(self.player_id, [action])
+            # Keep only last `max_size`
+            players_map[self.player_id]["history"] = history_list[-self.max_size:]
+            changed.add(self.player_id)
+            return OperationResult(ok=True)
 
-        return DataPersistence.save_players_map(players_map)
+        return DataPersistence.transact(append)
 
     def pop(self) -> OperationResult:
         """
-        Removes and returns the last action from the player's history.
+        Removes and returns the last action from the player's history (it stays in
+        the history archive).
 
         Returns:
             OperationResult: ok=True and data=string of popped action; error otherwise.
         """
-        map_res = self._load_map()
-        if not map_res.ok:
-            return map_res
-
-        players_map = map_res.data
-        if self.player_id not in players_map:
-            return OperationResult(ok=False, error="Player not found.")
+        def remove_last(players_map: Dict[str, Any], changed: Set[str]) -> OperationResult:
+            if self.player_id not in players_map:
+                return OperationResult(ok=False, error="Player not found.")
 
-        history_list: List[str] = players_map[self.player_id].get("history", [])
-        if not history_list:
-            return OperationResult(ok=False, error="No history.")
-        action = history_list.pop()
-        players_map[self.player_id]["history"] = history_list
+            history_list: List[str] = players_map[self.player_id].get("history", [])
+            if not history_list:
+                return OperationResult(ok=False, error="No history.")
+            action = history_list.pop()
+            players_map[self.player_id]["history"] = history_list
+            changed.add(self.player_id)
+            DataPersistence.record_event(HISTORY_POPPED, {"player_id": self.player_id, "entry": action})
+            return OperationResult(ok=True, data=action)
 
-        save_res = DataPersistence.save_players_map(players_map)
-        return OperationResult(ok=save_res.ok, data=action, error=save_res.error)
+        return DataPersistence.transact(remove_last)
 
     def get_all(self) -> OperationResult:
         """
@@ -75,4 +78,15 @@ class PlayerHistory:
         players_map = map_res.data
         if self.player_id not in players_map:
             return OperationResult(ok=False, error="Player not found.")
-        return OperationResult(ok=True, data=players_map[self.player_id].get("history", []))
\ No newline at end of file
+        return OperationResult(ok=True, data=players_map[self.player_id].get("history", []))
+
+    def get_archived(self, since: Optional[datetime.datetime] = None,
+                     until: Optional[datetime.datetime] = None) -> OperationResult:
+        """
+        Retrieves the player's complete history from the history archive,
+        optionally only the actions recorded within [since, until].
+
+        Returns:
+            OperationResult: ok=True and data=List[Dict] (at, player_id, entry), oldest first; error otherwise.
+        """
+        return DataPersistence.history_entries(self.player_id, since, until)
@@ -0,0 +1,220 @@
+"""
+Materialized, versioned report cache.
+
+Each exported report is recorded in a manifest together with the data version
+(DataPersistence.data_version) it was computed from, and its entries are kept
+in a sidecar file. When a report is requested again:
+    - If the data version (and, for earnings reports, the earnings file) has not
+      changed and its files exist, nothing is recomputed or rewritten.
+    - Incremental reports (IncrementalAggregator) replay only the players changed
+      since the cached version, using their saved per-player state.
+    - Every other report is recomputed: reports that can be answered from the
+      player indexes (DataPersistence.indexes) read them directly, and the rest
+      share a single scan of the indexed records.
+Given a PlayerSnapshot, every report is computed from that one pinned state
+(see DataPersistence.snapshot), however long the run and whatever is saved
+meanwhile.
+"""
+
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pybet.helpers.EarningsTracker import EARNINGS_FILE
+from pybet.helpers.FileManager import FileManager
+from pybet.logic.ReportEngine import (
+    REPORTS_DIR,
+    IncrementalAggregator,
+    ReportAggregator,
+    ReportEngine,
+    ReportResult,
+)
+from pybet.models.DataPersistence import DataPersistence
+from pybet.models.OperationResult import OperationResult
+from pybet.models.Player import Player
+from pybet.models.PlayerSnapshot import PlayerSnapshot
+
+CACHE_DIR_NAME = '.report_cache'
+
+
+class ReportCache:
+    """
+    Generates reports through ReportEngine, skipping or incrementally updating
+    those whose underlying data has not changed since they were last exported.
+    """
+
+    def __init__(self, directory: str = REPORTS_DIR) -> None:
+        """
+        Args:
+            directory (str): Directory the reports are exported to; the cache lives in
+                its .report_cache subdirectory.
+        """
+        self.directory = directory
+        self.cache_dir = f"{directory}/{CACHE_DIR_NAME}"
+        self.manifest_file = f"{self.cache_dir}/manifest.json"
+
+    def generate(self,
+                 players: Callable[[], Iterable[Player]],
+                 aggregators: List[ReportAggregator],
+                 formats: tuple = ('json', 'csv'),
+                 compress: bool = False,
+                 force: bool = False,
+                 snapshot: Optional[PlayerSnapshot] = None) -> OperationResult:
+        """
+        Produces and exports the given reports, reusing cached output when possible.
+
+        Args:
+            players (Callable[[], Iterable[Player]]): Opens a player stream; only called
+                if at least one report needs a full scan and the player indexes were
+                not loaded for an indexed report.
+            aggregators (List[ReportAggregator]): Reports to produce.
+            formats (tuple): Export formats (see ReportEngine.export).
+            compress (bool): Gzip the exported files.
+            force (bool): Ignore the cache and recompute everything.
+            snapshot (Optional[PlayerSnapshot]): Compute every report as of this
+                snapshot (`players` must then stream it too). The live player
+                indexes are not used, as they may be newer.
+
+        Returns:
+            OperationResult: ok/data (List[ReportResult], in the order of `aggregators`,
+                each with its status and exported paths) or error.
+        """
+        version = snapshot.version if snapshot is not None else DataPersistence.data_version()
+        earnings_fp = self._fingerprint(EARNINGS_FILE)
+        manifest = self._load_manifest()
+
+        results: Dict[int, ReportResult] = {}
+        to_scan: List[ReportAggregator] = []
+        players_map: Optional[Dict[str, Any]] = None
+
+        for idx, aggregator in enumerate(aggregators):
+            entry = None if force else manifest.get(aggregator.cache_key)
+            if entry is None:
+                to_scan.append(aggregator)
+                continue
+
+            # 1. Unchanged: reuse the exported files as they are
+            expected = ReportEngine.export_paths(aggregator.name, self.directory, formats, compress)
+            same_data = entry.get("version") == version and (
+                not aggregator.uses_earnings or entry.get("earnings") == earnings_fp
+            )
+            if same_data and entry.get("paths") == expected and all(os.path.exists(p) for p in expected):
+                sidecar = self._load_sidecar(entry)
+                if sidecar is not None:
+                    result = ReportResult(aggregator, sidecar.get("entries", []), status='cached')
+                    result.paths = expected
+                    results[idx] = result
+                    continue
+
+            # 2. Incremental: apply the players changed since the cached version
+            if isinstance(aggregator, IncrementalAggregator):
+                changes = DataPersistence.changes_since(str(entry.get("version")),
+                                                        until=snapshot.version if snapshot is not None else None)
+                sidecar = self._load_sidecar(entry) if changes.ok else None
+                if sidecar is not None and isinstance(sidecar.get("state"), dict):
+                    changed: Dict[str, Optional[Player]] = {}
+                    if changes.data:
+                        if players_map is None:
+                            # Changed after the snapshot too: applying its state for them is harmless
+                            map_res = (snapshot.load_players_map() if snapshot is not None
+                                       else DataPersistence.load_players_map())
+                            if not map_res.ok:
+                                return map_res
+                            players_map = map_res.data
+                        changed = {
+                            pid: Player.from_dict(players_map[pid]) if pid in players_map else None
+                            for pid in changes.data
+                        }
+                    aggregator.set_state(sidecar["state"])
+                    aggregator.apply_changes(changed)
+                    results[idx] = ReportResult(aggregator, aggregator.entries(), status='incremental')
+                    continue
+
+            # 3. Anything else is recomputed in the shared scan
+            to_scan.append(aggregator)
+
+        if to_scan:
+            stream: Iterable[Player]
+            indexed = [aggregator for aggregator in to_scan if aggregator.indexed and snapshot is None]
+            if indexed:
+                # 3a. Reports answerable from the player indexes skip the scan, and
+                # the rest then scan the indexed records instead of re-reading the file
+                idx_res = DataPersistence.indexes()
+                if not idx_res.ok:
+                    return idx_res
+                for aggregator in indexed:
+                    results[aggregators.index(aggregator)] = ReportResult(
+                        aggregator, aggregator.from_indexes(idx_res.data), status='indexed'
+                    )
+                to_scan = [aggregator for aggregator in to_scan if not aggregator.indexed]
+                stream = idx_res.data.iter_players()
+            else:
+                stream = players()
+
+            if to_scan:
+                # 3b. Everything else shares a single scan
+                run_res = ReportEngine(to_scan).run(stream)
+                if not run_res.ok:
+                    return run_res
+                scanned = iter(run_res.data)
+                for idx, aggregator in enumerate(aggregators):
+                    if idx not in results:
+                        results[idx] = next(scanned)
+
+        ordered = [results[idx] for idx in range(len(aggregators))]
+        for result in ordered:
+            if result.status == 'cached' or not result.aggregator.exportable():
+                continue
+            export_res = ReportEngine.export(result, self.directory, formats=formats, compress=compress)
+            if not export_res.ok:
+                return export_res
+            result.paths = export_res.data
+            manifest[result.aggregator.cache_key] = self._store(result, version, earnings_fp)
+
+        self._save_manifest(manifest)
+        return OperationResult(ok=True, data=ordered)
+
+    def clear(self) -> OperationResult:
+        """
+        Forgets every cached report (exported files are left in place).
+        """
+        return FileManager.write_file(self.manifest_file, {}, mode='w')
+
+    def _store(self, result: ReportResult, version: str, earnings_fp: Optional[str]) -> Dict[str, Any]:
+        """Writes the sidecar of an exported result and returns its manifest entry."""
+        aggregator = result.aggregator
+        sidecar_file = f"{self.cache_dir}/{re.sub(r'[^A-Za-z0-9_.-]', '_', aggregator.cache_key)}.json"
+        state = aggregator.get_state() if isinstance(aggregator, IncrementalAggregator) else None
+        FileManager.write_file_json_stream(sidecar_file, [{"entries": result.entries, "state": state}])
+        return {"version": version, "earnings": earnings_fp, "paths": result.paths, "sidecar": sidecar_file}
+
+    @staticmethod
+    def _load_sidecar(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Returns the cached entries/state of a manifest entry, or None if unavailable."""
+        sidecar_file = entry.get("sidecar")
+        if not sidecar_file or not os.path.exists(sidecar_file):
+            return None
+        res = FileManager.read_file_json(sidecar_file)
+        if not res.ok or not isinstance(res.data, list) or len(res.data) != 1:
+            return None
+        return res.data[0]
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Reads the manifest (report cache key → entry)."""
+        if not os.path.exists(self.manifest_file):
+            return {}
+        res = FileManager.read_file_json(self.manifest_file)
+        return res.data if res.ok and isinstance(res.data, dict) else {}
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Persists the manifest."""
+        FileManager.write_file(self.manifest_file, manifest, mode='w')
+
+    @staticmethod
+    def _fingerprint(path: str) -> Optional[str]:
+        """Size and modification time of a file, or None if it does not exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return f"{st.st_size}-{st.st_mtime_ns}"
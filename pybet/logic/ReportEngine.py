@@ -0,0 +1,483 @@
+"""
+Single-pass report engine.
+
+Every report is an aggregator that consumes players one at a time. The engine
+streams the players once and feeds each of them to all registered aggregators,
+so any number of reports costs a single scan of players.json.
+"""
+
+from abc import ABC, abstractmethod
+import heapq
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pybet.helpers.FileManager import FileManager
+from pybet.logic.Algorithms import Algorithms
+from pybet.models.OperationResult import OperationResult
+from pybet.models.Player import Player
+from pybet.models.PlayerIndex import PlayerIndexes
+
+REPORTS_DIR: str = './pybet/data/reports'
+
+# (label, style, justify) for each rendered table column
+ColumnSpec = Tuple[str, str, str]
+
+
+class ReportAggregator(ABC):
+    """
+    Base class for reports computed from a stream of players.
+
+    Subclasses accumulate state in consume() and return their final, ordered
+    entries from entries(). The *_item/_row methods turn one entry into its JSON,
+    CSV and table representation.
+
+    Attributes:
+        name (str): File stem of the exported report.
+        title (str): Title shown above the table.
+        header (List[str]): CSV header.
+        columns (List[ColumnSpec]): Table columns.
+        limit (Optional[int]): Maximum number of entries exported and displayed (None = all).
+        uses_earnings (bool): Whether the report also depends on the earnings file.
+        indexed (bool): Whether from_indexes() can answer the report without a scan.
+    """
+    name: str = ''
+    title: str = ''
+    header: List[str] = []
+    columns: List[ColumnSpec] = []
+    limit: Optional[int] = None
+    uses_earnings: bool = False
+    indexed: bool = False
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies the report and its parameters in the report cache."""
+        return self.name if self.limit is None else f"{self.name}:limit={self.limit}"
+
+    def exportable(self) -> bool:
+        """Whether the result should be exported (and cached) after the scan."""
+        return True
+
+    @abstractmethod
+    def consume(self, player: Player) -> None:
+        """Accumulates one player."""
+
+    @abstractmethod
+    def entries(self) -> List[Any]:
+        """Returns the aggregated entries in report order."""
+
+    def from_indexes(self, indexes: PlayerIndexes) -> List[Any]:
+        """
+        Returns the entries computed from the player indexes. By default every
+        indexed record is consumed; `indexed` reports override it with a cheaper walk.
+        """
+        for record in indexes.records.values():
+            self.consume(Player.from_dict(record))
+        return self.entries()
+
+    @abstractmethod
+    def json_item(self, rank: int, entry: Any) -> Any:
+        """JSON representation of an entry (rank starts at 1)."""
+
+    @abstractmethod
+    def csv_row(self, rank: int, entry: Any) -> List[str]:
+        """CSV row of an entry (rank starts at 1)."""
+
+    def table_row(self, rank: int, entry: Any) -> List[str]:
+        """Table row of an entry; the CSV row unless overridden."""
+        return self.csv_row(rank, entry)
+
+
+class IncrementalAggregator(ReportAggregator):
+    """
+    Aggregator whose output is derived from an independent contribution per player.
+
+    Keeping the contributions as state lets the report be updated from the
+    players changed since the last run instead of a full scan. Contributions
+    must be JSON-serializable; they are kept in scan (file) order.
+    """
+
+    def __init__(self) -> None:
+        self._contrib: Dict[str, Any] = {}
+
+    @abstractmethod
+    def contribution(self, player: Player) -> Any:
+        """Returns what one player adds to the report."""
+
+    @abstractmethod
+    def build_entries(self, contributions: Dict[str, Any]) -> List[Any]:
+        """Builds the ordered entries from every player's contribution."""
+
+    def consume(self, player: Player) -> None:
+        self._contrib[player.id] = self.contribution(player)
+
+    def entries(self) -> List[Any]:
+        return self.build_entries(self._contrib)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Returns the per-player contributions."""
+        return self._contrib
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restores contributions previously returned by get_state()."""
+        self._contrib = dict(state)
+
+    def apply_changes(self, changed: Dict[str, Optional[Player]]) -> None:
+        """
+        Updates the state with changed players.
+
+        Args:
+            changed (Dict[str, Optional[Player]]): Changed player ID → current Player,
+                or None if the player was deleted.
+        """
+        for player_id, player in changed.items():
+            if player is None:
+                self._contrib.pop(player_id, None)
+            else:
+                self._contrib[player_id] = self.contribution(player)
+
+
+class ReportResult:
+    """
+    Output of one aggregator after a scan.
+
+    Attributes:
+        aggregator (ReportAggregator): The aggregator that produced it.
+        entries (List[Any]): Aggregated entries in report order (before the aggregator's limit).
+        status (str): 'full' (scanned), 'indexed' (read from the player indexes),
+            'incremental' (updated from changes) or 'cached' (unchanged).
+        paths (List[str]): Exported files, once exported.
+    """
+
+    def __init__(self, aggregator: ReportAggregator, entries: List[Any], status: str = 'full') -> None:
+        self.aggregator = aggregator
+        self.entries = entries
+        self.status = status
+        self.paths: List[str] = []
+
+    def __len__(self) -> int:
+        limit = self.aggregator.limit
+        return len(self.entries) if limit is None else min(limit, len(self.entries))
+
+    @property
+    def name(self) -> str:
+        return self.aggregator.name
+
+    @property
+    def title(self) -> str:
+        return self.aggregator.title
+
+    def iter_json(self) -> Iterator[Any]:
+        """Yields the JSON item of each entry."""
+        for rank, entry in enumerate(islice(self.entries, len(self)), 1):
+            yield self.aggregator.json_item(rank, entry)
+
+    def iter_csv_rows(self) -> Iterator[List[str]]:
+        """Yields the CSV row of each entry."""
+        for rank, entry in enumerate(islice(self.entries, len(self)), 1):
+            yield self.aggregator.csv_row(rank, entry)
+
+    def iter_table_rows(self) -> Iterator[List[str]]:
+        """Yields the table row of each entry."""
+        for rank, entry in enumerate(islice(self.entries, len(self)), 1):
+            yield self.aggregator.table_row(rank, entry)
+
+    def table_page(self, offset: int, limit: int) -> List[List[str]]:
+        """Returns the table rows of entries [offset, offset + limit) only."""
+        end = min(offset + limit, len(self))
+        return [self.aggregator.table_row(rank, self.entries[rank - 1]) for rank in range(offset + 1, end + 1)]
+
+
+class ReportEngine:
+    """
+    Runs registered aggregators over a single stream of players and exports their results.
+    """
+
+    def __init__(self, aggregators: Optional[List[ReportAggregator]] = None) -> None:
+        self.aggregators: List[ReportAggregator] = list(aggregators or [])
+
+    def register(self, aggregator: ReportAggregator) -> 'ReportEngine':
+        """
+        Adds an aggregator to the next scan.
+
+        Returns:
+            ReportEngine: self, to allow chaining.
+        """
+        self.aggregators.append(aggregator)
+        return self
+
+    def run(self, players: Iterable[Player]) -> OperationResult:
+        """
+        Scans the players once, feeding every aggregator.
+
+        Args:
+            players (Iterable[Player]): Player stream, e.g. PlayerManager.iter_players(lazy=True)
+                (aggregators only read player attributes).
+
+        Returns:
+            OperationResult: ok/data (List[ReportResult], in registration order) or error.
+        """
+        try:
+            for player in players:
+                for aggregator in self.aggregators:
+                    aggregator.consume(player)
+            results = [ReportResult(a, a.entries()) for a in self.aggregators]
+        except Exception as e:
+            return OperationResult(ok=False, error=f"Error generating reports: {e}")
+        return OperationResult(ok=True, data=results)
+
+    @staticmethod
+    def export(result: ReportResult, directory: str = REPORTS_DIR,
+               formats: Tuple[str, ...] = ('json', 'csv'), compress: bool = False) -> OperationResult:
+        """
+        Streams a report to <name>.<format> files, row by row, without building intermediate lists.
+
+        Args:
+            result (ReportResult): The report to export.
+            directory (str): Target directory.
+            formats (Tuple[str, ...]): Any of 'json' (JSON array), 'jsonl' (JSON Lines) and 'csv'.
+            compress (bool): Gzip every file (a ".gz" suffix is added).
+
+        Returns:
+            OperationResult: ok/data (List[str], written paths in format order) or error.
+        """
+        paths: List[str] = []
+        for fmt, path in zip(formats, ReportEngine.export_paths(result.name, directory, formats, compress)):
+            if fmt == 'json':
+                res = FileManager.write_file_json_stream(path, result.iter_json(), compress=compress)
+            elif fmt == 'jsonl':
+                res = FileManager.write_file_jsonl(path, result.iter_json(), mode='w', compress=compress)
+            elif fmt == 'csv':
+                res = FileManager.write_file_csv(path, rows=result.iter_csv_rows(),
+                                                 header=result.aggregator.header, mode='w', compress=compress)
+            else:
+                return OperationResult(ok=False, error=f'Invalid report format "{fmt}".')
+            if not res.ok:
+                return res
+            paths.append(path)
+        return OperationResult(ok=True, data=paths)
+
+    @staticmethod
+    def export_paths(name: str, directory: str, formats: Tuple[str, ...], compress: bool) -> List[str]:
+        """
+        Returns the files export() writes for a report name, in format order.
+        """
+        suffix = '.gz' if compress else ''
+        return [f"{directory}/{name}.{fmt}{suffix}" for fmt in formats]
+
+
+class _Descending:
+    """Wraps a value so that it compares in reverse order (for heap keys)."""
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __lt__(self, other: '_Descending') -> bool:
+        return self.value > other.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+
+class TopBalancesAggregator(ReportAggregator):
+    """
+    Players by account balance, descending, ties by player ID. With top_n only a
+    bounded heap of the best n players is kept during the scan, and from the
+    balance index only those n (plus ties) are read.
+    """
+    name = 'top_balances'
+    title = 'Top Balances'
+    header = ["Rank", "Name", "Balance"]
+    columns = [("Posición", "cyan", "right"), ("Nombre", "magenta", "left"), ("Saldo", "green", "right")]
+    indexed = True
+
+    def __init__(self, top_n: Optional[int] = None) -> None:
+        self.top_n = top_n
+        self.limit = top_n
+        # (cents, id, name, balance): the heap root is the lowest balance, and
+        # among equal balances the highest ID, i.e. the first one to drop
+        self._heap: List[Tuple[int, _Descending, str, float]] = []
+
+    def consume(self, player: Player) -> None:
+        item = (Algorithms.to_cents(player.account_balance), _Descending(player.id), player.name, player.account_balance)
+        if self.top_n is None:
+            self._heap.append(item)
+        elif len(self._heap) < self.top_n:
+            heapq.heappush(self._heap, item)
+        elif self.top_n > 0 and self._heap[0] < item:
+            heapq.heapreplace(self._heap, item)
+
+    def entries(self) -> List[Tuple[str, float]]:
+        ordered = Algorithms.MergeSortBottomUp(self._heap, key=lambda it: (-it[0], it[1].value))
+        return [(name, balance) for _, _, name, balance in ordered]
+
+    def from_indexes(self, indexes: PlayerIndexes) -> List[Tuple[str, float]]:
+        # Walk down the balance index; with top_n, stop once n players are read
+        # and the cent amount changes, so every tie at the cut-off is ranked by ID
+        items: List[Tuple[int, str, str, float]] = []
+        for balance, player_id in indexes.balance.range(descending=True):
+            cents = Algorithms.to_cents(balance)
+            if self.top_n is not None and len(items) >= self.top_n and (not items or cents != items[-1][0]):
+                break
+            items.append((cents, player_id, indexes.records[player_id].get("name", ""), balance))
+        ordered = Algorithms.MergeSortBottomUp(items, key=lambda it: (-it[0], it[1]))
+        if self.top_n is not None:
+            ordered = ordered[:self.top_n]
+        return [(name, balance) for _, _, name, balance in ordered]
+
+    def json_item(self, rank: int, entry: Tuple[str, float]) -> Dict[str, Any]:
+        return {"rank": rank, "name": entry[0], "balance": entry[1]}
+
+    def csv_row(self, rank: int, entry: Tuple[str, float]) -> List[str]:
+        return [str(rank), entry[0], f"{entry[1]:.2f}"]
+
+
+class EarningsRankingAggregator(ReportAggregator):
+    """
+    Players by net earnings (from EarningsTracker), descending. The scan only
+    resolves the names of players that have earnings.
+    """
+    name = 'earnings_ranking'
+    title = 'Ranking de Ganancias Netas (Historial)'
+    header = ["Rank", "Name", "PlayerID", "NetEarnings"]
+    columns = [("Posición", "cyan", "right"), ("Nombre", "magenta", "left"),
+               ("ID", "magenta", "left"), ("Ganancia Neta", "green", "right")]
+    uses_earnings = True
+
+    def __init__(self, earnings: Dict[str, float]) -> None:
+        self.earnings = earnings
+        self._names: Dict[str, str] = {}
+
+    def consume(self, player: Player) -> None:
+        if player.id in self.earnings:
+            self._names[player.id] = player.name
+
+    def entries(self) -> List[Tuple[str, str, float]]:
+        ordered = Algorithms.MergeSortBottomUp(
+            list(self.earnings.items()), key=lambda item: item[1], reverse=True, in_place=True
+        )
+        return [(self._names.get(pid, "<desconocido>"), pid, total) for pid, total in ordered]
+
+    def json_item(self, rank: int, entry: Tuple[str, str, float]) -> Dict[str, Any]:
+        return {"rank": rank, "name": entry[0], "player_id": entry[1], "net_earnings": entry[2]}
+
+    def csv_row(self, rank: int, entry: Tuple[str, str, float]) -> List[str]:
+        return [str(rank), entry[0], entry[1], f"{entry[2]:.2f}"]
+
+
+class PlayerHistoryAggregator(ReportAggregator):
+    """
+    History of a single player. `found` tells whether the player was seen in the scan.
+    """
+    header = ["Action"]
+    columns = [("N.º", "cyan", "right"), ("Acción", "magenta", "left")]
+
+    def __init__(self, player_id: str) -> None:
+        self.player_id = player_id
+        self.name = f'history_{player_id}'
+        self.title = f'Historial de {player_id}'
+        self.found = False
+        self._actions: List[str] = []
+
+    def exportable(self) -> bool:
+        return self.found
+
+    def consume(self, player: Player) -> None:
+        if player.id == self.player_id:
+            self.found = True
+            self._actions = list(player.history)
+
+    def entries(self) -> List[str]:
+        return self._actions
+
+    def json_item(self, rank: int, entry: str) -> str:
+        return entry
+
+    def csv_row(self, rank: int, entry: str) -> List[str]:
+        return [entry]
+
+    def table_row(self, rank: int, entry: str) -> List[str]:
+        return [str(rank), entry]
+
+
+class AllHistoriesAggregator(ReportAggregator):
+    """
+    Histories of every player in one export, one row per action.
+    """
+    name = 'histories'
+    title = 'Historial de Jugadores'
+    header = ["PlayerID", "N", "Action"]
+    columns = [("ID", "cyan", "left"), ("N.º", "cyan", "right"), ("Acción", "magenta", "left")]
+
+    def __init__(self) -> None:
+        self._rows: List[Tuple[str, int, str]] = []
+
+    def consume(self, player: Player) -> None:
+        for idx, action in enumerate(player.history, 1):
+            self._rows.append((player.id, idx, action))
+
+    def entries(self) -> List[Tuple[str, int, str]]:
+        return self._rows
+
+    def json_item(self, rank: int, entry: Tuple[str, int, str]) -> Dict[str, Any]:
+        return {"player_id": entry[0], "n": entry[1], "action": entry[2]}
+
+    def csv_row(self, rank: int, entry: Tuple[str, int, str]) -> List[str]:
+        return [entry[0], str(entry[1]), entry[2]]
+
+
+class LossCountsAggregator(IncrementalAggregator):
+    """
+    Players by number of lost plays in their history, descending.
+    """
+    name = 'loss_counts'
+    title = 'Ranking de Pérdidas'
+    header = ["Rank", "Name", "LossCount"]
+    columns = [("Posición", "cyan", "right"), ("Nombre", "magenta", "left"), ("Cant. Pérdidas", "red", "right")]
+
+    def contribution(self, player: Player) -> List[Any]:
+        count = sum(1 for action in player.history if "lost" in action.lower())
+        return [player.name, count]
+
+    def build_entries(self, contributions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        losses = [{"name": name, "loss_count": count} for name, count in contributions.values()]
+        return Algorithms.CountingSort(losses, key=lambda x: x["loss_count"], reverse=True, in_place=True)
+
+    def json_item(self, rank: int, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return entry
+
+    def csv_row(self, rank: int, entry: Dict[str, Any]) -> List[str]:
+        return [str(rank), entry["name"], str(entry["loss_count"])]
+
+
+class GameParticipationAggregator(IncrementalAggregator):
+    """
+    Number of plays of each game across all histories.
+    """
+    name = 'game_participation'
+    title = 'Participación por Juego'
+    header = ["Game", "Count"]
+    columns = [("Juego", "cyan", "left"), ("Cantidad", "magenta", "right")]
+    GAMES: Dict[str, str] = {"Tragamonedas": "tragamonedas", "Adivinanzas": "adivinanzas"}
+
+    def contribution(self, player: Player) -> List[int]:
+        counts = [0] * len(self.GAMES)
+        for action in player.history:
+            low = action.lower()
+            for idx, marker in enumerate(self.GAMES.values()):
+                if marker in low:
+                    counts[idx] += 1
+        return counts
+
+    def build_entries(self, contributions: Dict[str, Any]) -> List[Tuple[str, int]]:
+        totals = [0] * len(self.GAMES)
+        for counts in contributions.values():
+            for idx, count in enumerate(counts):
+                totals[idx] += count
+        return list(zip(self.GAMES, totals))
+
+    def json_item(self, rank: int, entry: Tuple[str, int]) -> Dict[str, Any]:
+        return {"game": entry[0], "count": entry[1]}
+
+    def csv_row(self, rank: int, entry: Tuple[str, int]) -> List[str]:
+        return [entry[0], str(entry[1])]
@@ -1,5 +1,7 @@
-from typing import List
-from pybet.helpers.FileManager import FileManager
+from typing import Any, Dict, List
+from pybet.helpers.FileManager import FileManager, log
+from pybet.models.EventBus import EventBus
+from pybet.models.EventLog import DEQUEUED, ENQUEUED, QUEUE_CLEARED
 from pybet.models.OperationResult import OperationResult
 
 QUEUE_FILE = './pybet/data/queue.json'
@@ -7,7 +9,7 @@ QUEUE_FILE = './pybet/data/queue.json'
 class WaitingQueue:
     """
     Implements a basic FIFO queue to manage player IDs,
-    persisted to queue.json.
+    persisted to queue.json. Every change is published on the EventBus.
     """
 
     def __init__(self) -> None:
@@ -20,12 +22,23 @@ class WaitingQueue:
     def _persist(self) -> None:
         FileManager.write_file(QUEUE_FILE, self.queue, mode='w')
 
+    @staticmethod
+    def _publish(event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Publishes a queue change. The change is already made, so a failure is only
+        logged: it must not make the caller believe the queue was left as it was.
+        """
+        publish_res = EventBus.publish([(event_type, data)])
+        if not publish_res.ok:
+            log.log(publish_res.error)
+
     def enqueue(self, player_id: str) -> OperationResult:
         """
         Adds a player ID to the end of the queue.
         """
         self.queue.append(player_id)
         self._persist()
+        self._publish(ENQUEUED, {"player_id": player_id, "position": len(self.queue) - 1})
         return OperationResult(ok=True)
 
     def dequeue(self) -> OperationResult:
@@ -36,6 +49,7 @@ class WaitingQueue:
             return OperationResult(ok=False, error="Queue is empty.")
         pid = self.queue.pop(0)
         self._persist()
+        self._publish(DEQUEUED, {"player_id": pid})
         return OperationResult(ok=True, data=pid)
 
     def peek(self) -> OperationResult:
@@ -58,4 +72,5 @@ class WaitingQueue:
         """
         self.queue.clear()
         self._persist()
+        self._publish(QUEUE_CLEARED, {})
         return OperationResult(ok=True)
\ No newline at end of file
@@ -14,6 +14,7 @@ from pybet.menus.HistoryMenu import view_history
 from pybet.menus.QueueMenu import manage_queue
 from pybet.menus.BacktrackingMenu import optimal_betting_path
 from pybet.menus.ReportsMenu import generate_reports
+from pybet.models.DataPersistence import DataPersistence
 
 console = Console()
 
@@ -21,6 +22,8 @@ def main():
     """
     Launch the main menu loop for the PyBet application, allowing users to manage players, play games, view history, manage the queue, find optimal betting paths, and generate reports.
     """
+    # The player indexes load while the menu waits for the first choice
+    DataPersistence.warm_up()
     while True:
         console.print("\n[bold cyan]=== Menú Principal ===[/bold cyan]")
         console.print("1. Gestionar Jugadores")
@@ -7,10 +7,12 @@ This module provides the interface for finding the optimal betting path using ba
 from typing import List
 from rich.console import Console
 from rich.table import Table
-from pybet.logic.Backtracking import Backtracking
+from pybet.logic.BacktrackingCache import BacktrackingCache
 from pybet.models.OperationResult import OperationResult
 
 console = Console()
+# Solutions are shared across menu runs and persisted under pybet/data
+solver_cache: BacktrackingCache = BacktrackingCache(persist=True)
 
 def optimal_betting_path() -> None:
     """
@@ -42,8 +44,8 @@ def optimal_betting_path() -> None:
                 console.print("[red]Opciones inválidas. Asegúrese de ingresar números enteros separados por coma.[/red]")
                 continue
 
-            solver = Backtracking(initial_balance, bet_options)
-            best_seq, best_total = solver.findOptimalPath()
+            hits_before: int = solver_cache.hits
+            best_seq, best_total = solver_cache.solve(initial_balance, bet_options)
 
             table = Table(title="Resultado de Apuesta Óptima")
             table.add_column("Saldo Inicial", justify="center", style="cyan")
@@ -59,6 +61,8 @@ def optimal_betting_path() -> None:
             )
 
             console.print(table)
+            if solver_cache.hits > hits_before:
+                console.print("[dim]Resultado obtenido desde la caché.[/dim]")
 
         elif choice == '0':
             break
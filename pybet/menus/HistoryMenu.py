@@ -27,6 +27,7 @@ def view_history() -> None:
             console.print("1. Mostrar todas las acciones")
             console.print("2. Agregar nueva acción")
             console.print("3. Eliminar última acción")
+            console.print("4. Mostrar historial completo (archivo)")
             console.print("0. Volver a selección de jugador")
             choice = console.input("[yellow]Seleccione:[/yellow] ").strip()
 
@@ -60,6 +61,20 @@ def view_history() -> None:
                     console.print(f"[red]Error:[/red] {res.error}")
                 get_res = hist.get_all()
 
+            elif choice == '4':
+                archived_res: OperationResult = hist.get_archived()
+                if not archived_res.ok:
+                    console.print(f"[red]Error:[/red] {archived_res.error}")
+                elif not archived_res.data:
+                    console.print("[italic]Sin historial archivado.[/italic]")
+                else:
+                    table = Table(title=f"Historial completo de {player_id}")
+                    table.add_column("Fecha", style="cyan")
+                    table.add_column("Acción", style="magenta")
+                    for item in archived_res.data:
+                        table.add_row(item["at"][:19].replace("T", " "), item["entry"])
+                    console.print(table)
+
             elif choice == '0':
                 break
             else:
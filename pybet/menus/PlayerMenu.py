@@ -4,20 +4,27 @@ Player management menu for the PyBet application.
 This module provides the interface for managing players, including adding, removing, and listing players in the system.
 """
 
-from typing import Optional
+from typing import Optional, List, Tuple, Dict
 from rich.console import Console
-from rich.table import Table
 from rich.text import Text
 
 from pybet.models.PlayerManager import PlayerManager
 from pybet.models.Player import Player
+from pybet.models.PlayerPage import PlayerPage
 from pybet.models.OperationResult import OperationResult
+from pybet.menus.TableViewer import ColumnSpec, PageFetcher, browse, render_page
 
 console = Console()
+PLAYER_COLUMNS: List[ColumnSpec] = [
+    ("ID", "cyan", "left"),
+    ("Nombre", "magenta", "left"),
+    ("Saldo", "green", "right"),
+    ("Creado en", "dim", "left"),
+]
 
 def manage_players() -> None:
     """
-    Menu for managing player operations: list, add, update, delete.
+    Menu for managing player operations: list, add, update, delete, search.
     Uses PlayerManager, which stores all players in players.json.
     """
     manager = PlayerManager()
@@ -28,29 +35,12 @@ def manage_players() -> None:
         console.print("2. Agregar nuevo jugador")
         console.print("3. Actualizar jugador")
         console.print("4. Eliminar jugador")
+        console.print("5. Buscar jugador por nombre")
         console.print("0. Volver al menú principal")
         sub: str = console.input("[yellow]Seleccione una opción:[/yellow] ").strip()
 
         if sub == '1':
-            res: OperationResult = manager.get_all_players()
-            if not res.ok:
-                console.print(f"[red]Error:[/red] {res.error}")
-            else:
-                players: list[Player] = res.data
-                if not players:
-                    console.print("[italic]No hay jugadores.[/italic]")
-                else:
-                    # Construct table with Rich
-                    table = Table(title="Jugadores Registrados")
-                    table.add_column("ID", style="cyan", no_wrap=True)
-                    table.add_column("Nombre", style="magenta")
-                    table.add_column("Saldo", style="green", justify="right")
-                    table.add_column("Creado en", style="dim")
-
-                    for p in players:
-                        table.add_row(p.id, p.name, f"{p.account_balance:.2f}", p.created_at)
-
-                    console.print(table)
+            browse("Jugadores Registrados", PLAYER_COLUMNS, _players_fetcher(manager))
 
         elif sub == '2':
             name: str = console.input("[yellow]Ingrese nombre completo:[/yellow] ").strip()
@@ -95,7 +85,50 @@ def manage_players() -> None:
             else:
                 console.print(f"[red]Error:[/red] {res.error}")
 
+        elif sub == '5':
+            query: str = console.input("[yellow]Ingrese nombre (o su comienzo):[/yellow] ").strip()
+            res: OperationResult = manager.search_players(query)
+            if not res.ok:
+                console.print(f"[red]Error:[/red] {res.error}")
+            elif not res.data:
+                console.print("[italic]Sin resultados.[/italic]")
+            else:
+                rows = [[p.id, p.name, f"{p.account_balance:.2f}", p.created_at] for p in res.data]
+                render_page(f"Búsqueda: “{query}”", PLAYER_COLUMNS, rows)
+
         elif sub == '0':
             break
         else:
-            console.print("[red]Opción inválida, intente de nuevo.[/red]")
\ No newline at end of file
+            console.print("[red]Opción inválida, intente de nuevo.[/red]")
+
+
+def _players_fetcher(manager: PlayerManager) -> PageFetcher:
+    """
+    Builds the paginated viewer's data source from PlayerManager.list_players.
+
+    Players are listed by creation date; a search is a name prefix. The cursor
+    reached at each page offset is remembered, so going back or jumping to a page
+    already seen costs one page fetch, and jumping ahead only walks the pages in between.
+    """
+    # (query, offset) → cursor of the page starting at that offset (None for the first page)
+    cursors: Dict[Tuple[Optional[str], int], Optional[str]] = {}
+
+    def fetch(offset: int, limit: int, query: Optional[str]) -> Tuple[List[List[str]], int]:
+        filters = {"name_prefix": query} if query else None
+        known = max((o for (q, o) in cursors if q == query and o <= offset), default=0)
+        cursor = cursors.get((query, known))
+        while True:
+            res: OperationResult = manager.list_players(sort_by="created_at", filters=filters,
+                                                        limit=limit, after_cursor=cursor)
+            if not res.ok:
+                console.print(f"[red]Error:[/red] {res.error}")
+                return [], 0
+            page: PlayerPage = res.data
+            if known >= offset or page.next_cursor is None:
+                break
+            known += limit
+            cursor = page.next_cursor
+            cursors[(query, known)] = cursor
+        return [[p.id, p.name, f"{p.account_balance:.2f}", p.created_at] for p in page], page.total
+
+    return fetch
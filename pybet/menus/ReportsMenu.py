@@ -2,26 +2,37 @@
 Reports menu for the PyBet application.
 
 This module provides the interface for generating various reports related to player balances, earnings, history, losses, and participation.
+Every report is computed by the single-pass ReportEngine; "Generar todos" produces all of them from one scan of the players.
+Reports are cached by ReportCache: unchanged reports are not regenerated, and incremental ones only process the players that changed.
 """
 
-from typing import List, Dict
+from functools import partial
+from typing import List
 from pathlib import Path
-import csv
+import math
 
 from rich.console import Console
-from rich.table import Table
 
 from pybet.models.PlayerManager import PlayerManager
 from pybet.models.OperationResult import OperationResult
-from pybet.logic.PlayerHistory import PlayerHistory
-from pybet.models.Player import Player
-from pybet.helpers.FileManager import FileManager
+from pybet.logic.ReportCache import ReportCache
+from pybet.logic.ReportEngine import (
+    REPORTS_DIR,
+    ReportAggregator,
+    ReportResult,
+    TopBalancesAggregator,
+    EarningsRankingAggregator,
+    PlayerHistoryAggregator,
+    AllHistoriesAggregator,
+    LossCountsAggregator,
+    GameParticipationAggregator,
+)
+from pybet.menus.TableViewer import PAGE_SIZE, browse, list_fetcher, render_page
 # Import EarningsTracker for earnings report
 from pybet.helpers.EarningsTracker import EarningsTracker
 
 console = Console()
 DATA_FILE: str = './pybet/data/players.json'
-REPORTS_DIR: str = './pybet/data/reports'
 
 def generate_reports() -> None:
     """
@@ -39,6 +50,7 @@ def generate_reports() -> None:
         console.print("3. Historial de Jugador (por jugador)")
         console.print("4. Ranking de Pérdidas")
         console.print("5. Participación por Juego")
+        console.print("6. Generar todos (una sola lectura)")
         console.print("0. Volver al menú principal")
         choice: str = console.input("[yellow]Seleccione un reporte:[/yellow] ").strip()
 
@@ -52,53 +64,77 @@ def generate_reports() -> None:
             _report_loss_counts(manager)
         elif choice == '5':
             _report_game_participation(manager)
+        elif choice == '6':
+            _report_all(manager)
         elif choice == '0':
             break
         else:
             console.print("[red]Opción inválida, intente de nuevo.[/red]")
 
 
-# Report 1: Top Balances
-def _report_top_balances(manager: PlayerManager) -> None:
+def _run_reports(manager: PlayerManager, aggregators: List[ReportAggregator]) -> List[ReportResult]:
     """
-    Generate and display a report of players with the highest balances.
-    Gathers all players, sorts them by account_balance descending,
-    muestra tabla en pantalla y exporta a JSON+CSV.
+    Produces and exports the given reports through the report cache, from one snapshot of the players
+    (at most one scan of it).
+
+    Returns:
+        List[ReportResult]: One result per aggregator, or an empty list on error (already reported).
     """
-    res: OperationResult = manager.get_all_players()
+    snapshot_res: OperationResult = manager.snapshot()
+    if not snapshot_res.ok:
+        console.print(f"[red]Error generando reportes:[/red] {snapshot_res.error}")
+        return []
+    # Every report reads the same pinned state, while games keep saving
+    with snapshot_res.data as snapshot:
+        res: OperationResult = ReportCache(REPORTS_DIR).generate(partial(snapshot.iter_players, lazy=True),
+                                                                 aggregators, snapshot=snapshot)
     if not res.ok:
-        console.print(f"[red]Error cargando jugadores:[/red] {res.error}")
-        return
+        console.print(f"[red]Error generando reportes:[/red] {res.error}")
+        return []
+    return res.data
 
-    players: List[Player] = res.data
-    # Sort descending by balance
-    sorted_players = sorted(players, key=lambda p: p.account_balance, reverse=True)
 
-    # Prepare display and export data (Show table)
-    table = Table(title="Top Balances")
-    table.add_column("Posición", style="cyan", justify="right")
-    table.add_column("Nombre", style="magenta")
-    table.add_column("Saldo", style="green", justify="right")
+def render_report(result: ReportResult, interactive: bool = True) -> None:
+    """
+    Displays a report one page at a time.
 
-    json_data = []
-    csv_rows: List[List[str]] = []
-    for rank, p in enumerate(sorted_players, 1):
-        table.add_row(str(rank), p.name, f"{p.account_balance:.2f}")
-        json_data.append({"rank": rank, "name": p.name, "balance": p.account_balance})
-        csv_rows.append([str(rank), p.name, f"{p.account_balance:.2f}"])
+    Args:
+        result (ReportResult): The report to display.
+        interactive (bool): Browse the pages with the paginated viewer; otherwise
+            print only the first page (for non-interactive callers such as the CLI).
+    """
+    columns = result.aggregator.columns
+    if interactive:
+        fetch = list_fetcher(result.table_page, len(result), lambda: list(result.iter_table_rows()))
+        browse(result.title, columns, fetch)
+        return
+    pages = max(1, math.ceil(len(result) / PAGE_SIZE))
+    render_page(result.title, columns, result.table_page(0, PAGE_SIZE), 1, pages, len(result))
 
-    console.print(table)
 
-    # Paths for JSON and CSV files
-    json_path = f"{REPORTS_DIR}/top_balances.json"
-    csv_path = f"{REPORTS_DIR}/top_balances.csv"
-    # Write JSON
-    FileManager.write_file(json_path, json_data, mode='w')
-    # Write CSV
-    FileManager.write_file_csv(csv_path, rows=csv_rows, header=["Rank","Name","Balance"], mode='w')
+def _show_and_export(result: ReportResult, show: bool = True) -> None:
+    """
+    Displays a report as a table (optionally) and the files it was exported to.
+    """
+    if show:
+        render_report(result)
+    if result.status == 'cached':
+        console.print("[dim]Sin cambios desde la última generación; se reutilizan los archivos existentes.[/dim]")
+    json_path, csv_path = result.paths
     console.print(f"[green]→ Guardado en[/green] [bold]{json_path}[/bold] [green]y[/green] [bold]{csv_path}[/bold]")
 
 
+# Report 1: Top Balances
+def _report_top_balances(manager: PlayerManager) -> None:
+    """
+    Generate and display a report of players with the highest balances.
+    Sorts players by account_balance descending,
+    muestra tabla en pantalla y exporta a JSON+CSV.
+    """
+    for result in _run_reports(manager, [TopBalancesAggregator()]):
+        _show_and_export(result)
+
+
 # Report 2: Earnings Ranking
 def _report_earnings_ranking(manager: PlayerManager) -> None:
     """
@@ -111,84 +147,33 @@ def _report_earnings_ranking(manager: PlayerManager) -> None:
     if not earnings:
         console.print("[yellow]No hay datos de ganancias aún.[/yellow]")
         return
-    # Load all players for name resolution
-    res = manager.get_all_players()
-    if not res.ok:
-        console.print(f"[red]Error cargando jugadores:[/red] {res.error}")
-        return
-    players = res.data
-    # Build a mapping: player_id → name
-    id_to_name = {p.id: p.name for p in players}
-
-    # Sort by total earned (descending)
-    sorted_earnings = sorted(earnings.items(), key=lambda item: item[1], reverse=True)
-
-    table = Table(title="Ranking de Ganancias Netas (Historial)")
-    table.add_column("Posición", style="cyan", justify="right")
-    table.add_column("Nombre", style="magenta")
-    table.add_column("ID", style="magenta")
-    table.add_column("Ganancia Neta", style="green", justify="right")
-
-    json_data = []
-    csv_rows: List[List[str]] = []
-    for rank, (pid, total) in enumerate(sorted_earnings, 1):
-        name = id_to_name.get(pid, "<desconocido>")
-        table.add_row(str(rank), name, pid, f"{total:.2f}")
-        json_data.append({"rank": rank, "name": name, "player_id": pid, "net_earnings": total})
-        csv_rows.append([str(rank), name, pid, f"{total:.2f}"])
-
-    console.print(table)
-
-    json_path = f"{REPORTS_DIR}/earnings_ranking.json"
-    csv_path = f"{REPORTS_DIR}/earnings_ranking.csv"
-    FileManager.write_file(json_path, json_data, mode='w')
-    FileManager.write_file_csv(csv_path, rows=csv_rows, header=["Rank","Name","PlayerID","NetEarnings"], mode='w')
-    console.print(f"[green]→ Guardado en[/green] [bold]{json_path}[/bold] [green]y[/green] [bold]{csv_path}[/bold]")
+    for result in _run_reports(manager, [EarningsRankingAggregator(earnings)]):
+        _show_and_export(result)
 
 
 # Report 3: Player History
 def _report_player_history(manager: PlayerManager) -> None:
     """
     Generate and display a report of a specific player's game history.
-    Prompts for un ID de jugador, obtiene su historial via PlayerHistory,
+    Prompts for un ID de jugador, obtiene su historial,
     muestra en tabla y exporta a JSON+CSV.
     """
     player_id = console.input("[yellow]Ingrese el ID del jugador (o 0 para cancelar):[/yellow] ").strip()
     if player_id == '0':
         return
 
-    # Verify the player exists
-    get_player_res: OperationResult = manager.get_player_by_id(player_id)
-    if not get_player_res.ok:
-        console.print(f"[red]Error:[/red] {get_player_res.error}")
+    results = _run_reports(manager, [PlayerHistoryAggregator(player_id)])
+    if not results:
         return
-
-    hist = PlayerHistory(player_id)
-    get_hist_res: OperationResult = hist.get_all()
-    if not get_hist_res.ok:
-        console.print(f"[red]Error obteniendo historial:[/red] {get_hist_res.error}")
+    result = results[0]
+    # Only players found in the scan are exported
+    if not result.paths:
+        console.print(f"[red]Error:[/red] Player ID '{player_id}' not found.")
         return
 
-    actions: List[str] = get_hist_res.data
-    if not actions:
+    if not result.entries:
         console.print("[italic]El jugador no tiene historial.[/italic]")
-    else:
-        table = Table(title=f"Historial de {player_id}")
-        table.add_column("N.º", style="cyan", justify="right")
-        table.add_column("Acción", style="magenta")
-        for idx, action in enumerate(actions, 1):
-            table.add_row(str(idx), action)
-        console.print(table)
-
-    # Export to JSON and CSV
-    json_path = f"{REPORTS_DIR}/history_{player_id}.json"
-    csv_path = f"{REPORTS_DIR}/history_{player_id}.csv"
-
-    # JSON format: list of strings
-    FileManager.write_file(json_path, actions, mode='w')
-    # CSV format: single column "Action"
-    FileManager.write_file_csv(csv_path, rows=[[a] for a in actions], header=["Action"], mode='w')
-    console.print(f"[green]→ Historial exportado en[/green] [bold]{json_path}[/bold] [green]y[/green] [bold]{csv_path}[/bold]")
+    _show_and_export(result, show=bool(result.entries))
 
 
 # Report 4: Loss Counts
@@ -198,44 +183,8 @@ def _report_loss_counts(manager: PlayerManager) -> None:
     Calcula cuántas veces cada jugador ha perdido,
     muestra tabla y exporta a JSON+CSV.
     """
-    res: OperationResult = manager.get_all_players()
-    if not res.ok:
-        console.print(f"[red]Error cargando jugadores:[/red] {res.error}")
-        return
-
-    players: List[Player] = res.data
-    loss_list: List[Dict[str, int]] = []
-    for p in players:
-        # Count occurrences of "lost" in their history
-        count = 0
-        for action in p.history:
-            low = action.lower()
-            if "lost" in low:
-                count += 1
-        loss_list.append({"name": p.name, "loss_count": count})
-
-    # Sort descending by loss_count
-    sorted_losses = sorted(loss_list, key=lambda x: x["loss_count"], reverse=True)
-
-    table = Table(title="Ranking de Pérdidas")
-    table.add_column("Posición", style="cyan", justify="right")
-    table.add_column("Nombre", style="magenta")
-    table.add_column("Cant. Pérdidas", style="red", justify="right")
-    for idx, entry in enumerate(sorted_losses, 1):
-        table.add_row(str(idx), entry["name"], str(entry["loss_count"]))
-    console.print(table)
-
-    # Export JSON and CSV
-    json_path = f"{REPORTS_DIR}/loss_counts.json"
-    csv_path = f"{REPORTS_DIR}/loss_counts.csv"
-    FileManager.write_file(json_path, sorted_losses, mode='w')
-
-    # CSV header: ["Rank", "Name", "LossCount"]
-    csv_rows: List[List[str]] = []
-    for rank, entry in enumerate(sorted_losses, 1):
-        csv_rows.append([str(rank), entry["name"], str(entry["loss_count"])])
-    FileManager.write_file_csv(csv_path, rows=csv_rows, header=["Rank", "Name", "LossCount"], mode='w')
-    console.print(f"[green]→ Guardado en[/green] [bold]{json_path}[/bold] [green]y[/green] [bold]{csv_path}[/bold]")
+    for result in _run_reports(manager, [LossCountsAggregator()]):
+        _show_and_export(result)
 
 
 # Report 5: Game Participation
@@ -245,40 +194,27 @@ def _report_game_participation(manager: PlayerManager) -> None:
     Cuenta cuántas jugadas de “Tragamonedas” vs “Adivinanzas” hay en todos los historiales,
     muestra tabla y exporta a JSON+CSV.
     """
-    res: OperationResult = manager.get_all_players()
-    if not res.ok:
-        console.print(f"[red]Error cargando jugadores:[/red] {res.error}")
-        return
-
-    players: List[Player] = res.data
-    trag_count = 0
-    adivin_count = 0
-    for p in players:
-        for action in p.history:
-            low = action.lower()
-            if "tragamonedas" in low:
-                trag_count += 1
-            if "adivinanzas" in low:
-                adivin_count += 1
+    for result in _run_reports(manager, [GameParticipationAggregator()]):
+        _show_and_export(result)
 
-    table = Table(title="Participación por Juego")
-    table.add_column("Juego", style="cyan")
-    table.add_column("Cantidad", style="magenta", justify="right")
-    table.add_row("Tragamonedas", str(trag_count))
-    table.add_row("Adivinanzas", str(adivin_count))
-    console.print(table)
 
-    json_data = [
-        {"game": "Tragamonedas", "count": trag_count},
-        {"game": "Adivinanzas", "count": adivin_count},
+# Report 6: All reports in one scan
+def _report_all(manager: PlayerManager) -> None:
+    """
+    Generate every report from a single scan of the players and export them all.
+    Tables are not displayed; the per-player histories are exported together in histories.json/csv.
+    """
+    aggregators: List[ReportAggregator] = [
+        TopBalancesAggregator(),
+        LossCountsAggregator(),
+        GameParticipationAggregator(),
+        AllHistoriesAggregator(),
     ]
-    json_path = f"{REPORTS_DIR}/game_participation.json"
-    FileManager.write_file(json_path, json_data, mode='w')
+    earnings = EarningsTracker.get_all_earnings()
+    if earnings:
+        aggregators.append(EarningsRankingAggregator(earnings))
+    else:
+        console.print("[yellow]No hay datos de ganancias aún; se omite el ranking de ganancias.[/yellow]")
 
-    csv_rows: List[List[str]] = [
-        ["Tragamonedas", str(trag_count)],
-        ["Adivinanzas", str(adivin_count)]
-    ]
-    csv_path = f"{REPORTS_DIR}/game_participation.csv"
-    FileManager.write_file_csv(csv_path, rows=csv_rows, header=["Game", "Count"], mode='w')
-    console.print(f"[green]→ Guardado en[/green] [bold]{json_path}[/bold] [green]y[/green] [bold]{csv_path}[/bold]")
\ No newline at end of file
+    for result in _run_reports(manager, aggregators):
+        _show_and_export(result, show=False)
@@ -0,0 +1,139 @@
+"""
+Paginated table viewer for the PyBet menus.
+
+Only one page of rows is requested and rendered at a time, through a
+`fetch_page(offset, limit, query)` callback returning that page and the total
+number of matching rows, so large tables never build a full Rich Table.
+"""
+
+from typing import Callable, List, Optional, Tuple
+import math
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+PAGE_SIZE: int = 20
+
+# (label, style, justify) for each column
+ColumnSpec = Tuple[str, str, str]
+# fetch_page(offset, limit, query) -> (rows, total matching rows)
+PageFetcher = Callable[[int, int, Optional[str]], Tuple[List[List[str]], int]]
+
+
+def render_page(title: str, columns: List[ColumnSpec], rows: List[List[str]],
+                page: int = 1, pages: int = 1, total: Optional[int] = None) -> None:
+    """
+    Prints one page of rows as a Rich table.
+
+    Args:
+        title (str): Table title.
+        columns (List[ColumnSpec]): Column definitions.
+        rows (List[List[str]]): Rows of this page.
+        page (int): Current page number (1-based).
+        pages (int): Total number of pages.
+        total (Optional[int]): Total number of rows, shown in the caption.
+    """
+    table = Table(title=title, caption=f"Página {page} de {pages}" + (f" · {total} filas" if total is not None else ""))
+    for label, style, justify in columns:
+        table.add_column(label, style=style, justify=justify)
+    for row in rows:
+        table.add_row(*row)
+    console.print(table)
+
+
+def browse(title: str, columns: List[ColumnSpec], fetch_page: PageFetcher, page_size: int = PAGE_SIZE) -> None:
+    """
+    Interactive pager: next/previous page, jump to a page and search.
+
+    Commands:
+        n: next page · p: previous page · g <número>: go to page
+        b <texto>: search · l: clear search · 0: exit
+
+    Args:
+        title (str): Table title.
+        columns (List[ColumnSpec]): Column definitions.
+        fetch_page (PageFetcher): Returns the rows of one page and the total count.
+        page_size (int): Rows per page.
+    """
+    page, query = 1, None
+    while True:
+        rows, total = fetch_page((page - 1) * page_size, page_size, query)
+        pages = max(1, math.ceil(total / page_size))
+        if page > pages:
+            # The data shrank (or a search matched fewer rows): show the last page instead
+            page = pages
+            continue
+
+        heading = title if query is None else f"{title} · búsqueda: “{query}”"
+        if total == 0:
+            console.print("[italic]Sin resultados.[/italic]" if query else "[italic]No hay filas.[/italic]")
+        else:
+            render_page(heading, columns, rows, page, pages, total)
+
+        command = console.input(
+            "[yellow]n: siguiente · p: anterior · g <n>: ir a página · b <texto>: buscar · l: limpiar · 0: salir:[/yellow] "
+        ).strip()
+        action, _, arg = command.partition(' ')
+        action = action.lower()
+
+        if action == 'n':
+            if page < pages:
+                page += 1
+            else:
+                console.print("[yellow]Ya está en la última página.[/yellow]")
+        elif action == 'p':
+            if page > 1:
+                page -= 1
+            else:
+                console.print("[yellow]Ya está en la primera página.[/yellow]")
+        elif action == 'g':
+            try:
+                target = int(arg)
+            except ValueError:
+                console.print("[red]Número de página inválido.[/red]")
+                continue
+            if 1 <= target <= pages:
+                page = target
+            else:
+                console.print(f"[red]La página debe estar entre 1 y {pages}.[/red]")
+        elif action == 'b':
+            query, page = (arg.strip() or None), 1
+        elif action == 'l':
+            query, page = None, 1
+        elif action == '0':
+            break
+        else:
+            console.print("[red]Opción inválida.[/red]")
+
+
+def list_fetcher(rows_source: Callable[[int, int], List[List[str]]], count: int,
+                 all_rows: Callable[[], List[List[str]]]) -> PageFetcher:
+    """
+    Builds a PageFetcher over rows already held in memory.
+
+    Without a search, only the requested page is converted to rows; a search
+    filters the full set of rows (case-insensitive match on any cell).
+
+    Args:
+        rows_source (Callable[[int, int], List[List[str]]]): Returns rows [offset, offset+limit).
+        count (int): Total number of rows.
+        all_rows (Callable[[], List[List[str]]]): Returns every row (only used when searching).
+
+    Returns:
+        PageFetcher: The page fetcher.
+    """
+    matches: dict = {}
+
+    def fetch(offset: int, limit: int, query: Optional[str]) -> Tuple[List[List[str]], int]:
+        if query is None:
+            return rows_source(offset, limit), count
+        if query not in matches:
+            needle = query.casefold()
+            matches.clear()
+            matches[query] = [row for row in all_rows() if any(needle in cell.casefold() for cell in row)]
+        found = matches[query]
+        return found[offset:offset + limit], len(found)
+
+    return fetch
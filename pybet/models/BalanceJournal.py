@@ -0,0 +1,425 @@
+from __future__ import annotations
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import datetime
+import os
+import struct
+import time
+
+from pybet.helpers.FileManager import FileManager
+
+JOURNAL_FILE = './pybet/data/balance_journal.bin'
+# Player IDs and game names referred to by number from the entries
+NAMES_FILE = './pybet/data/balance_journal_names.json'
+# Every player's balance after a given entry: '<entry number>.bin'
+CHECKPOINTS_DIR = './pybet/data/balance_checkpoints'
+# Entries between checkpoints, i.e. the most entries replayed to answer balance_at()
+CHECKPOINT_INTERVAL = 16384
+
+# Entry kinds: a settled bet, a balance set by hand, a new player, a removed player
+BET, ADJUSTMENT, OPEN, CLOSE = range(4)
+KINDS = ('bet', 'adjustment', 'open', 'close')
+# Counter account of the entries that are not bets
+CASHIER = 'cashier'
+
+_MAGIC = b'PYBETBJ1'
+# Header: magic, number of entries
+_HEADER = struct.Struct('<8sq')
+# Entry: time (µs since 1970, UTC), delta and resulting balance in cents, player number, game number, kind
+_ENTRY = struct.Struct('<qqqIHBx')
+# Checkpoint: player number, balance in cents
+_CHECKPOINT = struct.Struct('<Iq')
+# Entries read at a time when scanning
+_SCAN_BATCH = 4096
+
+
+def to_micros(when: datetime.datetime) -> int:
+    """A datetime (naive = local time, like Player.created_at) as µs since 1970."""
+    return round(when.timestamp() * 1_000_000)
+
+
+class BalanceJournal:
+    """
+    Append-only journal of every balance change, for audits and point-in-time balances.
+
+    Each entry records the player, the amount, the game (or kind of change), the
+    time and the resulting balance, in a fixed-width binary record, so appending
+    one costs a single small write. Entries are double-entry: the amount moves
+    between the player and a counter account (the game, for bets, or CASHIER),
+    and each one carries the resulting balance, so the chain of a player's
+    entries can be checked (see audit()).
+
+    Every CHECKPOINT_INTERVAL entries the balance of every player is saved, so
+    the balance at any time is the nearest checkpoint before it plus the replay
+    of at most CHECKPOINT_INTERVAL entries. Entry times never go backwards.
+
+    Writers must be serialized by the caller (DataPersistence holds its commit
+    lock around every append); readers need no lock.
+    """
+
+    def __init__(self, path: str = JOURNAL_FILE, names_file: str = NAMES_FILE,
+                 checkpoints_dir: str = CHECKPOINTS_DIR) -> None:
+        self.path = path
+        self.names_file = names_file
+        self.checkpoints_dir = checkpoints_dir
+        self.players: List[str] = []
+        self.games: List[str] = ['']
+        self._numbers: Dict[str, int] = {}
+        self._game_numbers: Dict[str, int] = {'': 0}
+        self.started = 0
+        self._names_stamp: Optional[int] = None
+        self._fd: Optional[int] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._fd is not None
+
+    def open(self) -> bool:
+        """
+        Opens the journal file.
+
+        Returns:
+            bool: False if it does not exist yet or is invalid (see create()).
+        """
+        self.close()
+        try:
+            fd = os.open(self.path, os.O_RDWR)
+        except OSError:
+            return False
+        if os.pread(fd, len(_MAGIC), 0) != _MAGIC:
+            os.close(fd)
+            return False
+        self._fd = fd
+        self._refresh()
+        return True
+
+    def create(self, balances: Dict[str, int]) -> None:
+        """
+        Starts a new, empty journal whose first checkpoint holds the opening
+        balances. The caller must hold the commit lock.
+
+        Args:
+            balances (Dict[str, int]): Player ID → current balance in cents.
+        """
+        self.close()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        for checkpoint in self._checkpoints():
+            Path(self._checkpoint_path(checkpoint)).unlink(missing_ok=True)
+        self.players, self.games = [], ['']
+        self._numbers, self._game_numbers = {}, {'': 0}
+        self.started = time.time_ns() // 1000
+        self._write_checkpoint(0, balances)
+        FileManager.write_file(self.path, _HEADER.pack(_MAGIC, 0), mode='w')
+        self._fd = os.open(self.path, os.O_RDWR)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def count(self) -> int:
+        """Number of entries."""
+        return _HEADER.unpack(os.pread(self._fd, _HEADER.size, 0))[1]
+
+    def append(self, changes: List[Tuple[str, int, int, int]], game: str,
+               balances: Callable[[], Dict[str, int]]) -> None:
+        """
+        Appends entries, all with the same time. The caller must hold the commit lock.
+
+        Args:
+            changes (List[Tuple]): (player ID, delta in cents, resulting balance in cents, kind).
+            game (str): Game of the BET entries.
+            balances (Callable): Returns every player's balance in cents after these
+                changes (BalanceLedger.snapshot); only called when a checkpoint is due.
+        """
+        if not changes:
+            return
+        self._refresh()
+        count = self.count
+        now = time.time_ns() // 1000
+        if count:
+            # Entry times never go backwards, so entries can be searched by time
+            now = max(now, self._read(count - 1, 1)[0][0])
+        names_changed = False
+        records = bytearray()
+        for player_id, delta, balance, kind in changes:
+            if player_id not in self._numbers:
+                names_changed = True
+            if game and game not in self._game_numbers:
+                names_changed = True
+            records += _ENTRY.pack(now, delta, balance, self._player_number(player_id),
+                                   self._game_number(game) if kind == BET else 0, kind)
+        if names_changed:
+            self._save_names()
+        # The entries first, then the count that makes them visible
+        os.pwrite(self._fd, bytes(records), _HEADER.size + count * _ENTRY.size)
+        os.pwrite(self._fd, _HEADER.pack(_MAGIC, count + len(changes)), 0)
+        if FileManager.durability != 'none':
+            os.fsync(self._fd)
+
+        total = count + len(changes)
+        if total // CHECKPOINT_INTERVAL > count // CHECKPOINT_INTERVAL:
+            self._write_checkpoint(total, balances())
+
+    def reconcile(self, balances: Dict[str, int]) -> int:
+        """
+        Appends ADJUSTMENT (and OPEN/CLOSE) entries for every balance that differs
+        from the journal's, e.g. after the balances were reset by hand. The caller
+        must hold the commit lock.
+
+        Args:
+            balances (Dict[str, int]): Player ID → current balance in cents.
+
+        Returns:
+            int: Entries appended.
+        """
+        self._refresh()
+        known = self._replay(self.count) or {}
+        changes = [(player_id, -cents, 0, CLOSE) for player_id, cents in known.items() if player_id not in balances]
+        for player_id, cents in balances.items():
+            previous = known.get(player_id)
+            if previous != cents:
+                changes.append((player_id, cents - (previous or 0), cents, OPEN if previous is None else ADJUSTMENT))
+        self.append(changes, '', lambda: balances)
+        return len(changes)
+
+    def balances_at(self, when: datetime.datetime) -> Optional[Dict[str, int]]:
+        """
+        Balance in cents of every player at a given time.
+
+        Returns:
+            Optional[Dict[str, int]]: Player ID → cents (players removed by then are
+                left out), or None if `when` is before the journal started.
+        """
+        self._refresh()
+        if to_micros(when) < self.started:
+            return None
+        return self._replay(self._entries_until(to_micros(when)))
+
+    def balance_at(self, player_id: str, when: datetime.datetime) -> Tuple[bool, Optional[int]]:
+        """
+        Balance in cents of one player at a given time.
+
+        Returns:
+            Tuple[bool, Optional[int]]: (False, None) if `when` is before the journal
+                started; otherwise (True, cents), with None if the player did not
+                exist then.
+        """
+        self._refresh()
+        if to_micros(when) < self.started:
+            return False, None
+        end = self._entries_until(to_micros(when))
+        start, balances = self._checkpoint_before(end, player_id)
+        if balances is None:
+            return False, None
+        cents = balances.get(player_id)
+        number = self._numbers.get(player_id)
+        for _, _, balance, player, _, kind in self._read(start, end - start):
+            if player == number:
+                cents = None if kind == CLOSE else balance
+        return True, cents
+
+    def entries(self, player_id: Optional[str] = None, since: Optional[datetime.datetime] = None,
+                until: Optional[datetime.datetime] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the entries (optionally of one player and/or within [since, until]) in order.
+
+        Yields:
+            Dict[str, Any]: number, at (ISO time), player_id, kind, game, account
+                (the counter account), delta and balance (resulting balance).
+        """
+        self._refresh()
+        number = self._numbers.get(player_id) if player_id is not None else None
+        if player_id is not None and number is None:
+            return
+        start = self._entries_until(to_micros(since) - 1) if since is not None else 0
+        end = self._entries_until(to_micros(until)) if until is not None else self.count
+        for position in range(start, end, _SCAN_BATCH):
+            batch = self._read(position, min(_SCAN_BATCH, end - position))
+            for offset, (micros, delta, balance, player, game, kind) in enumerate(batch):
+                if number is not None and player != number:
+                    continue
+                yield {
+                    "number": position + offset,
+                    "at": (datetime.datetime.fromtimestamp(micros // 1_000_000)
+                           + datetime.timedelta(microseconds=micros % 1_000_000)).isoformat(),
+                    "player_id": self.players[player],
+                    "kind": KINDS[kind],
+                    "game": self.games[game],
+                    "account": self.games[game] if kind == BET else CASHIER,
+                    "delta": delta / 100,
+                    "balance": balance / 100,
+                }
+
+    def audit(self, balances: Dict[str, int], earnings: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Checks the journal against itself and against the current state.
+
+        Args:
+            balances (Dict[str, int]): Current balance in cents of every player.
+            earnings (Dict[str, float]): Player ID → total earnings (earnings_totals.json).
+
+        Returns:
+            Dict[str, Any]:
+                entries (int): Entries checked.
+                broken (List[int]): Entries whose previous balance plus delta is not their balance.
+                balance_drift (Dict[str, List[float]]): Player ID → [journal, current] balance,
+                    where they differ (a change made without the journal).
+                earnings_drift (Dict[str, List[float]]): Player ID → [sum of the bets in the
+                    journal, earnings total], where they differ.
+                accounts (Dict[str, float]): Counter account → its total (bets won by the
+                    house are positive), which with the players' deltas sums to zero.
+        """
+        self._refresh()
+        checkpoints = self._checkpoints()
+        start = checkpoints[0] if checkpoints else 0
+        last = self._read_checkpoint(start) if checkpoints else {}
+        count = self.count
+        broken: List[int] = []
+        bets: Dict[str, int] = {}
+        accounts: Dict[str, int] = {}
+        for position in range(start, count, _SCAN_BATCH):
+            batch = self._read(position, min(_SCAN_BATCH, count - position))
+            for offset, (_, delta, balance, player, game, kind) in enumerate(batch):
+                player_id = self.players[player]
+                if last.get(player_id, 0) + delta != balance:
+                    broken.append(position + offset)
+                if kind == CLOSE:
+                    last.pop(player_id, None)
+                else:
+                    last[player_id] = balance
+                account = self.games[game] if kind == BET else CASHIER
+                accounts[account] = accounts.get(account, 0) - delta
+                if kind == BET:
+                    bets[player_id] = bets.get(player_id, 0) + delta
+
+        balance_drift = {
+            player_id: [last.get(player_id, 0) / 100, balances.get(player_id, 0) / 100]
+            for player_id in set(last) | set(balances) if last.get(player_id) != balances.get(player_id)
+        }
+        earnings_drift = {
+            player_id: [bets.get(player_id, 0) / 100, round(earnings.get(player_id, 0.0), 2)]
+            for player_id in set(bets) | set(earnings)
+            if bets.get(player_id, 0) != round(earnings.get(player_id, 0.0) * 100)
+        }
+        return {
+            "entries": count - start,
+            "broken": broken,
+            "balance_drift": balance_drift,
+            "earnings_drift": earnings_drift,
+            "accounts": {account: total / 100 for account, total in accounts.items()},
+        }
+
+    def _read(self, start: int, count: int) -> List[Tuple[int, int, int, int, int, int]]:
+        """Entries [start, start + count) as (micros, delta, balance, player, game, kind)."""
+        if count <= 0:
+            return []
+        data = os.pread(self._fd, count * _ENTRY.size, _HEADER.size + start * _ENTRY.size)
+        return list(_ENTRY.iter_unpack(data))
+
+    def _replay(self, end: int) -> Optional[Dict[str, int]]:
+        """Every player's balance after the first `end` entries (None without a checkpoint)."""
+        start, balances = self._checkpoint_before(end)
+        if balances is None:
+            return None
+        for _, _, balance, player, _, kind in self._read(start, end - start):
+            if kind == CLOSE:
+                balances.pop(self.players[player], None)
+            else:
+                balances[self.players[player]] = balance
+        return balances
+
+    def _entries_until(self, micros: int) -> int:
+        """Number of entries made at or before `micros` (binary search by time)."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._read(middle, 1)[0][0] <= micros:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _checkpoint_before(self, end: int, player_id: Optional[str] = None) -> Tuple[int, Optional[Dict[str, int]]]:
+        """
+        Latest checkpoint at or before entry `end`, as (entry number, balances
+        (only `player_id`'s if given)), or (0, None) if there is none.
+        """
+        checkpoints = self._checkpoints()
+        position = bisect_right(checkpoints, end) - 1
+        if position < 0:
+            return 0, None
+        return checkpoints[position], self._read_checkpoint(checkpoints[position], player_id)
+
+    def _checkpoints(self) -> List[int]:
+        """Entry numbers of the existing checkpoints, in order."""
+        try:
+            names = os.listdir(self.checkpoints_dir)
+        except OSError:
+            return []
+        return sorted(int(name[:-4]) for name in names if name.endswith('.bin') and name[:-4].isdigit())
+
+    def _checkpoint_path(self, entry: int) -> str:
+        return f"{self.checkpoints_dir}/{entry:012d}.bin"
+
+    def _write_checkpoint(self, entry: int, balances: Dict[str, int]) -> None:
+        """Saves every player's balance after `entry` entries."""
+        known = len(self.players)
+        data = bytearray()
+        for player_id, cents in balances.items():
+            data += _CHECKPOINT.pack(self._player_number(player_id), cents)
+        if entry == 0 or len(self.players) > known:
+            self._save_names()
+        FileManager.write_file(self._checkpoint_path(entry), bytes(data), mode='w')
+
+    def _read_checkpoint(self, entry: int, player_id: Optional[str] = None) -> Dict[str, int]:
+        """Balances of a checkpoint (only `player_id`'s if given)."""
+        with open(self._checkpoint_path(entry), 'rb') as f:
+            data = f.read()
+        number = self._numbers.get(player_id) if player_id is not None else None
+        balances: Dict[str, int] = {}
+        for player, cents in _CHECKPOINT.iter_unpack(data):
+            if number is None or player == number:
+                balances[self.players[player]] = cents
+        return balances
+
+    def _player_number(self, player_id: str) -> int:
+        number = self._numbers.get(player_id)
+        if number is None:
+            number = self._numbers[player_id] = len(self.players)
+            self.players.append(player_id)
+        return number
+
+    def _game_number(self, game: str) -> int:
+        number = self._game_numbers.get(game)
+        if number is None:
+            number = self._game_numbers[game] = len(self.games)
+            self.games.append(game)
+        return number
+
+    def _refresh(self) -> None:
+        """Reloads the names table if another process added names to it."""
+        try:
+            stamp = os.stat(self.names_file).st_mtime_ns
+        except OSError:
+            return
+        if stamp == self._names_stamp:
+            return
+        res = FileManager.read_file_json(self.names_file)
+        if res.ok and isinstance(res.data, dict):
+            self.started = res.data.get("started", 0)
+            self.players = list(res.data.get("players", []))
+            self.games = list(res.data.get("games", [''])) or ['']
+            self._numbers = {player_id: number for number, player_id in enumerate(self.players)}
+            self._game_numbers = {game: number for number, game in enumerate(self.games)}
+            self._names_stamp = stamp
+
+    def _save_names(self) -> None:
+        FileManager.write_file(self.names_file, {"started": self.started, "players": self.players, "games": self.games},
+                               mode='w')
+        try:
+            self._names_stamp = os.stat(self.names_file).st_mtime_ns
+        except OSError:
+            self._names_stamp = None
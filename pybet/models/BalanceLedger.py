@@ -0,0 +1,396 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import mmap
+import os
+import struct
+
+from pybet.helpers.FileManager import FileManager
+
+LEDGER_FILE = './pybet/data/balances.bin'
+# Player ID → slot, plus the free slots and the next never used slot
+SLOTS_FILE = './pybet/data/balance_slots.json'
+# players.json record field holding the player's slot, so the slot map can be rebuilt
+SLOT_FIELD = 'balance_slot'
+
+_MAGIC = b'PYBETBL1'
+# Header: magic, number of settlements so far
+_HEADER = struct.Struct('<8sq')
+# Slot: balance in cents, version. Change ring entry: settlement number, slot
+_PAIR = struct.Struct('<qq')
+_INT = struct.Struct('<q')
+# Recent settlements kept for changes()
+CHANGE_RING = 1024
+_SLOTS_OFFSET = _HEADER.size + CHANGE_RING * _PAIR.size
+# Slots added each time the file grows
+GROW_SLOTS = 1024
+# Reads of a slot being written before its value is taken anyway (its writer died)
+_MAX_SPINS = 10000
+
+
+def to_cents(balance: float) -> int:
+    """Balance as an integer number of cents."""
+    return round(balance * 100)
+
+
+class BalanceLedger:
+    """
+    Account balances kept in a memory-mapped file of fixed-width slots.
+
+    Each player owns one 16-byte slot (int64 balance in cents, int64 version),
+    located through the slot map (player ID → slot index). Settling a bet
+    overwrites the slot in place instead of rewriting the players' JSON, and is
+    logged in a fixed-size ring so that recent changes can still be listed.
+
+    The version works as a sequence lock: it is odd while the slot is being
+    written, so readers never need a lock and retry instead of returning a torn
+    value. Writers must be serialized by the caller (DataPersistence holds its
+    commit lock around every write).
+    """
+
+    def __init__(self, path: str = LEDGER_FILE, slots_file: str = SLOTS_FILE) -> None:
+        self.path = path
+        self.slots_file = slots_file
+        self.slots: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.next_slot = 0
+        self._slots_stamp: Optional[int] = None
+        self._file: Any = None
+        self._map: Optional[mmap.mmap] = None
+
+    def open(self) -> bool:
+        """
+        Maps the ledger file and loads the slot map.
+
+        Returns:
+            bool: False if the file or the slot map is missing or invalid (see rebuild()).
+        """
+        self.close()
+        try:
+            handle = open(self.path, 'r+b')
+        except OSError:
+            return False
+        if os.fstat(handle.fileno()).st_size < _SLOTS_OFFSET or handle.read(len(_MAGIC)) != _MAGIC:
+            handle.close()
+            return False
+        self._file = handle
+        self._map = mmap.mmap(handle.fileno(), 0)
+        if not self._load_slots():
+            self.close()
+            return False
+        return True
+
+    def close(self) -> None:
+        """Unmaps and closes the ledger file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._map is not None
+
+    @property
+    def sequence(self) -> int:
+        """Number of settlements ever made (bumped by settle())."""
+        return _INT.unpack_from(self._map, len(_MAGIC))[0]
+
+    def cents(self, player_id: str) -> Optional[int]:
+        """Current balance of a player in cents, or None if it has no slot."""
+        self._refresh()
+        slot = self.slots.get(player_id)
+        return None if slot is None else self._read(slot)
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Balance in cents of every player with a slot, read without locking.
+
+        The slot area is copied twice; slots that differ between the copies (or
+        are being written) are re-read one by one.
+        """
+        self._refresh()
+        end = _SLOTS_OFFSET + self.next_slot * _PAIR.size
+        first = self._map[_SLOTS_OFFSET:end]
+        second = self._map[_SLOTS_OFFSET:end]
+        values = memoryview(first).cast('q')
+        unstable = set()
+        if first != second:
+            other = memoryview(second).cast('q')
+            unstable = {pos // 2 for pos in range(len(values)) if values[pos] != other[pos]}
+        balances: Dict[str, int] = {}
+        for player_id, slot in self.slots.items():
+            if slot in unstable or values[2 * slot + 1] & 1:
+                balances[player_id] = self._read(slot)
+            else:
+                balances[player_id] = values[2 * slot]
+        return balances
+
+    def frozen(self) -> Tuple[Dict[str, int], bytes]:
+        """
+        Copies of the slot map and of the slot area, to read the balances of this
+        moment later (see frozen_balances()). The caller must hold the commit lock,
+        so that no slot is being written; the copy takes a single memcpy.
+        """
+        self._refresh()
+        return dict(self.slots), self._map[_SLOTS_OFFSET:_SLOTS_OFFSET + self.next_slot * _PAIR.size]
+
+    @staticmethod
+    def frozen_balances(slots: Dict[str, int], area: bytes) -> Dict[str, int]:
+        """Balance in cents of every player, from a frozen() copy."""
+        values = memoryview(area).cast('q')
+        return {player_id: values[2 * slot] for player_id, slot in slots.items()}
+
+    def overlay(self, records: Iterable[Dict[str, Any]], balances: Dict[str, int]) -> None:
+        """Replaces the account_balance of each record by its balance in `balances` (a snapshot())."""
+        for record in records:
+            cents = balances.get(record.get("id"))
+            if cents is not None:
+                record["account_balance"] = cents / 100
+
+    def changes(self, since: int) -> Optional[List[int]]:
+        """
+        Slots settled after settlement number `since`.
+
+        Returns:
+            Optional[List[int]]: The slots, or None if the ring no longer reaches `since`.
+        """
+        current = self.sequence
+        if current - since > CHANGE_RING:
+            return None
+        slots: List[int] = []
+        for number in range(since + 1, current + 1):
+            logged, slot = _PAIR.unpack_from(self._map, _HEADER.size + (number % CHANGE_RING) * _PAIR.size)
+            if logged != number:
+                return None
+            slots.append(slot)
+        return slots
+
+    def owners(self) -> Dict[int, str]:
+        """Slot → player ID."""
+        self._refresh()
+        return {slot: player_id for player_id, slot in self.slots.items()}
+
+    def settle(self, player_id: str, cents: int) -> None:
+        """
+        Sets a player's balance in place and logs the settlement. The caller must
+        hold the commit lock and the player must have a slot.
+        """
+        self._refresh()
+        slot = self.slots[player_id]
+        self._write(slot, cents)
+        number = self.sequence + 1
+        _PAIR.pack_into(self._map, _HEADER.size + (number % CHANGE_RING) * _PAIR.size, number, slot)
+        _INT.pack_into(self._map, len(_MAGIC), number)
+        self._flush(_SLOTS_OFFSET + slot * _PAIR.size)
+        self._flush(0)
+
+    def prepare(self, players_map: Dict[str, Any],
+                changed_ids: Optional[Iterable[str]]) -> List[Tuple[str, Optional[int], Optional[int]]]:
+        """
+        First half of applying a save of the players' JSON to the ledger: works out
+        the balance changes and stores each player's slot in its record (SLOT_FIELD),
+        reserving a slot for every new player. Nothing is written to the ledger
+        yet: once the save is written, apply() the changes, or discard() them if
+        it failed. The caller must hold the commit lock until then.
+
+        Args:
+            players_map (Dict[str, Any]): The mapping being saved.
+            changed_ids (Optional[Iterable[str]]): IDs changed by the save (None = all).
+
+        Returns:
+            List[Tuple]: (player ID, previous cents, new cents) of every balance
+                changed, with None as previous for new players and as new for removed ones.
+        """
+        self._refresh()
+        ids = list(players_map) if changed_ids is None else list(changed_ids)
+        if changed_ids is None:
+            ids += [player_id for player_id in self.slots if player_id not in players_map]
+
+        changes: List[Tuple[str, Optional[int], Optional[int]]] = []
+        for player_id in ids:
+            record = players_map.get(player_id)
+            if record is None:
+                if player_id in self.slots:
+                    changes.append((player_id, self._read(self.slots[player_id]), None))
+                continue
+            slot = self.slots.get(player_id)
+            previous = None
+            if slot is None:
+                slot = self._assign(player_id)
+            else:
+                previous = self._read(slot)
+            record[SLOT_FIELD] = slot
+            cents = to_cents(record.get("account_balance", 0))
+            if previous != cents:
+                changes.append((player_id, previous, cents))
+        return changes
+
+    def apply(self, changes: List[Tuple[str, Optional[int], Optional[int]]]) -> None:
+        """
+        Second half, once the save is written: writes the new balances and frees
+        the slots of removed players (see prepare()).
+        """
+        for player_id, _, cents in changes:
+            if cents is None:
+                self.free.append(self.slots.pop(player_id))
+            else:
+                slot = self.slots[player_id]
+                self._write(slot, cents)
+                self._flush(_SLOTS_OFFSET + slot * _PAIR.size)
+        if any(previous is None or cents is None for _, previous, cents in changes):
+            self._save_slots()
+
+    def discard(self, changes: List[Tuple[str, Optional[int], Optional[int]]]) -> None:
+        """Gives back the slots prepare() reserved for a save that was not written."""
+        for player_id, previous, _ in reversed(changes):
+            if previous is None:
+                self.free.append(self.slots.pop(player_id))
+
+    def rebuild(self, players_map: Dict[str, Any], reset: bool = False) -> int:
+        """
+        Recovery: rebuilds the slot map from the players' records (their SLOT_FIELD),
+        creating the ledger file if it is missing or invalid. Records without a
+        valid slot of their own get a new one holding their stored balance. The
+        caller must hold the commit lock.
+
+        Args:
+            players_map (Dict[str, Any]): Records as stored (balances not overlaid).
+            reset (bool): Also overwrite every slot with the record's stored balance
+                (implied when the ledger file had to be created).
+
+        Returns:
+            int: Number of players whose slot was (re)assigned.
+        """
+        if not self.open_file():
+            reset = True
+        self.slots, self.free = {}, []
+        taken = set()
+        pending: List[str] = []
+        for player_id, record in players_map.items():
+            slot = record.get(SLOT_FIELD)
+            if isinstance(slot, int) and slot >= 0 and slot not in taken:
+                self.slots[player_id] = slot
+                taken.add(slot)
+            else:
+                pending.append(player_id)
+        self.next_slot = max(taken) + 1 if taken else 0
+        self.free = sorted(set(range(self.next_slot)) - taken, reverse=True)
+        self._reserve(self.next_slot)
+
+        for player_id in pending:
+            self._assign(player_id)
+        for player_id, slot in self.slots.items():
+            record = players_map[player_id]
+            record[SLOT_FIELD] = slot
+            if reset or player_id in pending:
+                self._write(slot, to_cents(record.get("account_balance", 0)))
+        self._map.flush()
+        self._save_slots()
+        return len(pending)
+
+    def open_file(self) -> bool:
+        """
+        Maps the ledger file without its slot map, creating (or re-initializing)
+        the file if it is missing or invalid.
+
+        Returns:
+            bool: True if an existing valid file was opened.
+        """
+        self.close()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        handle = open(self.path, 'a+b')
+        handle.seek(0)
+        valid = os.fstat(handle.fileno()).st_size >= _SLOTS_OFFSET and handle.read(len(_MAGIC)) == _MAGIC
+        if not valid:
+            handle.truncate(0)
+            handle.write(_HEADER.pack(_MAGIC, 0) + bytes(_SLOTS_OFFSET - _HEADER.size))
+            handle.flush()
+        handle.close()
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        return valid
+
+    def _assign(self, player_id: str) -> int:
+        """Gives a player a free slot (growing the file if needed)."""
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = self.next_slot
+            self.next_slot += 1
+            self._reserve(self.next_slot)
+        self.slots[player_id] = slot
+        return slot
+
+    def _reserve(self, count: int) -> None:
+        """Grows the file so that it holds at least `count` slots."""
+        capacity = (len(self._map) - _SLOTS_OFFSET) // _PAIR.size
+        if count <= capacity:
+            return
+        capacity = (count // GROW_SLOTS + 1) * GROW_SLOTS
+        self._map.close()
+        self._file.truncate(_SLOTS_OFFSET + capacity * _PAIR.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _read(self, slot: int) -> int:
+        """Reads a slot's cents, retrying while the slot is being written."""
+        offset = _SLOTS_OFFSET + slot * _PAIR.size
+        for _ in range(_MAX_SPINS):
+            before = _INT.unpack_from(self._map, offset + _INT.size)[0]
+            cents = _INT.unpack_from(self._map, offset)[0]
+            if not before & 1 and _INT.unpack_from(self._map, offset + _INT.size)[0] == before:
+                return cents
+        return _INT.unpack_from(self._map, offset)[0]
+
+    def _write(self, slot: int, cents: int) -> None:
+        """Overwrites a slot's cents, bumping its version around the write."""
+        offset = _SLOTS_OFFSET + slot * _PAIR.size
+        # Odd while writing, even after (also repairs a slot left odd by a dead writer)
+        version = _INT.unpack_from(self._map, offset + _INT.size)[0] | 1
+        _INT.pack_into(self._map, offset + _INT.size, version)
+        _INT.pack_into(self._map, offset, cents)
+        _INT.pack_into(self._map, offset + _INT.size, version + 1)
+
+    def _flush(self, offset: int) -> None:
+        """Flushes the page holding `offset` to disk, unless durability is 'none'."""
+        if FileManager.durability == 'none':
+            return
+        start = offset - offset % mmap.PAGESIZE
+        self._map.flush(start, min(mmap.PAGESIZE, len(self._map) - start))
+
+    def _refresh(self) -> None:
+        """Reloads a slot map changed by another process and remaps if it grew the file."""
+        try:
+            stamp = os.stat(self.slots_file).st_mtime_ns
+        except OSError:
+            stamp = self._slots_stamp
+        if stamp != self._slots_stamp:
+            self._load_slots()
+        # After the slot map: files grow before their new slots are published
+        if os.fstat(self._file.fileno()).st_size != len(self._map):
+            self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _load_slots(self) -> bool:
+        """Reads the slot map; False if it is missing or invalid."""
+        if not Path(self.slots_file).exists():
+            return False
+        stamp = os.stat(self.slots_file).st_mtime_ns
+        res = FileManager.read_file_json(self.slots_file)
+        if not res.ok or not isinstance(res.data, dict) or not isinstance(res.data.get("slots"), dict):
+            return False
+        self.slots = res.data["slots"]
+        self.free = res.data.get("free", [])
+        self.next_slot = res.data.get("next", len(self.slots) + len(self.free))
+        self._slots_stamp = stamp
+        return True
+
+    def _save_slots(self) -> None:
+        """Writes the slot map."""
+        FileManager.write_file(self.slots_file, {"next": self.next_slot, "free": self.free, "slots": self.slots}, mode='w')
+        try:
+            self._slots_stamp = os.stat(self.slots_file).st_mtime_ns
+        except OSError:
+            self._slots_stamp = None
@@ -1,22 +1,122 @@
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Iterator, Iterable, Optional, Set, Tuple
+import datetime
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zlib
 
-from pybet.helpers.FileManager import FileManager
+try:
+    import fcntl
+except ImportError:  # not available on Windows: only in-process locking
+    fcntl = None
+
+from pybet.helpers.EarningsTracker import EarningsTracker
+from pybet.helpers.FileManager import FileManager, log
+from pybet.helpers.Serializers import SERIALIZERS, get_serializer
+from pybet.models.BalanceJournal import ADJUSTMENT, BET, CLOSE, OPEN, BalanceJournal
+from pybet.models.BalanceLedger import BalanceLedger, to_cents
+from pybet.models.EventBus import EventBus
+from pybet.models.EventLog import BALANCE_CHANGED, HISTORY_PUSHED
+from pybet.models.HistoryArchive import HistoryArchive
 from pybet.models.OperationResult import OperationResult
+from pybet.models.LazyPlayer import LazyPlayer, PLAYER_FIELDS, project, projection_type
 from pybet.models.Player import Player
+from pybet.models.PlayerIndex import PlayerIndexes
+from pybet.models.PlayerSnapshot import SNAPSHOTS_DIR, PlayerSnapshot
+from pybet.models.PlayerTable import PlayerTable
+from pybet.models.WarmStart import WarmStart
 
 PLAYERS_FILE = './pybet/data/players.json'
+# Number of shard files the players are split into and their format; without it there is one (PLAYERS_FILE)
+SHARDS_FILE = './pybet/data/players_shards.json'
+# Shard files when there are several: '<count>-<shard>.json' (or the suffix of the format)
+SHARDS_DIR = './pybet/data/players'
+# Format of the player files when SHARDS_FILE does not name one (see Serializers)
+DEFAULT_FORMAT = 'json'
+# Data version counter plus the IDs changed by each recent version
+CHANGES_FILE = './pybet/data/players_changes.json'
+MAX_CHANGE_LOG = 1000
+# Held (flock) by every writer while it checks the version and saves
+LOCK_FILE = './pybet/data/players.lock'
+# Error returned by save_players_map when expected_version is no longer current
+VERSION_CONFLICT = "players.json was modified concurrently."
+# Optimistic attempts made by transact() before it takes the lock, and base backoff between them (seconds)
+MAX_RETRIES = 10
+RETRY_BACKOFF = 0.005
+# data_version() token: "<saves>.<settlements>"
+_VERSION = re.compile(r'(\d+)\.(\d+)')
+# Backoff jitter source; unlike the random module state it is not shared by forked processes
+_jitter = random.SystemRandom()
+
+def shard_of(player_id: str, shards: int) -> int:
+    """Shard of a player: a stable hash of its ID (unlike hash(), the same in every process)."""
+    return zlib.crc32(player_id.encode('utf-8')) % shards
+
 
 class DataPersistence:
     """
     Manages loading and saving of all player data in one JSON mapping.
     Each player is stored under their unique ID as key.
+
+    The mapping can be split into several shard files (see reshard()), each
+    player going to shard_of(id). Saves only rewrite the shards holding the
+    changed IDs; loads merge every shard, so callers always see one mapping.
+
+    The in-memory PlayerIndexes (see indexes()) are kept current by every save
+    that reports its changed IDs, and rebuilt if players.json changes otherwise.
+
+    Several processes may share the data directory: saves are serialized by a
+    lock on players.lock, held only while writing, and read-modify-write cycles
+    use optimistic concurrency (see transact()), so no update is lost.
+
+    Balances live in a memory-mapped BalanceLedger: loads overlay them on the
+    records, settle_balances() updates them in place, and the account_balance
+    stored in players.json is only a checkpoint refreshed whenever the record
+    is saved. Every balance change is also appended to a BalanceJournal, which
+    answers balance_at() and audit_balances().
+
+    Records only keep the last history entries; every entry recorded with
+    record_history() is also kept in a day-partitioned HistoryArchive (see
+    history_entries()).
+
+    Each save and settlement publishes its change events on the EventBus: the
+    events recorded with record_event(), history_pushed for the recorded history
+    entries and balance_changed for the balances it moves. They are logged under
+    the commit lock once the change is written, so the log follows the commit
+    order and never holds a change that failed, then delivered to the subscribers.
+
+    Long reads that need one consistent state while bets keep settling pin a
+    PlayerSnapshot (see snapshot()) instead of reading the live files.
     """
 
+    # Process-wide indexes over players.json, built (or read from the warm-start file) on first use
+    _indexes: Optional[PlayerIndexes] = None
+    # Saved copy of the indexes, for a fast first use in the next process
+    _warm_start = WarmStart()
+    # Balance ledger, opened (or built from players.json) on first use
+    _ledger: Optional[BalanceLedger] = None
+    # Journal of balance changes, opened (or started) on first use
+    _journal: Optional[BalanceJournal] = None
+    # ((inode, size, mtime) of the change log, its version), read again when the file changes
+    _change_version: Optional[Tuple[Tuple[int, int, int], int]] = None
+    # History entries and events recorded by the transact() attempt running in each thread
+    _recorded = threading.local()
+    # flock does not exclude threads sharing a descriptor, so threads also take this lock
+    _thread_lock = threading.RLock()
+    # Nesting depth of _commit_lock() in the thread holding it
+    _lock_depth = 0
+
     @staticmethod
     def load_players_map() -> OperationResult:
         """
-        Loads the full players.json as a mapping id → player-dict.
+        Loads the full players.json (every shard) as a mapping id → player-dict,
+        with the current balances from the balance ledger.
 
         Returns:
             OperationResult:
@@ -24,33 +124,624 @@ class DataPersistence:
                 data (Dict[str, Any]): Mapping of all players if ok.
                 error (str): Error message otherwise.
         """
-        # Ensure directory exists
-        Path(PLAYERS_FILE).parent.mkdir(parents=True, exist_ok=True)
-        # If file does not exist, initialize as empty dict
-        if not Path(PLAYERS_FILE).exists():
-            FileManager.write_file(PLAYERS_FILE, {}, mode='w')
-
-        raw = FileManager.read_file_json(PLAYERS_FILE)
-        if not raw.ok:
-            return raw
+        map_res = DataPersistence._load_stored_map()
+        if not map_res.ok:
+            return map_res
+        ledger_res = DataPersistence._balances()
+        if not ledger_res.ok:
+            return ledger_res
+        ledger_res.data.overlay(map_res.data.values(), ledger_res.data.snapshot())
+        return map_res
 
-        data = raw.data
-        if not isinstance(data, dict):
-            return OperationResult(ok=False, error="players.json corrupted (expected a JSON object).")
+    @staticmethod
+    def _load_stored_map() -> OperationResult:
+        """Reads every shard into one mapping, with the balances as stored (checkpoints)."""
+        data: Dict[str, Any] = {}
+        storage_format = DataPersistence.storage_format()
+        for path in DataPersistence._init_shard_files():
+            raw = FileManager.read_file_serialized(path, storage_format)
+            if not raw.ok:
+                return raw
+            if not isinstance(raw.data, dict):
+                return OperationResult(ok=False, error=f"{Path(path).name} corrupted (expected an object).")
+            data.update(raw.data)
         return OperationResult(ok=True, data=data)
 
     @staticmethod
-    def save_players_map(players_map: Dict[str, Any]) -> OperationResult:
+    def save_players_map(players_map: Dict[str, Any], changed_ids: Optional[Iterable[str]] = None,
+                         expected_version: Optional[str] = None,
+                         history: Optional[Dict[str, List[str]]] = None,
+                         events: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
+                         settlement: Optional[Tuple[Dict[str, float], str]] = None) -> OperationResult:
         """
-        Persists the entire mapping to players.json.
+        Persists the entire mapping to players.json and bumps the data version.
+        With several shards only those holding `changed_ids` are rewritten.
 
         Args:
             players_map (Dict[str, Any]): The full mapping of players.
+            changed_ids (Optional[Iterable[str]]): IDs added, modified or removed by this save.
+                None means "unknown", which rewrites every shard and forces consumers
+                of changes_since() to rebuild.
+            expected_version (Optional[str]): Compare-and-swap: only save if data_version()
+                still returns this token, i.e. nobody saved since `players_map` was loaded.
+            history (Optional[Dict[str, List[str]]]): Player ID → history entries added
+                by this save, to keep in the history archive.
+            events (Optional[List[Tuple[str, Dict[str, Any]]]]): (type, data) of the
+                change events of this save (see EventBus), besides the history and
+                balance events it publishes itself.
+            settlement (Optional[Tuple[Dict[str, float], str]]): (deltas, game) of
+                balance changes to settle (see settle_balances) together with the
+                save: checked before anything is written, and settled right after
+                the players are, under the same lock.
+
+        Returns:
+            OperationResult: ok=True if save succeeded; error otherwise
+                (VERSION_CONFLICT if expected_version is outdated).
+        """
+        with DataPersistence._commit_lock():
+            if expected_version is not None and DataPersistence.data_version() != expected_version:
+                return OperationResult(ok=False, error=VERSION_CONFLICT)
+            return DataPersistence._save_locked(players_map, changed_ids, history, events, settlement)
+
+    @staticmethod
+    def transact(mutate: Callable[[Dict[str, Any], Set[str]], OperationResult],
+                 retries: int = MAX_RETRIES) -> OperationResult:
+        """
+        Runs a read-modify-write of players.json without losing concurrent updates.
+
+        Loads the mapping and its version, lets `mutate` change it in place and saves
+        it only if the version is unchanged (compare-and-swap). If another process
+        saved in between, everything is reloaded and `mutate` runs again, after a
+        short randomized backoff. The lock is only held during each save, except
+        for the last attempt, which holds it for the whole cycle so that a writer
+        losing every race still gets through.
+
+        Args:
+            mutate (Callable): Called as mutate(players_map, changed_ids); edits the
+                mapping, adds every ID it adds/modifies/removes to the changed_ids set
+                and returns an OperationResult. If that result is not ok nothing is saved.
+                It may run several times, so it must not have other side effects,
+                except record_history() calls for the history entries it adds,
+                record_event() calls for its other changes and a record_settlement()
+                call for balance changes to settle with the save.
+            retries (int): Optimistic attempts before the locked one.
+
+        Returns:
+            OperationResult: The result of the last `mutate` call if it was saved;
+                the mutate, load or save error otherwise.
+        """
+        for attempt in range(max(retries, 0) + 1):
+            if attempt == retries:
+                with DataPersistence._commit_lock():
+                    return DataPersistence._mutate_and_save(mutate, None)
+
+            # The version is read first: a newer map only causes a spurious conflict
+            res = DataPersistence._mutate_and_save(mutate, DataPersistence.data_version())
+            if res.ok or res.error != VERSION_CONFLICT:
+                return res
+            time.sleep(_jitter.uniform(0, RETRY_BACKOFF * 2 ** min(attempt, 6)))
+
+    @staticmethod
+    def _mutate_and_save(mutate: Callable[[Dict[str, Any], Set[str]], OperationResult],
+                         version: Optional[str]) -> OperationResult:
+        """
+        One transact() attempt: load, mutate and save, as a compare-and-swap
+        against `version`, or directly if None (the caller holds the lock).
+        """
+        map_res = DataPersistence.load_players_map()
+        if not map_res.ok:
+            return map_res
+
+        changed: Set[str] = set()
+        DataPersistence._recorded.history = {}
+        DataPersistence._recorded.events = []
+        DataPersistence._recorded.settlement = None
+        try:
+            res = mutate(map_res.data, changed)
+        finally:
+            history = DataPersistence._recorded.__dict__.pop("history")
+            events = DataPersistence._recorded.__dict__.pop("events")
+            settlement = DataPersistence._recorded.__dict__.pop("settlement")
+        if not res.ok:
+            return res
+
+        if version is None:
+            save_res = DataPersistence._save_locked(map_res.data, changed, history, events, settlement)
+        else:
+            save_res = DataPersistence.save_players_map(map_res.data, changed_ids=changed, expected_version=version,
+                                                        history=history, events=events, settlement=settlement)
+        return res if save_res.ok else save_res
+
+    @staticmethod
+    def record_history(player_id: str, entries: List[str]) -> None:
+        """
+        Called from a transact() mutate: the history entries it adds to a player,
+        which are kept in the history archive if the attempt is saved.
+        """
+        history = getattr(DataPersistence._recorded, "history", None)
+        if history is None:
+            raise RuntimeError("record_history() must be called from a transact() mutate.")
+        history.setdefault(player_id, []).extend(entries)
+
+    @staticmethod
+    def record_event(event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Called from a transact() mutate: a change event (see EventBus), published
+        if the attempt is saved.
+        """
+        events = getattr(DataPersistence._recorded, "events", None)
+        if events is None:
+            raise RuntimeError("record_event() must be called from a transact() mutate.")
+        events.append((event_type, data))
+
+    @staticmethod
+    def record_settlement(deltas: Dict[str, float], game: str = '') -> None:
+        """
+        Called from a transact() mutate: balance changes (see settle_balances) that
+        are settled together with the save if the attempt is saved. They are
+        checked before the save is written; if they cannot be settled nothing is.
+        """
+        if not hasattr(DataPersistence._recorded, "settlement"):
+            raise RuntimeError("record_settlement() must be called from a transact() mutate.")
+        DataPersistence._recorded.settlement = (dict(deltas), game)
+
+    @staticmethod
+    def _save_locked(players_map: Dict[str, Any], changed_ids: Optional[Iterable[str]],
+                     history: Optional[Dict[str, List[str]]] = None,
+                     events: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
+                     settlement: Optional[Tuple[Dict[str, float], str]] = None) -> OperationResult:
+        """save_players_map without the lock and version check (the caller holds the lock)."""
+        if changed_ids is not None:
+            changed_ids = list(changed_ids)
+        ledger_res = DataPersistence._balances()
+        if not ledger_res.ok:
+            return ledger_res
+        journal_res = DataPersistence._balance_journal()
+        if not journal_res.ok:
+            return journal_res
+        ledger: BalanceLedger = ledger_res.data
+        settled: Dict[str, int] = {}
+        if settlement:
+            plan_res = DataPersistence._plan_settlement(ledger, settlement[0])
+            if not plan_res.ok:
+                return plan_res
+            settled = plan_res.data
+        if history:
+            # Archived first: an entry may outlive a save that then fails, but is never lost
+            archive_res = DataPersistence._history_archive()
+            if not archive_res.ok:
+                return archive_res
+            try:
+                archive_res.data.append(history)
+            except OSError as e:
+                return OperationResult(ok=False, error=f"Error archiving history: {e}")
+        previous = DataPersistence._stamp()
+        # New players get a slot; balances are only written once the players are
+        prepared = ledger.prepare(players_map, changed_ids)
+        changes = [
+            (player_id, cents, cents, OPEN) if before is None else
+            (player_id, -before, 0, CLOSE) if cents is None else
+            (player_id, cents - before, cents, ADJUSTMENT)
+            for player_id, before, cents in prepared
+        ]
+        events = list(events or [])
+        events += [(BALANCE_CHANGED, {"player_id": player_id, "delta": delta / 100, "balance": cents / 100, "game": ''})
+                   for player_id, delta, cents, kind in changes if kind == ADJUSTMENT]
+        events += [(HISTORY_PUSHED, {"player_id": player_id, "entry": entry})
+                   for player_id, entries in (history or {}).items() for entry in entries]
+        save_res = DataPersistence._write_shards(players_map, changed_ids)
+        if not save_res.ok:
+            # A failed save leaves every balance as it was
+            ledger.discard(prepared)
+        else:
+            ledger.apply(prepared)
+            # Only once written: the journal and the event log must never record a
+            # change that was not made. Still under the lock, so the log keeps commit order
+            try:
+                journal_res.data.append(changes, '', ledger.snapshot)
+            except OSError as e:
+                # The save is made; the next rebuild_balances() reconciles the journal
+                log.log_e(e)
+            if settled:
+                events += DataPersistence._settle_locked(ledger, journal_res.data, settlement[0], settled, settlement[1])
+            try:
+                logged = EventBus.log().append(events)
+            except OSError as e:
+                # The save is made; only its events are missing from the log
+                log.log_e(e)
+                logged = []
+            DataPersistence._record_change(changed_ids)
+            DataPersistence._update_indexes(players_map, changed_ids, previous, settled)
+            EventBus.deliver(logged)
+        return save_res
+
+    @staticmethod
+    def settle_balances(deltas: Dict[str, float], game: str = '') -> OperationResult:
+        """
+        Adds amounts to players' balances in place, in the balance ledger, without
+        rewriting players.json, and records them in the balance journal and as
+        balance_changed events. Either every balance is updated or none is.
+
+        Args:
+            deltas (Dict[str, float]): Player ID → amount to add (negative to charge).
+            game (str): Game the amounts were won or lost in; without one they are
+                recorded as adjustments.
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the balances were updated.
+                data (Dict[str, float]): Player ID → new balance.
+                error (str): Unknown player or resulting negative balance otherwise.
+        """
+        ledger_res = DataPersistence._balances()
+        if not ledger_res.ok:
+            return ledger_res
+        ledger: BalanceLedger = ledger_res.data
+        journal_res = DataPersistence._balance_journal()
+        if not journal_res.ok:
+            return journal_res
+
+        with DataPersistence._commit_lock():
+            previous = DataPersistence._stamp()
+            plan_res = DataPersistence._plan_settlement(ledger, deltas)
+            if not plan_res.ok:
+                return plan_res
+            balances: Dict[str, int] = plan_res.data
+            events = DataPersistence._settle_locked(ledger, journal_res.data, deltas, balances, game)
+            try:
+                logged = EventBus.log().append(events)
+            except OSError as e:
+                # The balances are settled; only their events are missing from the log
+                log.log_e(e)
+                logged = []
+            DataPersistence._update_indexes({}, [], previous, balances)
+            EventBus.deliver(logged)
+        return OperationResult(ok=True, data={player_id: cents / 100 for player_id, cents in balances.items()})
+
+    @staticmethod
+    def _plan_settlement(ledger: BalanceLedger, deltas: Dict[str, float]) -> OperationResult:
+        """
+        Checks that balance changes can be settled (lock held): data is player ID →
+        new balance in cents, or the error is an unknown player or a negative balance.
+        """
+        balances: Dict[str, int] = {}
+        for player_id, delta in deltas.items():
+            cents = ledger.cents(player_id)
+            if cents is None:
+                return OperationResult(ok=False, error=f"Player ID '{player_id}' not found.")
+            balances[player_id] = cents + to_cents(delta)
+            if balances[player_id] < 0:
+                return OperationResult(ok=False, error="Balance cannot be negative.")
+        return OperationResult(ok=True, data=balances)
+
+    @staticmethod
+    def _settle_locked(ledger: BalanceLedger, journal: BalanceJournal, deltas: Dict[str, float],
+                       balances: Dict[str, int], game: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Settles planned balances in the ledger and journals them (lock held).
+
+        Returns:
+            List[Tuple[str, Dict[str, Any]]]: Their balance_changed events, to log.
+        """
+        for player_id, cents in balances.items():
+            ledger.settle(player_id, cents)
+        try:
+            journal.append([(player_id, to_cents(deltas[player_id]), cents, BET if game else ADJUSTMENT)
+                            for player_id, cents in balances.items()], game, ledger.snapshot)
+        except OSError as e:
+            # The balances are settled; the next rebuild_balances() reconciles the journal
+            log.log_e(e)
+        return [(BALANCE_CHANGED, {"player_id": player_id, "delta": to_cents(deltas[player_id]) / 100,
+                                   "balance": cents / 100, "game": game})
+                for player_id, cents in balances.items()]
+
+    @staticmethod
+    def rebuild_balances(reset: bool = False) -> OperationResult:
+        """
+        Recovery tool: rebuilds the balance slot map from the slots recorded in
+        players.json, recreating the ledger file if it is missing or damaged
+        (its balances then come from the checkpoints in players.json).
+
+        Args:
+            reset (bool): Also reset every balance to its players.json checkpoint.
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the ledger was rebuilt.
+                data (int): Number of players given a new slot.
+                error (str): Error message otherwise.
+        """
+        with DataPersistence._commit_lock():
+            if DataPersistence._ledger is not None:
+                DataPersistence._ledger.close()
+            ledger = BalanceLedger()
+            res = DataPersistence._rebuild_ledger(ledger, reset)
+            DataPersistence._ledger = ledger if res.ok else None
+        return res
+
+    @staticmethod
+    def shard_count() -> int:
+        """Number of shard files the players are stored in (1 = players.json only)."""
+        return DataPersistence._layout()[0]
+
+    @staticmethod
+    def storage_format() -> str:
+        """Serializer the player files are written with (see Serializers; default 'json')."""
+        return DataPersistence._layout()[1]
+
+    @staticmethod
+    def shard_paths(shards: Optional[int] = None, storage_format: Optional[str] = None) -> List[str]:
+        """
+        Files holding the players, in shard order.
+
+        Args:
+            shards (Optional[int]): Shard count (defaults to the current one).
+            storage_format (Optional[str]): Format, which sets the file suffix (defaults to the current one).
+        """
+        current_shards, current_format = DataPersistence._layout()
+        shards = current_shards if shards is None else shards
+        suffix = get_serializer(current_format if storage_format is None else storage_format).suffix
+        if shards == 1:
+            return [PLAYERS_FILE if suffix == '.json' else SHARDS_DIR + suffix]
+        return [f"{SHARDS_DIR}/{shards}-{shard:03d}{suffix}" for shard in range(shards)]
+
+    @staticmethod
+    def reshard(shards: int, storage_format: Optional[str] = None) -> OperationResult:
+        """
+        Redistributes every player into `shards` files (1 = back to players.json),
+        optionally converting them to another format.
+
+        Meant to run offline: other processes are blocked only while it runs, and
+        their pending transact() calls retry against the new layout. The new files
+        are written first and the shard count is switched last, so an interrupted
+        run leaves the previous layout in use.
+
+        Args:
+            shards (int): New shard count.
+            storage_format (Optional[str]): New format, e.g. 'json-compact' or
+                'binary' (defaults to the current one).
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the players were redistributed.
+                data (int): Number of players moved.
+                error (str): Error message otherwise.
+        """
+        if shards < 1:
+            return OperationResult(ok=False, error="The number of shards must be at least 1.")
+        if storage_format is not None and storage_format not in SERIALIZERS:
+            return OperationResult(ok=False, error=f"Unknown format \"{storage_format}\" (available: {', '.join(SERIALIZERS)}).")
+        with DataPersistence._commit_lock():
+            old_paths = DataPersistence.shard_paths()
+            old_format = DataPersistence.storage_format()
+            storage_format = old_format if storage_format is None else storage_format
+            map_res = DataPersistence.load_players_map()
+            if not map_res.ok:
+                return map_res
+            if len(old_paths) == shards and old_format == storage_format:
+                return OperationResult(ok=True, data=len(map_res.data))
+
+            new_paths = DataPersistence.shard_paths(shards, storage_format)
+            for path, part in zip(new_paths, DataPersistence._split(map_res.data, shards)):
+                write_res = FileManager.write_file(path, part, mode='w', serializer=storage_format)
+                if not write_res.ok:
+                    return write_res
+            switch_res = FileManager.write_file(SHARDS_FILE, {"shards": shards, "format": storage_format}, mode='w')
+            if not switch_res.ok:
+                return switch_res
+
+            new_paths = set(new_paths)
+            for path in old_paths:
+                if path not in new_paths:
+                    Path(path).unlink(missing_ok=True)
+            DataPersistence._record_change(None)
+            DataPersistence._indexes = None
+        return OperationResult(ok=True, data=len(map_res.data))
+
+    @staticmethod
+    def indexes() -> OperationResult:
+        """
+        Returns the secondary indexes on account_balance and created_at.
+
+        They are built from players.json on first use and then maintained
+        incrementally by save_players_map; if the file was changed by other
+        means (its fingerprint differs) they are rebuilt. Before building
+        them, the warm-start file is tried: if it was saved from the current
+        data, the indexes are read from it in one go. After they change, the
+        file is rewritten in the background (see WarmStart).
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the indexes are available.
+                data (PlayerIndexes): The indexes (read-only) if ok.
+                error (str): Error message otherwise.
+        """
+        current = DataPersistence._indexes
+        if current is not None and current.fingerprint == DataPersistence._stamp():
+            return OperationResult(ok=True, data=current)
+
+        # Stamped before loading: a change in between only causes another rebuild
+        stamp = DataPersistence._stamp()
+        warm = DataPersistence._warm_start.load(stamp)
+        if warm is not None:
+            DataPersistence._indexes = warm
+            return OperationResult(ok=True, data=warm)
+        map_res = DataPersistence.load_players_map()
+        if not map_res.ok:
+            return map_res
+        DataPersistence._indexes = PlayerIndexes(map_res.data, stamp)
+        DataPersistence._schedule_warm_start()
+        return OperationResult(ok=True, data=DataPersistence._indexes)
+
+    @staticmethod
+    def warm_up() -> None:
+        """
+        Loads the indexes in a background thread, e.g. while the main menu waits
+        for the user, so that the first action finds them ready.
+        """
+        threading.Thread(target=DataPersistence.indexes, name='pybet-warm-up', daemon=True).start()
+
+    @staticmethod
+    def data_version() -> str:
+        """
+        Returns a token identifying the current contents of players.json.
+
+        The token is "<saves>.<settlements>": the change counter of players.json
+        and the number of balance settlements, while the file is exactly as last
+        saved by DataPersistence; if it was modified by other means the file
+        fingerprint is appended, so the token still changes but changes_since()
+        cannot be used.
 
         Returns:
-            OperationResult: ok=True if save succeeded; error otherwise.
+            str: Version token.
         """
-        return FileManager.write_file(PLAYERS_FILE, players_map, mode='w')
+        journal = DataPersistence._load_change_log()
+        ledger_res = DataPersistence._balances()
+        version = f"{journal['version']}.{ledger_res.data.sequence if ledger_res.ok else 0}"
+        fingerprint = DataPersistence._fingerprint()
+        if journal.get("fingerprint") != fingerprint:
+            version += f"+{fingerprint}"
+        return version
+
+    @staticmethod
+    def changes_since(version: str, until: Optional[str] = None) -> OperationResult:
+        """
+        Lists the player IDs changed after a given data version.
+
+        Args:
+            version (str): Token previously returned by data_version().
+            until (Optional[str]): A later token, e.g. the version of a snapshot:
+                fails if `version` is newer than it. The IDs changed after it are
+                still listed.
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the change log covers every version since `version`.
+                data (Set[str]): IDs added, modified or removed since then.
+                error (str): Reason the changes are unknown otherwise.
+        """
+        current = DataPersistence.data_version()
+        parsed, now_parsed = _VERSION.fullmatch(version), _VERSION.fullmatch(current)
+        if parsed is None or now_parsed is None:
+            return OperationResult(ok=False, error="Data was modified outside DataPersistence.")
+        (since, settled), (now, settled_now) = map(int, parsed.groups()), map(int, now_parsed.groups())
+        if since > now or settled > settled_now:
+            return OperationResult(ok=False, error="Version is newer than the data.")
+        if until is not None:
+            bound = _VERSION.fullmatch(until)
+            if bound is None or since > int(bound.group(1)) or settled > int(bound.group(2)):
+                return OperationResult(ok=False, error=f"Version is newer than {until}.")
+
+        changes = [c for c in DataPersistence._load_change_log()["changes"] if c[0] > since]
+        if len(changes) != now - since:
+            return OperationResult(ok=False, error="Change log does not reach that version.")
+        changed: Set[str] = set()
+        for _, ids in changes:
+            if ids is None:
+                return OperationResult(ok=False, error="A change without known IDs was recorded.")
+            changed.update(ids)
+
+        ledger: BalanceLedger = DataPersistence._balances().data
+        slots = ledger.changes(settled)
+        if slots is None:
+            return OperationResult(ok=False, error="Balance log does not reach that version.")
+        owners = ledger.owners()
+        changed.update(owners[slot] for slot in slots if slot in owners)
+        return OperationResult(ok=True, data=changed)
+
+    @staticmethod
+    def balance_at(player_id: str, when: datetime.datetime) -> OperationResult:
+        """
+        A player's balance at a past time, from the balance journal: the nearest
+        checkpoint before `when` plus the entries made since.
+
+        Args:
+            player_id (str): Player ID.
+            when (datetime.datetime): Time (naive = local time).
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the journal covers `when`.
+                data (Optional[float]): The balance, or None if the player did not exist then.
+                error (str): Message otherwise.
+        """
+        journal_res = DataPersistence._balance_journal()
+        if not journal_res.ok:
+            return journal_res
+        covered, cents = journal_res.data.balance_at(player_id, when)
+        if not covered:
+            return OperationResult(ok=False, error="The balance journal does not go back that far.")
+        return OperationResult(ok=True, data=None if cents is None else cents / 100)
+
+    @staticmethod
+    def balances_at(when: datetime.datetime) -> OperationResult:
+        """
+        Every player's balance at a past time (see balance_at()).
+
+        Returns:
+            OperationResult: ok/data (Dict[str, float], player ID → balance) or error.
+        """
+        journal_res = DataPersistence._balance_journal()
+        if not journal_res.ok:
+            return journal_res
+        balances = journal_res.data.balances_at(when)
+        if balances is None:
+            return OperationResult(ok=False, error="The balance journal does not go back that far.")
+        return OperationResult(ok=True, data={player_id: cents / 100 for player_id, cents in balances.items()})
+
+    @staticmethod
+    def balance_entries(player_id: Optional[str] = None, since: Optional[datetime.datetime] = None,
+                        until: Optional[datetime.datetime] = None) -> OperationResult:
+        """
+        Entries of the balance journal (see BalanceJournal.entries()), optionally of
+        one player and/or within [since, until], oldest first.
+
+        Returns:
+            OperationResult: ok/data (List[Dict[str, Any]]) or error.
+        """
+        journal_res = DataPersistence._balance_journal()
+        if not journal_res.ok:
+            return journal_res
+        return OperationResult(ok=True, data=list(journal_res.data.entries(player_id, since, until)))
+
+    @staticmethod
+    def audit_balances() -> OperationResult:
+        """
+        Audits the balance journal: checks the chain of each player's entries and
+        compares the result with the current balances and with the earnings
+        totals (earnings_totals.json).
+
+        Returns:
+            OperationResult: ok/data (the BalanceJournal.audit() report) or error.
+        """
+        ledger_res = DataPersistence._balances()
+        if not ledger_res.ok:
+            return ledger_res
+        journal_res = DataPersistence._balance_journal()
+        if not journal_res.ok:
+            return journal_res
+        report = journal_res.data.audit(ledger_res.data.snapshot(), EarningsTracker.get_all_earnings())
+        return OperationResult(ok=True, data=report)
+
+    @staticmethod
+    def history_entries(player_id: Optional[str] = None, since: Optional[datetime.datetime] = None,
+                        until: Optional[datetime.datetime] = None) -> OperationResult:
+        """
+        Complete history from the history archive (not only the last entries kept
+        in the records), optionally of one player and/or within [since, until].
+        Only the archive segments of the days in the range are read.
+
+        Returns:
+            OperationResult: ok/data (List[Dict[str, Any]]: at, player_id, entry; oldest
+                first) or error.
+        """
+        archive_res = DataPersistence._history_archive()
+        if not archive_res.ok:
+            return archive_res
+        try:
+            return OperationResult(ok=True, data=list(archive_res.data.entries(player_id, since, until)))
+        except (OSError, ValueError, KeyError) as e:
+            return OperationResult(ok=False, error=f"Error reading the history archive: {e}")
 
     @staticmethod
     def load_all_players() -> OperationResult:
@@ -71,4 +762,378 @@ class DataPersistence:
             players = [Player.from_dict(v) for v in map_res.data.values()]
             return OperationResult(ok=True, data=players)
         except Exception as e:
-            return OperationResult(ok=False, error=f"Error parsing players: {e}")
\ No newline at end of file
+            return OperationResult(ok=False, error=f"Error parsing players: {e}")
+
+    @staticmethod
+    def load_player_table() -> OperationResult:
+        """
+        Loads every player into a compact, columnar PlayerTable instead of a
+        list of Player objects. The players are streamed (iter_players) into the
+        table one at a time, so the whole mapping is never held in memory.
+
+        Returns:
+            OperationResult:
+                ok (bool): True if load+parse succeeded.
+                data (PlayerTable): The table if ok.
+                error (str): Error message otherwise.
+        """
+        try:
+            rows = DataPersistence.iter_players(fields=PLAYER_FIELDS)
+            return OperationResult(ok=True, data=PlayerTable.from_records(row._asdict() for row in rows))
+        except RuntimeError as e:
+            return OperationResult(ok=False, error=str(e))
+        except Exception as e:
+            return OperationResult(ok=False, error=f"Error parsing players: {e}")
+
+    @staticmethod
+    def iter_players(fields: Optional[Iterable[str]] = None, lazy: bool = False,
+                     shard: Optional[int] = None) -> Iterator[Any]:
+        """
+        Streams the players one at a time, parsing players.json incrementally
+        (FileManager.iter_file_json_object), so a scan runs in constant memory.
+        Shards are read one after another, or only `shard`, so a scan can be
+        split across workers, one per shard (see shard_count()).
+
+        Args:
+            fields (Optional[Iterable[str]]): Yield light named tuples with only
+                these Player fields (e.g. ("id", "account_balance")) instead of players.
+            lazy (bool): Yield LazyPlayer proxies, which read the stored fields from
+                the raw record and only build the Player when something else is used.
+            shard (Optional[int]): Only stream this shard (0 ≤ shard < shard_count()).
+
+        Yields:
+            Player | LazyPlayer | PlayerProjection: Each stored player, in file order.
+
+        Raises:
+            ValueError: If `fields` names an unknown field, or `shard` does not exist.
+            RuntimeError: If players.json cannot be read or parsed.
+        """
+        projection = tuple(fields) if fields is not None else None
+        if projection is not None:
+            projection_type(projection)  # validate the fields before reading anything
+
+        ledger_res = DataPersistence._balances()
+        if not ledger_res.ok:
+            raise RuntimeError(f"Error reading players: {ledger_res.error}")
+        balances = ledger_res.data.snapshot()
+        storage_format = DataPersistence.storage_format()
+        paths = DataPersistence._init_shard_files()
+        if shard is not None:
+            if not 0 <= shard < len(paths):
+                raise ValueError(f"Shard {shard} does not exist ({len(paths)} shards).")
+            paths = [paths[shard]]
+
+        try:
+            for path in paths:
+                for _, record in FileManager.iter_file_serialized(path, storage_format):
+                    cents = balances.get(record.get("id"))
+                    if cents is not None:
+                        record["account_balance"] = cents / 100
+                    if projection is not None:
+                        yield project(record, projection)
+                    elif lazy:
+                        yield LazyPlayer(record)
+                    else:
+                        yield Player.from_dict(record)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise RuntimeError(f"Error reading players: {e}") from e
+
+    @staticmethod
+    def snapshot() -> OperationResult:
+        """
+        Pins the current state of every player for a long, consistent read.
+
+        Under the commit lock, the player files are hard linked (copied if the
+        file system cannot link them) into a directory of the snapshot and the
+        balance slots are copied, which only holds writers back for a moment; the
+        snapshot is then read without locks (see PlayerSnapshot).
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the snapshot was taken.
+                data (PlayerSnapshot): The snapshot (release it when done) if ok.
+                error (str): Error message otherwise.
+        """
+        ledger_res = DataPersistence._balances()
+        if not ledger_res.ok:
+            return ledger_res
+        ledger: BalanceLedger = ledger_res.data
+        PlayerSnapshot.remove_stale()
+        try:
+            Path(SNAPSHOTS_DIR).mkdir(parents=True, exist_ok=True)
+            directory = tempfile.mkdtemp(dir=SNAPSHOTS_DIR, prefix=f"{os.getpid()}-")
+        except OSError as e:
+            return OperationResult(ok=False, error=f"Error creating the snapshot: {e}")
+        try:
+            with DataPersistence._commit_lock():
+                storage_format = DataPersistence.storage_format()
+                suffix = get_serializer(storage_format).suffix
+                paths: List[str] = []
+                for shard, path in enumerate(DataPersistence._init_shard_files()):
+                    pinned = f"{directory}/{shard:03d}{suffix}"
+                    try:
+                        os.link(path, pinned)
+                    except OSError:
+                        shutil.copyfile(path, pinned)
+                    paths.append(pinned)
+                version = DataPersistence.data_version()
+                slots, area = ledger.frozen()
+        except OSError as e:
+            shutil.rmtree(directory, ignore_errors=True)
+            return OperationResult(ok=False, error=f"Error creating the snapshot: {e}")
+        return OperationResult(ok=True, data=PlayerSnapshot(directory, paths, storage_format, version, slots, area))
+
+    @staticmethod
+    @contextmanager
+    def _commit_lock() -> Iterator[None]:
+        """Exclusive lock (across threads and processes) around a save; re-entrant."""
+        with DataPersistence._thread_lock:
+            if fcntl is None or DataPersistence._lock_depth:
+                DataPersistence._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    DataPersistence._lock_depth -= 1
+                return
+            Path(LOCK_FILE).parent.mkdir(parents=True, exist_ok=True)
+            with open(LOCK_FILE, 'a') as lock:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                DataPersistence._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    DataPersistence._lock_depth -= 1
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _balances() -> OperationResult:
+        """
+        The balance ledger (OperationResult data), built from the balances stored in
+        players.json on first run or if its files are missing or invalid.
+        """
+        ledger = DataPersistence._ledger
+        if ledger is not None and ledger.is_open:
+            return OperationResult(ok=True, data=ledger)
+        ledger = BalanceLedger()
+        if not ledger.open():
+            with DataPersistence._commit_lock():
+                # Another process may have built it while we waited
+                if not ledger.open():
+                    res = DataPersistence._rebuild_ledger(ledger, reset=False)
+                    if not res.ok:
+                        return res
+        DataPersistence._ledger = ledger
+        return OperationResult(ok=True, data=ledger)
+
+    @staticmethod
+    def _balance_journal() -> OperationResult:
+        """
+        The balance journal (OperationResult data), started with the current
+        balances as its opening checkpoint if it does not exist yet.
+        """
+        journal = DataPersistence._journal
+        if journal is not None and journal.is_open:
+            return OperationResult(ok=True, data=journal)
+        journal = BalanceJournal()
+        if not journal.open():
+            ledger_res = DataPersistence._balances()
+            if not ledger_res.ok:
+                return ledger_res
+            with DataPersistence._commit_lock():
+                # Another process may have started it while we waited
+                if not journal.open():
+                    try:
+                        journal.create(ledger_res.data.snapshot())
+                    except OSError as e:
+                        return OperationResult(ok=False, error=f"Error starting the balance journal: {e}")
+        DataPersistence._journal = journal
+        return OperationResult(ok=True, data=journal)
+
+    @staticmethod
+    def _history_archive() -> OperationResult:
+        """
+        The history archive (OperationResult data), started with the entries
+        stored in the records if it does not exist yet.
+        """
+        archive = HistoryArchive()
+        if archive.exists():
+            return OperationResult(ok=True, data=archive)
+        with DataPersistence._commit_lock():
+            if not archive.exists():
+                map_res = DataPersistence._load_stored_map()
+                if not map_res.ok:
+                    return map_res
+                try:
+                    archive.create({player_id: record.get("history", []) for player_id, record in map_res.data.items()})
+                except OSError as e:
+                    return OperationResult(ok=False, error=f"Error starting the history archive: {e}")
+        return OperationResult(ok=True, data=archive)
+
+    @staticmethod
+    def _rebuild_ledger(ledger: BalanceLedger, reset: bool) -> OperationResult:
+        """Rebuilds `ledger` from players.json and stores the slots in it (lock held)."""
+        map_res = DataPersistence._load_stored_map()
+        if not map_res.ok:
+            return map_res
+        reassigned = ledger.rebuild(map_res.data, reset)
+        if reassigned:
+            write_res = DataPersistence._write_shards(map_res.data, None)
+            if not write_res.ok:
+                return write_res
+        # Balances reset from players.json are recorded as adjustments
+        journal = DataPersistence._journal or BalanceJournal()
+        if journal.is_open or journal.open():
+            journal.reconcile(ledger.snapshot())
+        # Settlement numbering may restart: bump the save counter so old versions never match
+        DataPersistence._record_change(None)
+        DataPersistence._indexes = None
+        return OperationResult(ok=True, data=reassigned)
+
+    @staticmethod
+    def _stamp() -> str:
+        """
+        Fingerprint of players.json plus the settlement count and the change log
+        version: identifies the indexed state. The version catches changes that
+        leave both others as they were, e.g. rebuild_balances(reset=True).
+        """
+        ledger_res = DataPersistence._balances()
+        sequence = ledger_res.data.sequence if ledger_res.ok else 0
+        return f"{DataPersistence._fingerprint()}@{sequence}.{DataPersistence._change_log_version()}"
+
+    @staticmethod
+    def _change_log_version() -> int:
+        """Version of the change log, only parsed again when the file changed."""
+        try:
+            st = os.stat(CHANGES_FILE)
+        except OSError:
+            return 0
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        cached = DataPersistence._change_version
+        if cached is None or cached[0] != key:
+            cached = DataPersistence._change_version = (key, DataPersistence._load_change_log()["version"])
+        return cached[1]
+
+    @staticmethod
+    def _layout() -> Tuple[int, str]:
+        """Shard count and format from SHARDS_FILE (1 and DEFAULT_FORMAT if missing or invalid)."""
+        if not Path(SHARDS_FILE).exists():
+            return 1, DEFAULT_FORMAT
+        res = FileManager.read_file_json(SHARDS_FILE)
+        if not res.ok or not isinstance(res.data, dict):
+            return 1, DEFAULT_FORMAT
+        shards = res.data.get("shards")
+        storage_format = res.data.get("format")
+        return (shards if isinstance(shards, int) and shards > 0 else 1,
+                storage_format if storage_format in SERIALIZERS else DEFAULT_FORMAT)
+
+    @staticmethod
+    def _init_shard_files() -> List[str]:
+        """Shard paths, creating missing ones as empty mappings (first run)."""
+        storage_format = DataPersistence.storage_format()
+        paths = DataPersistence.shard_paths(storage_format=storage_format)
+        for path in paths:
+            if not Path(path).exists():
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                FileManager.write_file(path, {}, mode='w', serializer=storage_format)
+        return paths
+
+    @staticmethod
+    def _split(players_map: Dict[str, Any], shards: int) -> List[Dict[str, Any]]:
+        """Partitions the mapping by shard_of(id)."""
+        parts: List[Dict[str, Any]] = [{} for _ in range(shards)]
+        for player_id, record in players_map.items():
+            parts[shard_of(player_id, shards)][player_id] = record
+        return parts
+
+    @staticmethod
+    def _write_shards(players_map: Dict[str, Any], changed_ids: Optional[List[str]]) -> OperationResult:
+        """Writes the shards holding `changed_ids` (all of them if None)."""
+        storage_format = DataPersistence.storage_format()
+        paths = DataPersistence.shard_paths(storage_format=storage_format)
+        if len(paths) == 1:
+            return FileManager.write_file(paths[0], players_map, mode='w', serializer=storage_format)
+
+        if changed_ids is None:
+            targets = set(range(len(paths)))
+        else:
+            targets = {shard_of(player_id, len(paths)) for player_id in changed_ids}
+        parts = {shard: {} for shard in targets}
+        for player_id, record in players_map.items():
+            shard = shard_of(player_id, len(paths))
+            if shard in parts:
+                parts[shard][player_id] = record
+        for shard, part in sorted(parts.items()):
+            write_res = FileManager.write_file(paths[shard], part, mode='w', serializer=storage_format)
+            if not write_res.ok:
+                return write_res
+        return OperationResult(ok=True)
+
+    @staticmethod
+    def _fingerprint() -> Optional[str]:
+        """
+        Size and modification time of players.json (of every shard, joined by ';'),
+        or None if a file does not exist.
+        """
+        stamps: List[str] = []
+        for path in DataPersistence.shard_paths():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            stamps.append(f"{st.st_size}-{st.st_mtime_ns}")
+        return ";".join(stamps)
+
+    @staticmethod
+    def _update_indexes(players_map: Dict[str, Any], changed_ids: Optional[Iterable[str]],
+                        previous: Optional[str], balances: Optional[Dict[str, int]] = None) -> None:
+        """
+        Applies a successful save and/or settlement (player ID → new cents) to the
+        loaded indexes, or drops them (to be rebuilt on next use) if the changed
+        IDs are unknown or they were already stale.
+        """
+        current = DataPersistence._indexes
+        if current is None:
+            return
+        if changed_ids is None or current.fingerprint != previous:
+            DataPersistence._indexes = None
+            return
+        if changed_ids:
+            current.refresh(players_map, changed_ids)
+        for player_id, cents in (balances or {}).items():
+            current.set_balance(player_id, cents / 100)
+        current.fingerprint = DataPersistence._stamp()
+        DataPersistence._schedule_warm_start()
+
+    @staticmethod
+    def _schedule_warm_start() -> None:
+        """Has the warm-start file rewritten in the background from the loaded indexes."""
+        DataPersistence._warm_start.schedule(DataPersistence._warm_start_state)
+
+    @staticmethod
+    def _warm_start_state() -> Optional[Tuple[str, tuple]]:
+        """Fingerprint and state of the loaded indexes, if still current (called from the warm-start thread)."""
+        with DataPersistence._thread_lock:
+            current = DataPersistence._indexes
+            if current is None or current.fingerprint != DataPersistence._stamp():
+                return None
+            return current.fingerprint, current.state()
+
+    @staticmethod
+    def _load_change_log() -> Dict[str, Any]:
+        """Reads the change log, returning an empty one (version 0) if missing or invalid."""
+        journal: Dict[str, Any] = {"version": 0, "fingerprint": None, "changes": []}
+        if Path(CHANGES_FILE).exists():
+            res = FileManager.read_file_json(CHANGES_FILE)
+            if res.ok and isinstance(res.data, dict) and isinstance(res.data.get("version"), int):
+                journal.update(res.data)
+        return journal
+
+    @staticmethod
+    def _record_change(changed_ids: Optional[Iterable[str]]) -> None:
+        """Bumps the version, logs the changed IDs and stores the new file fingerprint."""
+        journal = DataPersistence._load_change_log()
+        journal["version"] += 1
+        ids = sorted(set(changed_ids)) if changed_ids is not None else None
+        journal["changes"] = (journal["changes"] + [[journal["version"], ids]])[-MAX_CHANGE_LOG:]
+        journal["fingerprint"] = DataPersistence._fingerprint()
+        FileManager.write_file(CHANGES_FILE, journal, mode='w')
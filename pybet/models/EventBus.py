@@ -0,0 +1,161 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import threading
+
+from pybet.helpers.FileManager import log
+from pybet.models.EventLog import EventLog
+from pybet.models.OperationResult import OperationResult
+
+# Events handled by EventBus.consume() between offset commits
+CONSUME_BATCH = 1000
+
+Handler = Callable[[Dict[str, Any]], None]
+
+
+class EventBus:
+    """
+    In-process publish/subscribe of change events, backed by the durable EventLog.
+
+    Events are dicts {"offset", "type", "at", "data"}; their types and data:
+        - player_created: player_id, name, balance, created_at.
+        - player_renamed: player_id, name.
+        - player_deleted: player_id.
+        - balance_changed: player_id, delta, balance, game ('' for changes made by hand).
+        - history_pushed: player_id, entry.
+        - history_popped: player_id, entry.
+        - enqueued: player_id, position (0 = front).
+        - dequeued: player_id.
+        - queue_cleared: (no data).
+        - earnings_updated: player_id, amount, total.
+
+    Player events are published by DataPersistence for every save and balance
+    settlement (on behalf of PlayerManager, PlayerSession and PlayerHistory), in
+    commit order; queue and earnings events by WaitingQueue and EarningsTracker.
+
+    Subscribers are called in the publishing thread, only for events published by
+    this process. Derived views that must see every event (including those of
+    other processes, or published while they were not running) use consume(),
+    which reads the log from the consumer's last committed offset.
+    """
+
+    # The log, opened on first use
+    _log: Optional[EventLog] = None
+    # (handler, types or None for all) of every subscriber
+    _subscribers: List[Tuple[Handler, Optional[frozenset]]] = []
+    _lock = threading.RLock()
+
+    @staticmethod
+    def log() -> EventLog:
+        """The event log shared by the process."""
+        with EventBus._lock:
+            if EventBus._log is None:
+                EventBus._log = EventLog()
+            return EventBus._log
+
+    @staticmethod
+    def publish(events: Iterable[Tuple[str, Dict[str, Any]]]) -> OperationResult:
+        """
+        Appends events to the log and delivers them to the subscribers.
+
+        Args:
+            events (Iterable[Tuple[str, Dict[str, Any]]]): (type, data) of each event, in order.
+
+        Returns:
+            OperationResult: ok/data (List[Dict[str, Any]], the stored events) or error.
+        """
+        try:
+            stored = EventBus.log().append(events)
+        except OSError as e:
+            return OperationResult(ok=False, error=f"Error logging events: {e}")
+        EventBus.deliver(stored)
+        return OperationResult(ok=True, data=stored)
+
+    @staticmethod
+    def deliver(events: List[Dict[str, Any]]) -> None:
+        """
+        Calls the subscribers with events already in the log. A failing subscriber
+        does not affect the publisher or the other subscribers; its error is logged.
+        """
+        with EventBus._lock:
+            subscribers = list(EventBus._subscribers)
+        for event in events:
+            for handler, types in subscribers:
+                if types is None or event["type"] in types:
+                    try:
+                        handler(event)
+                    except Exception as e:
+                        # The change is already made; the subscriber can catch up from the log
+                        log.log_e(e)
+
+    @staticmethod
+    def subscribe(handler: Handler, types: Optional[Iterable[str]] = None) -> None:
+        """
+        Calls `handler(event)` for every event published from now on by this process.
+
+        Args:
+            handler (Callable[[Dict[str, Any]], None]): Called in the publishing thread;
+                it should be quick, as saves may be waiting for it.
+            types (Optional[Iterable[str]]): Only these event types (default all).
+        """
+        with EventBus._lock:
+            EventBus._subscribers.append((handler, frozenset(types) if types is not None else None))
+
+    @staticmethod
+    def unsubscribe(handler: Handler) -> None:
+        """Stops calling `handler`."""
+        with EventBus._lock:
+            EventBus._subscribers = [s for s in EventBus._subscribers if s[0] is not handler]
+
+    @staticmethod
+    def read(offset: int = 0, types: Optional[Iterable[str]] = None,
+             limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Events in the log from `offset` on (see EventLog.read)."""
+        return EventBus.log().read(offset, types, limit)
+
+    @staticmethod
+    def consume(consumer: str, handler: Handler, types: Optional[Iterable[str]] = None,
+                limit: Optional[int] = None) -> OperationResult:
+        """
+        Catches a consumer up: calls `handler(event)` for every event after its last
+        committed offset, committing its new offset every CONSUME_BATCH events and
+        at the end. After a crash the events since the last commit are handled again,
+        so handlers must tolerate seeing an event twice.
+
+        Args:
+            consumer (str): Consumer name, under which its offset is kept.
+            handler (Callable[[Dict[str, Any]], None]): Applies one event.
+            types (Optional[Iterable[str]]): Only these event types (the others are
+                skipped, but still move the offset).
+            limit (Optional[int]): Read at most this many events (of any type).
+
+        Returns:
+            OperationResult:
+                ok (bool): True if every pending event (up to `limit`) was handled.
+                data (int): Events handled.
+                error (str): The handler or log error otherwise (the offset stays at
+                    the event that failed).
+        """
+        log = EventBus.log()
+        types = frozenset(types) if types is not None else None
+        offset = committed = log.position(consumer)
+        handled = 0
+        try:
+            for event in log.read(offset, limit=limit):
+                if types is None or event["type"] in types:
+                    try:
+                        handler(event)
+                    except Exception as e:
+                        return OperationResult(ok=False, error=f"Consumer '{consumer}' failed at event {event['offset']}: {e}")
+                    handled += 1
+                offset = event["offset"] + 1
+                if offset - committed >= CONSUME_BATCH:
+                    log.commit(consumer, offset)
+                    committed = offset
+        except (OSError, ValueError) as e:
+            return OperationResult(ok=False, error=f"Error reading events: {e}")
+        finally:
+            if offset != committed:
+                try:
+                    log.commit(consumer, offset)
+                except OSError:
+                    pass
+        return OperationResult(ok=True, data=handled)
@@ -0,0 +1,219 @@
+from bisect import bisect_right
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import datetime
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows: only in-process locking
+    fcntl = None
+
+from pybet.helpers.FileManager import FileManager
+
+EVENTS_DIR = './pybet/data/events'
+# Events per segment file: '<offset of its first event>.jsonl'
+SEGMENT_EVENTS = 65536
+_SEGMENT = '.jsonl'
+
+# Event types (the data of each is documented in EventBus)
+PLAYER_CREATED = 'player_created'
+PLAYER_RENAMED = 'player_renamed'
+PLAYER_DELETED = 'player_deleted'
+BALANCE_CHANGED = 'balance_changed'
+HISTORY_PUSHED = 'history_pushed'
+HISTORY_POPPED = 'history_popped'
+ENQUEUED = 'enqueued'
+DEQUEUED = 'dequeued'
+QUEUE_CLEARED = 'queue_cleared'
+EARNINGS_UPDATED = 'earnings_updated'
+EVENT_TYPES = (PLAYER_CREATED, PLAYER_RENAMED, PLAYER_DELETED, BALANCE_CHANGED, HISTORY_PUSHED,
+               HISTORY_POPPED, ENQUEUED, DEQUEUED, QUEUE_CLEARED, EARNINGS_UPDATED)
+
+
+class EventLog:
+    """
+    Durable, append-only log of change events, with the offsets of its consumers.
+
+    Every event gets the next offset (0, 1, 2...) and is stored as one JSON line
+    {"offset", "type", "at", "data"} in segment files of SEGMENT_EVENTS events,
+    named after their first offset, so reading from an offset only opens the
+    segments from there on. A line left unfinished by a crash was never
+    acknowledged: it is ignored by readers and dropped by the next append.
+
+    Each consumer's offset (the next event it has not processed) is kept in
+    consumers.json, so it can resume after a restart.
+
+    Appends and offset commits are serialized across threads and processes by a
+    lock on events.lock; readers need no lock.
+    """
+
+    def __init__(self, directory: str = EVENTS_DIR) -> None:
+        self.directory = directory
+        self.consumers_file = f"{directory}/consumers.json"
+        self.lock_file = f"{directory}/events.lock"
+        # (first offset, size, events) of the last segment as last seen by this process
+        self._tail: Optional[Tuple[int, int, int]] = None
+        self._thread_lock = threading.RLock()
+
+    def append(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Appends events, all with the current time.
+
+        Args:
+            events (Iterable[Tuple[str, Dict[str, Any]]]): (type, data) of each event, in order.
+
+        Returns:
+            List[Dict[str, Any]]: The stored events, with their offsets.
+
+        Raises:
+            OSError: If the log cannot be written.
+        """
+        events = list(events)
+        if not events:
+            return []
+        at = datetime.datetime.now().isoformat()
+        with self._lock():
+            first, count = self._last_segment()
+            stored: List[Dict[str, Any]] = []
+            lines: Dict[int, List[bytes]] = {}
+            for event_type, data in events:
+                if count == SEGMENT_EVENTS:
+                    first, count = first + count, 0
+                event = {"offset": first + count, "type": event_type, "at": at, "data": data}
+                lines.setdefault(first, []).append(json.dumps(event, ensure_ascii=False).encode('utf-8') + b'\n')
+                stored.append(event)
+                count += 1
+            # Recounted on the next append if a write fails halfway
+            self._tail = None
+            for segment, chunk in lines.items():
+                write_res = FileManager.write_file(self._path(segment), b''.join(chunk), mode='a')
+                if not write_res.ok:
+                    raise OSError(write_res.error)
+            self._tail = (first, os.path.getsize(self._path(first)), count)
+        return stored
+
+    def end_offset(self) -> int:
+        """Offset the next event will get (the number of events ever appended)."""
+        with self._lock():
+            first, count = self._last_segment()
+        return first + count
+
+    def read(self, offset: int = 0, types: Optional[Iterable[str]] = None,
+             limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the events from `offset` on, oldest first.
+
+        Args:
+            offset (int): First offset to read.
+            types (Optional[Iterable[str]]): Only yield events of these types.
+            limit (Optional[int]): Stop after this many events.
+        """
+        types = set(types) if types is not None else None
+        segments = self._segments()
+        start = max(bisect_right(segments, offset) - 1, 0)
+        yielded = 0
+        for first in segments[start:]:
+            try:
+                f = open(self._path(first), 'rb')
+            except OSError:
+                return
+            with f:
+                position = first
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # Being written (or left unfinished by a crash)
+                        return
+                    if position >= offset:
+                        if limit is not None and yielded >= limit:
+                            return
+                        event = json.loads(line)
+                        if types is None or event["type"] in types:
+                            yield event
+                            yielded += 1
+                    position += 1
+
+    def position(self, consumer: str) -> int:
+        """Offset of the next event `consumer` has to process (0 for a new consumer)."""
+        return self._load_consumers().get(consumer, 0)
+
+    def consumers(self) -> Dict[str, int]:
+        """Every consumer and its offset."""
+        return self._load_consumers()
+
+    def commit(self, consumer: str, offset: int) -> None:
+        """
+        Records that `consumer` processed every event before `offset`.
+
+        Raises:
+            OSError: If the offsets cannot be written.
+        """
+        with self._lock():
+            offsets = self._load_consumers()
+            offsets[consumer] = offset
+            write_res = FileManager.write_file(self.consumers_file, offsets, mode='w')
+            if not write_res.ok:
+                raise OSError(write_res.error)
+
+    def _load_consumers(self) -> Dict[str, int]:
+        if not os.path.exists(self.consumers_file):
+            return {}
+        res = FileManager.read_file_json(self.consumers_file)
+        return res.data if res.ok and isinstance(res.data, dict) else {}
+
+    def _segments(self) -> List[int]:
+        """First offsets of the segment files, in order."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(int(name[:-len(_SEGMENT)]) for name in names
+                      if name.endswith(_SEGMENT) and name[:-len(_SEGMENT)].isdigit())
+
+    def _path(self, first: int) -> str:
+        return f"{self.directory}/{first:012d}{_SEGMENT}"
+
+    def _last_segment(self) -> Tuple[int, int]:
+        """
+        First offset and number of events of the last segment (the lock must be
+        held). Only what was appended since this process last looked is counted,
+        and an unfinished last line is cut off.
+        """
+        segments = self._segments()
+        if not segments:
+            return 0, 0
+        first = segments[-1]
+        path = self._path(first)
+        size = os.path.getsize(path)
+        start, count = 0, 0
+        if self._tail is not None and self._tail[0] == first and self._tail[1] <= size:
+            start, count = self._tail[1], self._tail[2]
+            if start == size:
+                return first, count
+        with open(path, 'rb+') as f:
+            f.seek(start)
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            if end != len(data):
+                f.truncate(start + end)
+        count += data.count(b'\n', 0, end)
+        self._tail = (first, start + end, count)
+        return first, count
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        """Exclusive lock (across threads and processes) around appends and offset commits."""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            Path(self.directory).mkdir(parents=True, exist_ok=True)
+            with open(self.lock_file, 'a') as lock:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,219 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import datetime
+import json
+import os
+import zlib
+
+from pybet.helpers.FileManager import FileManager
+
+ARCHIVE_DIR = './pybet/data/history_archive'
+# Uncompressed bytes per compressed block of a sealed segment
+BLOCK_SIZE = 64 * 1024
+
+# Segment of the current day, appended to: '<day>.jsonl' (one [time, player ID, entry] per line)
+_OPEN = '.jsonl'
+# Sealed segment: compressed blocks of lines sorted by player, plus their index
+_SEALED = '.seg'
+_INDEX = '.idx'
+
+
+class HistoryArchive:
+    """
+    Archive of every history entry ever recorded, partitioned by day.
+
+    Player records only keep their most recent entries (the hot ring, see
+    Player.to_dict); each entry is also appended here, with its time, when the
+    save that records it succeeds. The day's segment is a plain append-only
+    file; segments of past days are sealed: their lines are sorted by player,
+    packed into zlib-compressed blocks of about BLOCK_SIZE bytes and indexed by
+    player (first and last block), so reading a player's entries of a day only
+    decompresses the blocks holding them. A time-range query only opens the
+    segments of the days in the range.
+
+    Writers must be serialized by the caller (DataPersistence holds its commit
+    lock around every append); sealed segments are never modified.
+    """
+
+    def __init__(self, directory: str = ARCHIVE_DIR) -> None:
+        self.directory = directory
+
+    def exists(self) -> bool:
+        return Path(self.directory).is_dir()
+
+    def create(self, histories: Dict[str, List[str]]) -> None:
+        """
+        Starts the archive with the entries already in the players' records; as
+        their time is unknown, they are archived with the current time. The
+        caller must hold the commit lock.
+        """
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        self.append(histories)
+
+    def append(self, entries: Dict[str, List[str]], when: Optional[datetime.datetime] = None) -> None:
+        """
+        Appends entries to the segment of the day, sealing the segments of past
+        days first. The caller must hold the commit lock.
+
+        Args:
+            entries (Dict[str, List[str]]): Player ID → new history entries, oldest first.
+            when (Optional[datetime.datetime]): Time of the entries (default now, local time).
+        """
+        when = when or datetime.datetime.now()
+        day = when.date().isoformat()
+        self.seal(before=day)
+        lines = ''.join(json.dumps([when.isoformat(), player_id, entry], ensure_ascii=False) + '\n'
+                        for player_id, new in entries.items() for entry in new)
+        if not lines:
+            return
+        path = self._path(day, _OPEN)
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                # A line left unfinished by a crash must not swallow the next one
+                if f.read(1) != b'\n':
+                    lines = '\n' + lines
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        write_res = FileManager.write_file(path, lines, mode='a')
+        if not write_res.ok:
+            raise OSError(write_res.error)
+
+    def seal(self, before: Optional[str] = None) -> int:
+        """
+        Seals the open segments of days before `before` (ISO date; default today).
+
+        Returns:
+            int: Segments sealed.
+        """
+        before = before or datetime.date.today().isoformat()
+        sealed = 0
+        for day, kind in self._segments():
+            if kind != _OPEN or day >= before:
+                continue
+            if not os.path.exists(self._path(day, _INDEX)):
+                self._seal(day)
+                sealed += 1
+            # Sealed (now or by an interrupted run): the open file is no longer read
+            Path(self._path(day, _OPEN)).unlink(missing_ok=True)
+        return sealed
+
+    def entries(self, player_id: Optional[str] = None, since: Optional[datetime.datetime] = None,
+                until: Optional[datetime.datetime] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields archived entries, optionally of one player and/or within [since, until], oldest first.
+
+        Yields:
+            Dict[str, Any]: at (ISO time), player_id and entry.
+        """
+        first = since.date().isoformat() if since is not None else None
+        last = until.date().isoformat() if until is not None else None
+        low = since.isoformat() if since is not None else None
+        high = until.isoformat() if until is not None else None
+        for day, kind in self._segments():
+            if (first is not None and day < first) or (last is not None and day > last):
+                continue
+            if kind == _OPEN and os.path.exists(self._path(day, _INDEX)):
+                continue
+            records = self._read_open(day, player_id) if kind == _OPEN else self._read_sealed(day, player_id)
+            # Sealed blocks are sorted by player: put the day back in time order (stable)
+            records.sort(key=lambda record: record[0])
+            for at, owner, entry in records:
+                if (low is None or at >= low) and (high is None or at <= high):
+                    yield {"at": at, "player_id": owner, "entry": entry}
+
+    def _segments(self) -> List[Tuple[str, str]]:
+        """(day, kind) of every segment, by day (an open and a sealed one may share a day)."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        segments = set()
+        for name in names:
+            day, kind = os.path.splitext(name)
+            if kind in (_OPEN, _INDEX) and not name.startswith('.'):
+                segments.add((day, kind))
+        return sorted(segments)
+
+    def _path(self, day: str, kind: str) -> str:
+        return f"{self.directory}/{day}{kind}"
+
+    def _read_open(self, day: str, player_id: Optional[str]) -> List[List[str]]:
+        """Records of an open segment, skipping a line left unfinished by a crash."""
+        records = []
+        try:
+            f = open(self._path(day, _OPEN), 'r', encoding='utf-8')
+        except OSError:
+            return records
+        with f:
+            for line in f:
+                if player_id is not None and player_id not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if player_id is None or record[1] == player_id:
+                    records.append(record)
+        return records
+
+    def _read_sealed(self, day: str, player_id: Optional[str]) -> List[List[str]]:
+        """Records of a sealed segment, decompressing only the blocks holding `player_id`."""
+        res = FileManager.read_file_json(self._path(day, _INDEX))
+        if not res.ok:
+            raise OSError(res.error)
+        index = res.data
+        blocks = index["blocks"]
+        if player_id is None:
+            wanted = range(len(blocks))
+        elif player_id in index["players"]:
+            start, end = index["players"][player_id]
+            wanted = range(start, end + 1)
+        else:
+            return []
+        records = []
+        with open(self._path(day, _SEALED), 'rb') as f:
+            for block in wanted:
+                offset, length = blocks[block]
+                f.seek(offset)
+                for line in zlib.decompress(f.read(length)).decode('utf-8').splitlines():
+                    record = json.loads(line)
+                    if player_id is None or record[1] == player_id:
+                        records.append(record)
+        return records
+
+    def _seal(self, day: str) -> None:
+        """Compresses an open segment into blocks and writes its index."""
+        records = self._read_open(day, None)
+        records.sort(key=lambda record: (record[1], record[0]))
+        data = bytearray()
+        blocks: List[List[int]] = []
+        players: Dict[str, List[int]] = {}
+        block: List[str] = []
+        size = 0
+
+        def flush() -> None:
+            nonlocal block, size
+            if block:
+                compressed = zlib.compress(''.join(block).encode('utf-8'))
+                blocks.append([len(data), len(compressed)])
+                data.extend(compressed)
+                block, size = [], 0
+
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False) + '\n'
+            if size and size + len(line) > BLOCK_SIZE:
+                flush()
+            block.append(line)
+            size += len(line)
+            span = players.setdefault(record[1], [len(blocks), len(blocks)])
+            span[1] = len(blocks)
+        flush()
+
+        write_res = FileManager.write_file(self._path(day, _SEALED), bytes(data), mode='w')
+        if write_res.ok:
+            # The index last: a segment is sealed once its index exists
+            write_res = FileManager.write_file(self._path(day, _INDEX),
+                                               {"day": day, "count": len(records), "blocks": blocks, "players": players},
+                                               mode='w', serializer='json')
+        if not write_res.ok:
+            raise OSError(write_res.error)
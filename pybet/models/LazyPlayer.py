@@ -0,0 +1,75 @@
+from __future__ import annotations
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from pybet.models.Player import Player
+
+# Player attributes, in players.json order
+PLAYER_FIELDS: Tuple[str, ...] = ("id", "name", "account_balance", "created_at", "history")
+
+class LazyPlayer:
+    """
+    Read-only stand-in for a Player that wraps its raw players.json record.
+
+    The stored fields (id, name, account_balance, created_at, history) are read
+    straight from the record; the full Player is only built the first time
+    anything else is needed (e.g. to_dict()), or explicitly with hydrate().
+    """
+    __slots__ = ('_record', '_player')
+
+    def __init__(self, record: Dict[str, Any]) -> None:
+        self._record = record
+        self._player: Optional[Player] = None
+
+    @property
+    def id(self) -> str:
+        return self._record["id"]
+
+    @property
+    def name(self) -> str:
+        return self._record["name"]
+
+    @property
+    def account_balance(self) -> float:
+        return self._record["account_balance"]
+
+    @property
+    def created_at(self) -> Optional[str]:
+        return self._record.get("created_at")
+
+    @property
+    def history(self) -> List[str]:
+        return self._record.get("history", [])
+
+    def hydrate(self) -> Player:
+        """Builds (once) and returns the full Player."""
+        if self._player is None:
+            self._player = Player.from_dict(self._record)
+        return self._player
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only reached for attributes that are not stored fields
+        return getattr(self.hydrate(), attr)
+
+    def __repr__(self) -> str:
+        return f"LazyPlayer(id={self.id!r}, name={self.name!r})"
+
+
+@lru_cache(maxsize=None)
+def projection_type(fields: Tuple[str, ...]) -> type:
+    """
+    Named tuple type holding only the given Player fields (one type per field set).
+
+    Raises:
+        ValueError: If a field is not a Player field.
+    """
+    unknown = [f for f in fields if f not in PLAYER_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown player fields: {', '.join(unknown)}.")
+    return namedtuple("PlayerProjection", fields)
+
+
+def project(record: Dict[str, Any], fields: Tuple[str, ...]) -> Any:
+    """Builds the projection of a raw record onto `fields`."""
+    return projection_type(fields)(*(record.get(f) if f != "history" else record.get(f, []) for f in fields))
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+class _TrieNode:
+    """One character step of the trie."""
+    __slots__ = ('children', 'ids', 'size')
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        # IDs of the players whose (casefolded) name ends at this node
+        self.ids: Optional[Set[str]] = None
+        # Number of IDs in this subtree, for O(len(prefix)) prefix counts
+        self.size = 0
+
+
+class NameIndex:
+    """
+    Trie over casefolded player names.
+
+    Supports prefix completion, exact lookup and bounded edit-distance
+    (Levenshtein) search. The fuzzy search walks the trie computing one row of
+    the edit-distance matrix per node, so names sharing a prefix share the work
+    and whole subtrees are pruned once every cell exceeds the allowed distance.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+
+    def __len__(self) -> int:
+        return self._root.size
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Key under which a name is indexed (casefolded)."""
+        return name.casefold()
+
+    def add(self, name: str, player_id: str) -> None:
+        """Indexes a player under its name."""
+        path = [self._root]
+        for ch in self.normalize(name):
+            path.append(path[-1].children.setdefault(ch, _TrieNode()))
+        node = path[-1]
+        if node.ids is None:
+            node.ids = set()
+        if player_id in node.ids:
+            return
+        node.ids.add(player_id)
+        for step in path:
+            step.size += 1
+
+    def remove(self, name: str, player_id: str) -> bool:
+        """
+        Removes a player from its name's entry, pruning nodes left empty.
+
+        Returns:
+            bool: True if the player was indexed under that name.
+        """
+        key = self.normalize(name)
+        path = [self._root]
+        for ch in key:
+            child = path[-1].children.get(ch)
+            if child is None:
+                return False
+            path.append(child)
+        node = path[-1]
+        if not node.ids or player_id not in node.ids:
+            return False
+        node.ids.discard(player_id)
+        if not node.ids:
+            node.ids = None
+        for step in path:
+            step.size -= 1
+        for depth in range(len(key), 0, -1):
+            if path[depth].size:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+        return True
+
+    def exact(self, name: str) -> List[str]:
+        """IDs of the players with exactly this name (case-insensitive), sorted."""
+        node = self._find(self.normalize(name))
+        return sorted(node.ids) if node is not None and node.ids else []
+
+    def count_prefix(self, prefix: str) -> int:
+        """Number of players whose name starts with `prefix`, in O(len(prefix))."""
+        node = self._find(self.normalize(prefix))
+        return node.size if node is not None else 0
+
+    def prefix(self, prefix: str) -> Iterator[Tuple[str, str]]:
+        """
+        Yields (casefolded name, player_id) for every name starting with `prefix`,
+        in name order (ties by ID). Stop iterating to complete only the first few.
+        """
+        key = self.normalize(prefix)
+        start = self._find(key)
+        if start is None:
+            return
+        # Children are pushed in reverse order so the smallest character pops first
+        stack: List[Tuple[str, _TrieNode]] = [(key, start)]
+        while stack:
+            word, node = stack.pop()
+            if node.ids:
+                for player_id in sorted(node.ids):
+                    yield word, player_id
+            for ch in sorted(node.children, reverse=True):
+                stack.append((word + ch, node.children[ch]))
+
+    def fuzzy(self, query: str, max_distance: int) -> List[Tuple[int, str, str]]:
+        """
+        Finds the names within `max_distance` edits (insertions, deletions,
+        substitutions) of `query`.
+
+        Returns:
+            List[Tuple[int, str, str]]: (distance, casefolded name, player_id),
+                closest first, then by name and ID.
+        """
+        key = self.normalize(query)
+        first_row = list(range(len(key) + 1))
+        found: List[Tuple[int, str, str]] = []
+        if self._root.ids and first_row[-1] <= max_distance:
+            found.extend((first_row[-1], '', pid) for pid in self._root.ids)
+
+        stack: List[Tuple[str, _TrieNode, List[int]]] = [('', self._root, first_row)]
+        while stack:
+            word, node, prev = stack.pop()
+            for ch, child in node.children.items():
+                row = [prev[0] + 1]
+                for col in range(1, len(key) + 1):
+                    row.append(min(row[col - 1] + 1,
+                                   prev[col] + 1,
+                                   prev[col - 1] + (key[col - 1] != ch)))
+                if child.ids and row[-1] <= max_distance:
+                    found.extend((row[-1], word + ch, pid) for pid in child.ids)
+                # Any name below this node is at least min(row) edits away
+                if min(row) <= max_distance:
+                    stack.append((word + ch, child, row))
+        found.sort()
+        return found
+
+    def _find(self, key: str) -> Optional[_TrieNode]:
+        """Node reached by an already normalized key, or None."""
+        node = self._root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
@@ -0,0 +1,190 @@
+from __future__ import annotations
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pybet.models.NameIndex import NameIndex
+from pybet.models.Player import Player
+
+# Greater than any player ID, used as an upper bound for (value, id) keys
+_MAX_ID = chr(0x10FFFF)
+
+class SortedIndex:
+    """
+    Secondary index kept as a sorted list of (value, player_id) pairs.
+
+    Lookups and range bounds use bisect, so a range query costs O(log n + k).
+    Inserting or removing one entry is O(log n) to locate plus a list shift.
+    """
+
+    def __init__(self, entries: Optional[Iterable[Tuple[Any, str]]] = None) -> None:
+        self._entries: List[Tuple[Any, str]] = sorted(entries or [])
+
+    @classmethod
+    def from_sorted(cls, entries: List[Tuple[Any, str]]) -> SortedIndex:
+        """Index over entries already in order (e.g. a saved entries() list), without sorting them again."""
+        index = cls()
+        index._entries = entries
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> List[Tuple[Any, str]]:
+        """Copy of the (value, player_id) pairs, in order."""
+        return list(self._entries)
+
+    def add(self, value: Any, player_id: str) -> None:
+        """Inserts (value, player_id) keeping the list sorted."""
+        insort(self._entries, (value, player_id))
+
+    def remove(self, value: Any, player_id: str) -> bool:
+        """
+        Removes (value, player_id).
+
+        Returns:
+            bool: True if the entry existed.
+        """
+        pos = bisect_left(self._entries, (value, player_id))
+        if pos < len(self._entries) and self._entries[pos] == (value, player_id):
+            del self._entries[pos]
+            return True
+        return False
+
+    def bounds(self, low: Any = None, high: Any = None) -> Tuple[int, int]:
+        """
+        Positions [start, end) of the entries with low <= value <= high (None = unbounded).
+        """
+        start = 0 if low is None else bisect_left(self._entries, (low, ''))
+        end = len(self._entries) if high is None else bisect_right(self._entries, (high, _MAX_ID))
+        return start, max(start, end)
+
+    def count(self, low: Any = None, high: Any = None) -> int:
+        """Number of entries with low <= value <= high, in O(log n)."""
+        start, end = self.bounds(low, high)
+        return end - start
+
+    def range(self, low: Any = None, high: Any = None,
+              after: Optional[Tuple[Any, str]] = None, descending: bool = False) -> Iterator[Tuple[Any, str]]:
+        """
+        Yields (value, player_id) pairs with low <= value <= high, in order.
+
+        Args:
+            low (Any): Inclusive lower bound (None = unbounded).
+            high (Any): Inclusive upper bound (None = unbounded).
+            after (Optional[Tuple[Any, str]]): Resume strictly after this pair
+                (in iteration order), e.g. a decoded listing cursor.
+            descending (bool): Iterate from the highest value down.
+        """
+        start, end = self.bounds(low, high)
+        if not descending:
+            if after is not None:
+                start = max(start, bisect_right(self._entries, tuple(after)))
+            for pos in range(start, end):
+                yield self._entries[pos]
+        else:
+            if after is not None:
+                end = min(end, bisect_left(self._entries, tuple(after)))
+            for pos in range(end - 1, start - 1, -1):
+                yield self._entries[pos]
+
+
+class PlayerIndexes:
+    """
+    In-memory read model of players.json: the raw records plus sorted
+    secondary indexes on account_balance and created_at, and a name trie
+    (built on first use of `names`).
+
+    Attributes:
+        records (Dict[str, Dict[str, Any]]): Player ID → raw record (read-only).
+        balance (SortedIndex): Index on account_balance.
+        created_at (SortedIndex): Index on created_at (ISO strings sort chronologically).
+        names (NameIndex): Casefolded name trie.
+        fingerprint (Optional[str]): Fingerprint of players.json the indexes reflect.
+    """
+
+    # Indexed record field → attribute holding its SortedIndex
+    FIELDS: Dict[str, str] = {"account_balance": "balance", "created_at": "created_at"}
+
+    def __init__(self, players_map: Dict[str, Dict[str, Any]], fingerprint: Optional[str] = None) -> None:
+        self.records: Dict[str, Dict[str, Any]] = players_map
+        self.fingerprint = fingerprint
+        self.balance = SortedIndex((r.get("account_balance", 0), pid) for pid, r in players_map.items())
+        self.created_at = SortedIndex((r.get("created_at") or "", pid) for pid, r in players_map.items())
+        self._names: Optional[NameIndex] = None
+
+    @classmethod
+    def restore(cls, state: Tuple[Dict[str, Dict[str, Any]], List[Tuple[Any, str]], List[Tuple[Any, str]]],
+                fingerprint: Optional[str] = None) -> PlayerIndexes:
+        """Indexes from a state() without sorting anything (the name trie is rebuilt on first use)."""
+        indexes = cls({})
+        indexes.records, balance, created_at = state
+        indexes.balance = SortedIndex.from_sorted(balance)
+        indexes.created_at = SortedIndex.from_sorted(created_at)
+        indexes.fingerprint = fingerprint
+        return indexes
+
+    def state(self) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[Any, str]], List[Tuple[Any, str]]]:
+        """
+        Records and sorted index entries, as plain data (to save them, see
+        restore()). Shallow copies: records are replaced, never modified in place.
+        """
+        return dict(self.records), self.balance.entries(), self.created_at.entries()
+
+    @property
+    def names(self) -> NameIndex:
+        """Name trie for prefix and fuzzy search, built on first access."""
+        if self._names is None:
+            names = NameIndex()
+            for pid, record in self.records.items():
+                names.add(record.get("name", ""), pid)
+            self._names = names
+        return self._names
+
+    def index_for(self, field: str) -> Optional[SortedIndex]:
+        """Returns the index on a record field, or None if the field is not indexed."""
+        attr = self.FIELDS.get(field)
+        return getattr(self, attr) if attr else None
+
+    def player(self, player_id: str) -> Player:
+        """
+        Hydrates one player. The history list is copied so that changes to the
+        returned Player never leak into the indexed records.
+        """
+        record = self.records[player_id]
+        return Player.from_dict({**record, "history": list(record.get("history", []))})
+
+    def iter_players(self) -> Iterator[Player]:
+        """Yields every indexed player, in file order."""
+        for player_id in self.records:
+            yield self.player(player_id)
+
+    def set_balance(self, player_id: str, balance: float) -> None:
+        """Applies an in-place balance settlement to the record and the balance index."""
+        old = self.records[player_id]
+        self.balance.remove(old.get("account_balance", 0), player_id)
+        self.records[player_id] = {**old, "account_balance": balance}
+        self.balance.add(balance, player_id)
+
+    def refresh(self, players_map: Dict[str, Dict[str, Any]], changed_ids: Iterable[str]) -> None:
+        """
+        Applies a save to the indexes: re-indexes the changed IDs from `players_map`
+        (removing those no longer present) and adopts it as the record source.
+
+        Args:
+            players_map (Dict[str, Dict[str, Any]]): The mapping that was just saved.
+            changed_ids (Iterable[str]): IDs added, modified or removed by the save.
+        """
+        for pid in changed_ids:
+            old = self.records.get(pid)
+            if old is not None:
+                self.balance.remove(old.get("account_balance", 0), pid)
+                self.created_at.remove(old.get("created_at") or "", pid)
+                if self._names is not None:
+                    self._names.remove(old.get("name", ""), pid)
+            new = players_map.get(pid)
+            if new is not None:
+                self.balance.add(new.get("account_balance", 0), pid)
+                self.created_at.add(new.get("created_at") or "", pid)
+                if self._names is not None:
+                    self._names.add(new.get("name", ""), pid)
+        self.records = players_map
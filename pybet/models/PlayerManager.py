@@ -1,23 +1,48 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Iterable, Set, Tuple, Callable
+import datetime
+import heapq
+from itertools import islice
 from pybet.models.Player import Player
+from pybet.models.PlayerIndex import PlayerIndexes
+from pybet.models.PlayerPage import PlayerPage
+from pybet.models.PlayerSession import PlayerSession
 from pybet.models.OperationResult import OperationResult
 from pybet.models.DataPersistence import DataPersistence
+from pybet.models.EventLog import PLAYER_CREATED, PLAYER_DELETED, PLAYER_RENAMED
 from pybet.helpers.Helpers import Helpers
 
+# Fields accepted by list_players(sort_by=...)
+SORT_FIELDS: Tuple[str, ...] = ("id", "name", "account_balance", "created_at")
+# Keys accepted by list_players(filters=...)
+FILTER_KEYS: Tuple[str, ...] = ("min_balance", "max_balance", "created_from", "created_to", "name_prefix")
+
 class PlayerManager:
     """
     Manages CRUD operations for Player entities, storing all players in a single
     JSON file (players.json) as a mapping from player_id → player data.
 
     Methods:
+        - session: open a unit of work batching several changes into one write.
+        - snapshot: pin a consistent, read-only state of every player for long reads.
         - add_player: create and persist a new player with a readable unique ID.
         - get_all_players: return a list of all players.
+        - get_player_table: load all players into a compact columnar table.
+        - iter_players: stream all players one at a time.
+        - list_players: one page of players, sorted, filtered and resumable via cursors.
+        - players_in_balance_range / players_created_between: index-backed range queries.
         - get_player_by_name: find a player by name.
+        - search_players: prefix and typo-tolerant name search.
         - get_player_by_id: find a player by ID (binary search over loaded list).
         - update_player: change name and/or balance for an existing player.
         - delete_player: remove a player by ID.
     """
 
+    # Indexed field → (lower, upper) bound keys of list_players filters
+    _RANGE_KEYS: Dict[str, Tuple[str, str]] = {
+        "account_balance": ("min_balance", "max_balance"),
+        "created_at": ("created_from", "created_to"),
+    }
+
     def __init__(self) -> None:
         """
         Initializes the PlayerManager. No state is stored in the instance;
@@ -26,6 +51,24 @@ class PlayerManager:
         # No state needed; each method loads/saves from DataPersistence.
         pass
 
+    def session(self) -> PlayerSession:
+        """
+        Opens a unit of work: players read through it are cached in an identity
+        map and all their changes are saved together by PlayerSession.commit().
+        """
+        return PlayerSession()
+
+    def snapshot(self) -> OperationResult:
+        """
+        Pins the current state of every player: reads through the returned
+        PlayerSnapshot (iter_players, load_players_map) all see that state, however
+        long they take and whatever is saved meanwhile. Release it when done.
+
+        Returns:
+            OperationResult: ok/data (PlayerSnapshot) or error.
+        """
+        return DataPersistence.snapshot()
+
     def add_player(self, name: str, balance: float) -> OperationResult:
         """
         Creates a new Player with a readable, non‐colliding ID and persists it.
@@ -40,41 +83,36 @@ class PlayerManager:
                 data (Player): The newly created Player object if ok.
                 error (str): Error message otherwise.
         """
-        # 1. Load existing mapping
-        map_res: OperationResult = DataPersistence.load_players_map()
-        if not map_res.ok:
-            return map_res
-
-        players_map: Dict[str, Any] = map_res.data
-
-        # 2. Check duplicate name (case-insensitive)
-        for p_dict in players_map.values():
-            if p_dict.get("name", "").lower() == name.lower():
-                return OperationResult(ok=False, error=f"Player '{name}' already exists.")
-
-        # 3. Generate unique ID
-        existing_ids = set(players_map.keys())
-        new_id = Helpers.random_key(6)
-        while new_id in existing_ids:
-            new_id = Helpers.random_key(6)
-
-        # 4. Instantiate Player object
+        # 1. Build the Player (its ID is fixed once the mapping is known)
         try:
             new_player = Player(
-                player_id=new_id,
+                player_id=Helpers.random_key(6),
                 name=name,
                 account_balance=balance
             )
         except Exception as e:
             return OperationResult(ok=False, error=f"Error creating player: {e}")
 
-        # 5. Insert into map and persist
-        players_map[new_id] = new_player.to_dict()
-        save_res: OperationResult = DataPersistence.save_players_map(players_map)
-        if not save_res.ok:
-            return save_res
+        def insert(players_map: Dict[str, Any], changed: Set[str]) -> OperationResult:
+            # 2. Check duplicate name (case-insensitive)
+            for p_dict in players_map.values():
+                if p_dict.get("name", "").lower() == name.lower():
+                    return OperationResult(ok=False, error=f"Player '{name}' already exists.")
+
+            # 3. Make the ID unique
+            while new_player.id in players_map:
+                new_player.id = Helpers.random_key(6)
 
-        return OperationResult(ok=True, data=new_player)
+            # 4. Insert into map
+            players_map[new_player.id] = new_player.to_dict()
+            changed.add(new_player.id)
+            DataPersistence.record_event(PLAYER_CREATED, {"player_id": new_player.id, "name": new_player.name,
+                                                          "balance": new_player.account_balance,
+                                                          "created_at": new_player.created_at})
+            return OperationResult(ok=True, data=new_player)
+
+        # 5. Persist (re-checked and retried if another process saves meanwhile)
+        return DataPersistence.transact(insert)
 
     def get_all_players(self) -> OperationResult:
         """
@@ -88,9 +126,284 @@ class PlayerManager:
         """
         return DataPersistence.load_all_players()
 
+    def get_player_table(self) -> OperationResult:
+        """
+        Loads all players into a columnar PlayerTable (far smaller than a list of
+        Player objects; rows are materialized on demand).
+
+        Returns:
+            OperationResult:
+                ok (bool): True if loaded successfully.
+                data (PlayerTable): The table if ok.
+                error (str): Error message otherwise.
+        """
+        return DataPersistence.load_player_table()
+
+    def iter_players(self, fields: Optional[Iterable[str]] = None, lazy: bool = False) -> Iterator[Any]:
+        """
+        Streams every player from players.json in constant memory.
+
+        Args:
+            fields (Optional[Iterable[str]]): Yield projections with only these fields.
+            lazy (bool): Yield LazyPlayer proxies instead of Player objects.
+
+        Yields:
+            Player | LazyPlayer | PlayerProjection: Each stored player.
+
+        Raises:
+            RuntimeError: If players.json cannot be loaded.
+        """
+        return DataPersistence.iter_players(fields=fields, lazy=lazy)
+
+    def list_players(self,
+                     sort_by: str = "id",
+                     filters: Optional[Dict[str, Any]] = None,
+                     limit: int = 50,
+                     after_cursor: Optional[str] = None,
+                     descending: bool = False) -> OperationResult:
+        """
+        Lists one page of players, sorted and filtered, resumable with a stable cursor.
+
+        Only the players on the returned page are hydrated. Sorting by balance or
+        creation date walks the matching index from the cursor; other sorts take
+        their candidates from the narrowest balance/date range filter (through its
+        index) and keep the best `limit` in a bounded heap.
+
+        Args:
+            sort_by (str): One of SORT_FIELDS. Ties are broken by player ID.
+            filters (Optional[Dict[str, Any]]): Any of
+                min_balance / max_balance (float, inclusive),
+                created_from / created_to (ISO string or datetime, inclusive),
+                name_prefix (str, case-insensitive).
+            limit (int): Maximum players on the page (> 0).
+            after_cursor (Optional[str]): PlayerPage.next_cursor of the previous page.
+            descending (bool): Sort in descending order.
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the page was built.
+                data (PlayerPage): Players, next cursor and total matching count.
+                error (str): Message otherwise (invalid arguments or load failure).
+        """
+        if sort_by not in SORT_FIELDS:
+            return OperationResult(ok=False, error=f"Invalid sort field '{sort_by}'.")
+        if limit <= 0:
+            return OperationResult(ok=False, error="Limit must be greater than zero.")
+        filters = filters or {}
+        unknown = set(filters) - set(FILTER_KEYS)
+        if unknown:
+            return OperationResult(ok=False, error=f"Unknown filters: {', '.join(sorted(unknown))}.")
+
+        after: Optional[Tuple[Any, str]] = None
+        if after_cursor:
+            try:
+                cursor_sort, cursor_value, cursor_id = PlayerPage.decode_cursor(after_cursor)
+            except ValueError as e:
+                return OperationResult(ok=False, error=str(e))
+            if cursor_sort != sort_by:
+                return OperationResult(ok=False, error="Cursor was created for a different sort field.")
+            after = (cursor_value, cursor_id)
+
+        idx_res: OperationResult = DataPersistence.indexes()
+        if not idx_res.ok:
+            return idx_res
+        indexes: PlayerIndexes = idx_res.data
+        ranges = PlayerManager._range_filters(filters)
+
+        try:
+            # A name prefix is usually far more selective than a walk of the sort index
+            if indexes.index_for(sort_by) is not None and not filters.get("name_prefix"):
+                best, total = PlayerManager._ordered_by_index(indexes, sort_by, filters, ranges,
+                                                              limit, after, descending)
+            else:
+                best, total = PlayerManager._selected_by_heap(indexes, sort_by, filters, ranges,
+                                                              limit, after, descending)
+            page = [indexes.player(player_id) for _, player_id in best[:limit]]
+        except Exception as e:
+            return OperationResult(ok=False, error=f"Error listing players: {e}")
+
+        next_cursor = None
+        if len(best) > limit:
+            last_value, last_id = best[limit - 1]
+            next_cursor = PlayerPage.encode_cursor(sort_by, last_value, last_id)
+        return OperationResult(ok=True, data=PlayerPage(page, next_cursor, total))
+
+    def players_in_balance_range(self, min_balance: Optional[float] = None,
+                                 max_balance: Optional[float] = None) -> OperationResult:
+        """
+        Players whose balance lies in [min_balance, max_balance], by ascending balance.
+
+        Answered from the balance index in O(log n + k).
+
+        Args:
+            min_balance (Optional[float]): Inclusive lower bound (None = unbounded).
+            max_balance (Optional[float]): Inclusive upper bound (None = unbounded).
+
+        Returns:
+            OperationResult: ok/data (List[Player]) or error.
+        """
+        return self._players_in_range("account_balance", min_balance, max_balance)
+
+    def players_created_between(self,
+                                created_from: Optional[Any] = None,
+                                created_to: Optional[Any] = None) -> OperationResult:
+        """
+        Players created in [created_from, created_to], oldest first.
+
+        Answered from the created_at index in O(log n + k).
+
+        Args:
+            created_from (Optional[Any]): Inclusive start (ISO string or datetime; None = unbounded).
+            created_to (Optional[Any]): Inclusive end (ISO string or datetime; None = unbounded).
+
+        Returns:
+            OperationResult: ok/data (List[Player]) or error.
+        """
+        return self._players_in_range("created_at", PlayerManager._iso(created_from), PlayerManager._iso(created_to))
+
+    @staticmethod
+    def _players_in_range(field: str, low: Any, high: Any) -> OperationResult:
+        """Hydrates the players of one index range."""
+        idx_res: OperationResult = DataPersistence.indexes()
+        if not idx_res.ok:
+            return idx_res
+        indexes: PlayerIndexes = idx_res.data
+        try:
+            players = [indexes.player(player_id) for _, player_id in indexes.index_for(field).range(low, high)]
+        except Exception as e:
+            return OperationResult(ok=False, error=f"Error parsing players: {e}")
+        return OperationResult(ok=True, data=players)
+
+    @staticmethod
+    def _ordered_by_index(indexes: PlayerIndexes, sort_by: str, filters: Dict[str, Any],
+                          ranges: Dict[str, Tuple[Any, Any]], limit: int,
+                          after: Optional[Tuple[Any, str]], descending: bool) -> Tuple[List[Tuple[Any, str]], int]:
+        """
+        Pages through the index on the sort field itself: the walk starts at the
+        cursor and stops after limit + 1 matches.
+
+        Returns:
+            Tuple[List[Tuple[Any, str]], int]: Up to limit + 1 (value, id) keys and the total matches.
+        """
+        index = indexes.index_for(sort_by)
+        low, high = ranges.get(sort_by, (None, None))
+        # The sort field's own range is handled by the index bounds
+        residual = {k: v for k, v in filters.items() if k not in PlayerManager._RANGE_KEYS.get(sort_by, ())}
+        matches = PlayerManager._filter_predicate(residual)
+
+        best: List[Tuple[Any, str]] = []
+        for key in index.range(low, high, after=after, descending=descending):
+            if matches(indexes.records[key[1]]):
+                best.append(key)
+                if len(best) > limit:
+                    break
+
+        if residual:
+            total = sum(1 for _, player_id in index.range(low, high) if matches(indexes.records[player_id]))
+        else:
+            total = index.count(low, high)
+        return best, total
+
+    @staticmethod
+    def _selected_by_heap(indexes: PlayerIndexes, sort_by: str, filters: Dict[str, Any],
+                          ranges: Dict[str, Tuple[Any, Any]], limit: int,
+                          after: Optional[Tuple[Any, str]], descending: bool) -> Tuple[List[Tuple[Any, str]], int]:
+        """
+        Selects with a bounded heap of the best limit + 1: candidates come from
+        the name trie (name_prefix) or the narrowest range filter's index,
+        whichever matches fewer players, or every record without either.
+
+        Returns:
+            Tuple[List[Tuple[Any, str]], int]: Up to limit + 1 (value, id) keys and the total matches.
+        """
+        candidate_ids: Iterable[str] = indexes.records
+        narrowest = None
+        for field, (low, high) in ranges.items():
+            count = indexes.index_for(field).count(low, high)
+            if narrowest is None or count < narrowest:
+                narrowest = count
+                candidate_ids = (player_id for _, player_id in indexes.index_for(field).range(low, high))
+        prefix = filters.get("name_prefix")
+        if prefix and (narrowest is None or indexes.names.count_prefix(prefix) < narrowest):
+            candidate_ids = (player_id for _, player_id in indexes.names.prefix(prefix))
+
+        matches = PlayerManager._filter_predicate(filters)
+        sort_value = PlayerManager._sort_value(sort_by)
+        total = 0
+
+        def candidates() -> Iterator[Tuple[Any, str]]:
+            nonlocal total
+            for player_id in candidate_ids:
+                record = indexes.records[player_id]
+                if not matches(record):
+                    continue
+                total += 1
+                key = (sort_value(record), player_id)
+                if after is None or (key < after if descending else key > after):
+                    yield key
+
+        select = heapq.nlargest if descending else heapq.nsmallest
+        best = select(limit + 1, candidates())
+        return best, total
+
+    @staticmethod
+    def _sort_value(sort_by: str) -> Callable[[Dict[str, Any]], Any]:
+        """Returns the function extracting the sort value of a raw record."""
+        if sort_by == "name":
+            return lambda r: r.get("name", "").casefold()
+        if sort_by == "account_balance":
+            return lambda r: r.get("account_balance", 0)
+        return lambda r: r.get(sort_by) or ""
+
+    @staticmethod
+    def _iso(value: Any) -> Any:
+        """Normalizes a datetime bound to the ISO string stored in created_at."""
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _range_filters(filters: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+        """Maps each indexed field restricted by the filters to its inclusive (low, high) bounds."""
+        ranges: Dict[str, Tuple[Any, Any]] = {}
+        for field, (low_key, high_key) in PlayerManager._RANGE_KEYS.items():
+            low, high = PlayerManager._iso(filters.get(low_key)), PlayerManager._iso(filters.get(high_key))
+            if low is not None or high is not None:
+                ranges[field] = (low, high)
+        return ranges
+
+    @staticmethod
+    def _filter_predicate(filters: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+        """Builds a predicate over raw records from list_players filters."""
+        iso = PlayerManager._iso
+
+        min_balance = filters.get("min_balance")
+        max_balance = filters.get("max_balance")
+        created_from = iso(filters.get("created_from"))
+        created_to = iso(filters.get("created_to"))
+        prefix = filters.get("name_prefix")
+        prefix = prefix.casefold() if prefix else None
+
+        def matches(record: Dict[str, Any]) -> bool:
+            balance = record.get("account_balance", 0)
+            if min_balance is not None and balance < min_balance:
+                return False
+            if max_balance is not None and balance > max_balance:
+                return False
+            created = record.get("created_at") or ""
+            if created_from is not None and created < created_from:
+                return False
+            if created_to is not None and created > created_to:
+                return False
+            if prefix is not None and not record.get("name", "").casefold().startswith(prefix):
+                return False
+            return True
+
+        return matches
+
     def get_player_by_name(self, name: str) -> OperationResult:
         """
-        Finds a player by full name (case-insensitive) via linear search.
+        Finds a player by full name (case-insensitive) through the name trie.
 
         Args:
             name (str): Full name to search for.
@@ -100,20 +413,65 @@ class PlayerManager:
                 ok (bool): True and data=Player if found.
                 error (str): Message otherwise.
         """
-        all_res: OperationResult = self.get_all_players()
-        if not all_res.ok:
-            return all_res
+        idx_res: OperationResult = DataPersistence.indexes()
+        if not idx_res.ok:
+            return idx_res
+        indexes: PlayerIndexes = idx_res.data
+
+        ids = indexes.names.exact(name)
+        if ids:
+            return OperationResult(ok=True, data=indexes.player(ids[0]))
+        return OperationResult(ok=False, error=f"No player named '{name}' found.")
 
-        players: List[Player] = all_res.data
-        for player in players:
-            if player.name.lower() == name.lower():
-                return OperationResult(ok=True, data=player)
+    def search_players(self, query: str, limit: int = 10, max_distance: Optional[int] = None) -> OperationResult:
+        """
+        Searches players by a partially typed or misspelled name (case-insensitive).
 
-        return OperationResult(ok=False, error=f"No player named '{name}' found.")
+        Names starting with `query` come first, in name order; the remaining slots
+        are filled with names within `max_distance` edits of `query`, closest first.
+
+        Args:
+            query (str): Name or beginning of a name.
+            limit (int): Maximum number of players returned (> 0).
+            max_distance (Optional[int]): Allowed typos; by default 0 for queries
+                shorter than 3 characters, 1 up to 5 characters and 2 beyond.
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the search ran.
+                data (List[Player]): Matching players, best first.
+                error (str): Message otherwise.
+        """
+        query = query.strip()
+        if not query:
+            return OperationResult(ok=False, error="Search text cannot be empty.")
+        if limit <= 0:
+            return OperationResult(ok=False, error="Limit must be greater than zero.")
+        if max_distance is None:
+            max_distance = 0 if len(query) < 3 else 1 if len(query) <= 5 else 2
+
+        idx_res: OperationResult = DataPersistence.indexes()
+        if not idx_res.ok:
+            return idx_res
+        indexes: PlayerIndexes = idx_res.data
+
+        found: List[str] = [player_id for _, player_id in islice(indexes.names.prefix(query), limit)]
+        if len(found) < limit and max_distance > 0:
+            seen = set(found)
+            for _, _, player_id in indexes.names.fuzzy(query, max_distance):
+                if player_id not in seen:
+                    found.append(player_id)
+                    if len(found) == limit:
+                        break
+        try:
+            return OperationResult(ok=True, data=[indexes.player(player_id) for player_id in found])
+        except Exception as e:
+            return OperationResult(ok=False, error=f"Error parsing players: {e}")
 
     def get_player_by_id(self, player_id: str) -> OperationResult:
         """
-        Finds a player by ID using binary search over the sorted list of IDs.
+        Finds a player by ID in the process-wide player indexes
+        (DataPersistence.indexes), without reading the player files again.
 
         Args:
             player_id (str): The unique ID to look up.
@@ -123,24 +481,11 @@ class PlayerManager:
                 ok (bool): True and data=Player if found.
                 error (str): Message otherwise.
         """
-        all_res: OperationResult = self.get_all_players()
-        if not all_res.ok:
-            return all_res
-
-        players: List[Player] = all_res.data
-        # Sort players by ID for binary search
-        players.sort(key=lambda p: p.id)
-        low, high = 0, len(players) - 1
-        while low <= high:
-            mid = (low + high) // 2
-            mid_id = players[mid].id
-            if mid_id == player_id:
-                return OperationResult(ok=True, data=players[mid])
-            elif mid_id < player_id:
-                low = mid + 1
-            else:
-                high = mid - 1
-
+        idx_res: OperationResult = DataPersistence.indexes()
+        if not idx_res.ok:
+            return idx_res
+        if player_id in idx_res.data.records:
+            return OperationResult(ok=True, data=idx_res.data.player(player_id))
         return OperationResult(ok=False, error=f"Player ID '{player_id}' not found.")
 
     def update_player(self,
@@ -160,33 +505,26 @@ class PlayerManager:
                 ok (bool): True and data=updated Player on success.
                 error (str): Message otherwise.
         """
-        # 1. Load mapping
-        map_res: OperationResult = DataPersistence.load_players_map()
-        if not map_res.ok:
-            return map_res
-
-        players_map: Dict[str, Any] = map_res.data
-        if player_id not in players_map:
-            return OperationResult(ok=False, error="Player not found.")
-
-        # 2. Update fields
-        record: Dict[str, Any] = players_map[player_id]
-        if new_name:
-            record["name"] = new_name
-        if new_balance is not None:
-            if new_balance < 0:
-                return OperationResult(ok=False, error="Balance cannot be negative.")
-            record["account_balance"] = new_balance
-
-        # 3. Persist changes
-        players_map[player_id] = record
-        save_res: OperationResult = DataPersistence.save_players_map(players_map)
-        if not save_res.ok:
-            return save_res
-
-        # 4. Return updated Player instance
-        updated_player = Player.from_dict(record)
-        return OperationResult(ok=True, data=updated_player)
+        if new_balance is not None and new_balance < 0:
+            return OperationResult(ok=False, error="Balance cannot be negative.")
+
+        def apply(players_map: Dict[str, Any], changed: Set[str]) -> OperationResult:
+            if player_id not in players_map:
+                return OperationResult(ok=False, error="Player not found.")
+
+            # Update fields
+            record: Dict[str, Any] = players_map[player_id]
+            if new_name and new_name != record.get("name"):
+                DataPersistence.record_event(PLAYER_RENAMED, {"player_id": player_id, "name": new_name})
+            if new_name:
+                record["name"] = new_name
+            if new_balance is not None:
+                record["account_balance"] = new_balance
+            changed.add(player_id)
+            return OperationResult(ok=True, data=Player.from_dict(record))
+
+        # Persist changes and return the updated Player instance
+        return DataPersistence.transact(apply)
 
     def delete_player(self, player_id: str) -> OperationResult:
         """
@@ -199,22 +537,12 @@ class PlayerManager:
                 ok (bool): True and data=deleted Player on success.
                 error (str): Message otherwise.
         """
-        # 1. Load mapping
-        map_res: OperationResult = DataPersistence.load_players_map()
-        if not map_res.ok:
-            return map_res
-
-        players_map: Dict[str, Any] = map_res.data
-        if player_id not in players_map:
-            return OperationResult(ok=False, error="Player not found.")
-
-        # 2. Pop record
-        record: Dict[str, Any] = players_map.pop(player_id)
-        deleted_player = Player.from_dict(record)
-
-        # 3. Persist changes
-        save_res: OperationResult = DataPersistence.save_players_map(players_map)
-        if not save_res.ok:
-            return save_res
-
-        return OperationResult(ok=True, data=deleted_player)
\ No newline at end of file
+        def remove(players_map: Dict[str, Any], changed: Set[str]) -> OperationResult:
+            if player_id not in players_map:
+                return OperationResult(ok=False, error="Player not found.")
+            record: Dict[str, Any] = players_map.pop(player_id)
+            changed.add(player_id)
+            DataPersistence.record_event(PLAYER_DELETED, {"player_id": player_id})
+            return OperationResult(ok=True, data=Player.from_dict(record))
+
+        return DataPersistence.transact(remove)
\ No newline at end of file
@@ -0,0 +1,55 @@
+from __future__ import annotations
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+
+from pybet.models.Player import Player
+
+class PlayerPage:
+    """
+    One page of a player listing (see PlayerManager.list_players).
+
+    Attributes:
+        players (List[Player]): Players on this page.
+        next_cursor (Optional[str]): Cursor for the next page; None when this is the last one.
+        total (int): Number of players matching the filters (across all pages).
+    """
+
+    def __init__(self, players: List[Player], next_cursor: Optional[str], total: int) -> None:
+        self.players = players
+        self.next_cursor = next_cursor
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.players)
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    @staticmethod
+    def encode_cursor(sort_by: str, sort_value: Any, player_id: str) -> str:
+        """
+        Builds an opaque cursor pointing just after (sort_value, player_id).
+
+        The player ID breaks ties, so the position stays stable even when other
+        players share the same sort value or are added and removed between requests.
+        """
+        raw = json.dumps([sort_by, sort_value, player_id], ensure_ascii=False, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, Any, str]:
+        """
+        Decodes a cursor built by encode_cursor.
+
+        Returns:
+            Tuple[str, Any, str]: (sort_by, sort_value, player_id).
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        try:
+            sort_by, sort_value, player_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {e}") from e
+        return sort_by, sort_value, player_id
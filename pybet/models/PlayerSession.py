@@ -0,0 +1,281 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Set
+
+from pybet.helpers.Helpers import Helpers
+from pybet.models.BalanceLedger import to_cents
+from pybet.models.DataPersistence import DataPersistence
+from pybet.models.EventLog import PLAYER_CREATED, PLAYER_DELETED, PLAYER_RENAMED
+from pybet.models.OperationResult import OperationResult
+from pybet.models.Player import Player
+
+# Player fields persisted in players.json (besides the ID)
+FIELDS = ("name", "account_balance", "created_at", "history")
+
+class PlayerSession:
+    """
+    Unit of work over players.json.
+
+    Players loaded through a session are kept in an identity map: asking for the
+    same ID again returns the same Player instance without touching the disk.
+    Callers modify those instances directly (balance, name, history); the
+    session detects the changed fields by comparing each player with the state
+    it was loaded in, and commit() writes every pending change in a single save.
+    rollback() discards pending changes and restores the loaded instances.
+
+    Usage:
+        with manager.session() as session:
+            player = session.get(player_id).data
+            player.account_balance -= bet
+            player.history.append("Tragamonedas: lost 10")
+            res = session.commit()
+        # anything not committed is rolled back on exit
+
+    Methods:
+        - get: load a player (once) into the identity map.
+        - add_player: stage a new player.
+        - delete: stage a deletion.
+        - dirty: changed fields of every loaded player.
+        - commit: persist all pending changes in one write.
+        - rollback: discard pending changes.
+    """
+
+    def __init__(self) -> None:
+        self._identity: Dict[str, Player] = {}
+        # Player ID → record as loaded (or as of the last commit)
+        self._clean: Dict[str, Dict[str, Any]] = {}
+        self._new: Dict[str, Player] = {}
+        self._deleted: Dict[str, Player] = {}
+
+    def __enter__(self) -> PlayerSession:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.rollback()
+
+    def get(self, player_id: str) -> OperationResult:
+        """
+        Returns the session's instance of a player, loading it on first use.
+
+        Returns:
+            OperationResult:
+                ok (bool): True and data=Player if found.
+                error (str): Message otherwise.
+        """
+        if player_id in self._deleted:
+            return OperationResult(ok=False, error=f"Player ID '{player_id}' not found.")
+        if player_id in self._identity:
+            return OperationResult(ok=True, data=self._identity[player_id])
+        if player_id in self._new:
+            return OperationResult(ok=True, data=self._new[player_id])
+
+        idx_res: OperationResult = DataPersistence.indexes()
+        if not idx_res.ok:
+            return idx_res
+        if player_id not in idx_res.data.records:
+            return OperationResult(ok=False, error=f"Player ID '{player_id}' not found.")
+
+        player = idx_res.data.player(player_id)
+        self._identity[player_id] = player
+        self._clean[player_id] = self._snapshot(player)
+        return OperationResult(ok=True, data=player)
+
+    def add_player(self, name: str, balance: float) -> OperationResult:
+        """
+        Stages a new player; it is written (and its name checked) on commit.
+
+        Returns:
+            OperationResult: ok/data (the new Player) or error.
+        """
+        try:
+            player = Player(player_id=Helpers.random_key(6), name=name, account_balance=balance)
+        except Exception as e:
+            return OperationResult(ok=False, error=f"Error creating player: {e}")
+        self._new[player.id] = player
+        return OperationResult(ok=True, data=player)
+
+    def delete(self, player_id: str) -> OperationResult:
+        """
+        Stages the deletion of a player.
+
+        Returns:
+            OperationResult: ok/data (the deleted Player) or error.
+        """
+        if player_id in self._new:
+            return OperationResult(ok=True, data=self._new.pop(player_id))
+        get_res = self.get(player_id)
+        if not get_res.ok:
+            return get_res
+        self._deleted[player_id] = self._identity.pop(player_id)
+        return OperationResult(ok=True, data=get_res.data)
+
+    def dirty(self) -> Dict[str, Set[str]]:
+        """
+        Changed fields of every loaded player (players without changes are omitted).
+        """
+        changes: Dict[str, Set[str]] = {}
+        for player_id, player in self._identity.items():
+            current = self._snapshot(player)
+            fields = {f for f in FIELDS if current[f] != self._clean[player_id][f]}
+            if fields:
+                changes[player_id] = fields
+        return changes
+
+    def has_changes(self) -> bool:
+        """Whether commit() would write anything."""
+        return bool(self._new or self._deleted or self.dirty())
+
+    def commit(self, game: str = '') -> OperationResult:
+        """
+        Writes all pending changes: balance changes are settled in place in the
+        balance ledger (see DataPersistence.settle_balances) and everything else
+        is written with a single save of players.json, which a commit that only
+        moves balances skips altogether. Otherwise the balances are settled with
+        the save, under the same lock, only once it is written.
+
+        Only the changed fields of each player are written, so fields changed by
+        someone else since the player was loaded are kept. Balance changes are
+        applied as deltas and new history entries are appended, so concurrent
+        sessions (even in other processes) settling bets on the same player all
+        count. The save is retried if another process saves at the same time
+        (DataPersistence.transact). Nothing is written if any change is invalid.
+        On success the loaded players are updated to the stored values.
+
+        Args:
+            game (str): Game the balance changes were won or lost in, recorded in
+                the balance journal (without one they are recorded as adjustments).
+
+        Returns:
+            OperationResult:
+                ok (bool): True if the changes were saved (or there were none).
+                data (List[str]): IDs written.
+                error (str): Message otherwise.
+        """
+        dirty = self.dirty()
+        if not (dirty or self._new or self._deleted):
+            return OperationResult(ok=True, data=[])
+
+        deltas = {
+            player_id: self._identity[player_id].account_balance - self._clean[player_id]["account_balance"]
+            for player_id, fields in dirty.items() if "account_balance" in fields
+        }
+        profile = {player_id: fields - {"account_balance"} for player_id, fields in dirty.items()}
+        profile = {player_id: fields for player_id, fields in profile.items() if fields}
+
+        def apply(players_map: Dict[str, Any], changed: Set[str]) -> OperationResult:
+            for player_id, fields in profile.items():
+                if player_id not in players_map:
+                    return OperationResult(ok=False, error=f"Player ID '{player_id}' not found.")
+                players_map[player_id] = self._merge(players_map[player_id], self._identity[player_id],
+                                                     self._clean[player_id], fields)
+                if "name" in fields:
+                    DataPersistence.record_event(PLAYER_RENAMED, {"player_id": player_id,
+                                                                  "name": self._identity[player_id].name})
+                if "history" in fields:
+                    DataPersistence.record_history(player_id, self._added_history(self._identity[player_id],
+                                                                                  self._clean[player_id]))
+                changed.add(player_id)
+
+            if self._new:
+                taken = {record.get("name", "").lower() for record in players_map.values()}
+                for player in self._new.values():
+                    if player.name.lower() in taken:
+                        return OperationResult(ok=False, error=f"Player '{player.name}' already exists.")
+                    taken.add(player.name.lower())
+                    while player.id in players_map:
+                        player.id = Helpers.random_key(6)
+                    players_map[player.id] = player.to_dict()
+                    DataPersistence.record_event(PLAYER_CREATED, {"player_id": player.id, "name": player.name,
+                                                                  "balance": player.account_balance,
+                                                                  "created_at": player.created_at})
+                    DataPersistence.record_history(player.id, list(player.history))
+                    changed.add(player.id)
+
+            for player_id in self._deleted:
+                if players_map.pop(player_id, None) is not None:
+                    DataPersistence.record_event(PLAYER_DELETED, {"player_id": player_id})
+                changed.add(player_id)
+
+            # Loaded balances are the ledger's: the save only goes through if they still are
+            balances: Dict[str, float] = {}
+            for player_id, delta in deltas.items():
+                if player_id not in players_map:
+                    return OperationResult(ok=False, error=f"Player ID '{player_id}' not found.")
+                cents = to_cents(players_map[player_id]["account_balance"]) + to_cents(delta)
+                if cents < 0:
+                    return OperationResult(ok=False, error="Balance cannot be negative.")
+                balances[player_id] = cents / 100
+            if deltas:
+                DataPersistence.record_settlement(deltas, game)
+            return OperationResult(ok=True, data=({pid: players_map[pid] for pid in profile}, balances))
+
+        settled: Dict[str, float] = {}
+        stored: Dict[str, Any] = {}
+        if profile or self._new or self._deleted:
+            save_res: OperationResult = DataPersistence.transact(apply)
+            if not save_res.ok:
+                return save_res
+            stored, settled = save_res.data
+        elif deltas:
+            settle_res: OperationResult = DataPersistence.settle_balances(deltas, game)
+            if not settle_res.ok:
+                return settle_res
+            settled = settle_res.data
+
+        # The committed state becomes the new clean state
+        for player_id, balance in settled.items():
+            self._identity[player_id].account_balance = balance
+        for player_id, record in stored.items():
+            self._identity[player_id].history = list(record.get("history", []))
+        changed: List[str] = [*dirty, *(p.id for p in self._new.values()), *self._deleted]
+        for player in self._new.values():
+            self._identity[player.id] = player
+        self._new.clear()
+        self._deleted.clear()
+        for player_id, player in self._identity.items():
+            self._clean[player_id] = self._snapshot(player)
+        return OperationResult(ok=True, data=changed)
+
+    def rollback(self) -> None:
+        """
+        Discards pending changes: loaded players get back their clean state (in
+        place, so references held by callers are restored too), staged deletions
+        are undone and staged new players are dropped.
+        """
+        self._identity.update(self._deleted)
+        self._deleted.clear()
+        self._new.clear()
+        for player_id, player in self._identity.items():
+            clean = self._clean[player_id]
+            player.name = clean["name"]
+            player.account_balance = clean["account_balance"]
+            player.created_at = clean["created_at"]
+            player.history = list(clean["history"])
+
+    @staticmethod
+    def _snapshot(player: Player) -> Dict[str, Any]:
+        """Record of a player with a copy of its whole (untrimmed) history."""
+        return {**player.to_dict(), "history": list(player.history)}
+
+    @staticmethod
+    def _merge(stored: Dict[str, Any], player: Player, clean: Dict[str, Any], fields: Set[str]) -> Dict[str, Any]:
+        """
+        Record to save: `stored` (the current one) with the changed fields of `player`.
+        History entries added in the session are appended unless the loaded
+        history was rewritten.
+        """
+        merged = dict(stored)
+        current = player.to_dict()
+        for field in fields:
+            if field == "history" and player.history[:len(clean["history"])] == clean["history"]:
+                # Same trimming as Player.to_dict
+                merged[field] = (stored.get("history", []) + PlayerSession._added_history(player, clean))[-10:]
+            else:
+                merged[field] = current[field]
+        return merged
+
+    @staticmethod
+    def _added_history(player: Player, clean: Dict[str, Any]) -> List[str]:
+        """History entries appended in the session (none if the loaded history was rewritten)."""
+        if player.history[:len(clean["history"])] != clean["history"]:
+            return []
+        return player.history[len(clean["history"]):]
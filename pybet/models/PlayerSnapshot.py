@@ -0,0 +1,147 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import os
+import shutil
+import weakref
+
+from pybet.helpers.FileManager import FileManager
+from pybet.models.BalanceLedger import BalanceLedger
+from pybet.models.LazyPlayer import LazyPlayer, project, projection_type
+from pybet.models.OperationResult import OperationResult
+from pybet.models.Player import Player
+
+SNAPSHOTS_DIR = './pybet/data/snapshots'
+
+
+class PlayerSnapshot:
+    """
+    Immutable view of every player as of one data version, for long reads
+    (reports) that must not see saves and settlements made while they run.
+
+    Created by DataPersistence.snapshot(), which, under the commit lock, hard
+    links the player files into a directory of their own and copies the balance
+    ledger's slots. Saves never modify a player file in place (they replace it
+    with a new one), so the linked files keep this version's contents, and the
+    reads run without any lock while writers go on.
+
+    Release it (or use it as a context manager) to delete the links; a snapshot
+    left behind by a process that died is deleted by the next snapshot().
+    """
+
+    def __init__(self, directory: str, paths: List[str], storage_format: str, version: str,
+                 slots: Dict[str, int], area: bytes) -> None:
+        self.directory = directory
+        self.paths = paths
+        self.storage_format = storage_format
+        self.version = version
+        self._slots = slots
+        self._area = area
+        self._balances: Optional[Dict[str, int]] = None
+        # Deletes the links even if release() is never called
+        self._cleanup = weakref.finalize(self, shutil.rmtree, directory, True)
+
+    def __enter__(self) -> PlayerSnapshot:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    @property
+    def balances(self) -> Dict[str, int]:
+        """Player ID → balance in cents, as of the snapshot."""
+        if self._balances is None:
+            self._balances = BalanceLedger.frozen_balances(self._slots, self._area)
+        return self._balances
+
+    def release(self) -> None:
+        """Deletes the snapshot's files; it cannot be read afterwards."""
+        self._cleanup()
+
+    def load_players_map(self) -> OperationResult:
+        """
+        Every player as of the snapshot, as a mapping id → player-dict (see
+        DataPersistence.load_players_map).
+
+        Returns:
+            OperationResult: ok/data (Dict[str, Any]) or error.
+        """
+        data: Dict[str, Any] = {}
+        for path in self.paths:
+            raw = FileManager.read_file_serialized(path, self.storage_format)
+            if not raw.ok:
+                return raw
+            if not isinstance(raw.data, dict):
+                return OperationResult(ok=False, error="Snapshot corrupted (expected an object).")
+            data.update(raw.data)
+        balances = self.balances
+        for record in data.values():
+            cents = balances.get(record.get("id"))
+            if cents is not None:
+                record["account_balance"] = cents / 100
+        return OperationResult(ok=True, data=data)
+
+    def iter_players(self, fields: Optional[Iterable[str]] = None, lazy: bool = False) -> Iterator[Any]:
+        """
+        Streams every player as of the snapshot (see DataPersistence.iter_players).
+
+        Args:
+            fields (Optional[Iterable[str]]): Yield projections with only these fields.
+            lazy (bool): Yield LazyPlayer proxies instead of Player objects.
+
+        Yields:
+            Player | LazyPlayer | PlayerProjection: Each player, in file order.
+
+        Raises:
+            ValueError: If `fields` names an unknown field.
+            RuntimeError: If the snapshot cannot be read (e.g. it was released).
+        """
+        projection = tuple(fields) if fields is not None else None
+        if projection is not None:
+            projection_type(projection)
+        balances = self.balances
+        try:
+            for path in self.paths:
+                for _, record in FileManager.iter_file_serialized(path, self.storage_format):
+                    cents = balances.get(record.get("id"))
+                    if cents is not None:
+                        record["account_balance"] = cents / 100
+                    if projection is not None:
+                        yield project(record, projection)
+                    elif lazy:
+                        yield LazyPlayer(record)
+                    else:
+                        yield Player.from_dict(record)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise RuntimeError(f"Error reading players: {e}") from e
+
+    @staticmethod
+    def remove_stale(directory: str = SNAPSHOTS_DIR) -> int:
+        """
+        Deletes the snapshots of processes that are no longer running
+        ('<pid>-...' directories; only checked on POSIX systems).
+
+        Returns:
+            int: Snapshots deleted.
+        """
+        if os.name != 'posix':
+            return 0
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return 0
+        removed = 0
+        for name in names:
+            pid = name.split('-', 1)[0]
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                os.kill(int(pid), 0)
+                continue
+            except ProcessLookupError:
+                pass
+            except OSError:
+                # Running under another user
+                continue
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+            removed += 1
+        return removed
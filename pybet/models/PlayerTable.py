@@ -0,0 +1,208 @@
+from __future__ import annotations
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import datetime
+import sys
+
+from pybet.models.Player import Player
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+# Stored in the created_at column when the original value is kept as text
+_NO_TIMESTAMP = -(2 ** 63)
+
+class PlayerView:
+    """
+    Read-only view of one row of a PlayerTable.
+
+    Exposes the same attributes as Player (id, name, account_balance, created_at,
+    history), so it can be passed wherever players are only read, e.g. to the
+    report aggregators. Use to_player() for a standalone, mutable Player.
+    """
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: PlayerTable, row: int) -> None:
+        self._table = table
+        self._row = row
+
+    @property
+    def id(self) -> str:
+        return self._table.ids[self._row]
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._row]
+
+    @property
+    def account_balance(self) -> float:
+        return self._table.balances[self._row]
+
+    @property
+    def created_at(self) -> str:
+        return self._table.created_at_iso(self._row)
+
+    @property
+    def history(self) -> List[str]:
+        return self._table.histories[self._row]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Record of this row, as stored in players.json."""
+        return self._table.record(self._row)
+
+    def to_player(self) -> Player:
+        """Materializes the row as a Player (with its own history list)."""
+        record = self.to_dict()
+        record["history"] = list(record["history"])
+        return Player.from_dict(record)
+
+    def __repr__(self) -> str:
+        return f"PlayerView(id={self.id!r}, name={self.name!r}, account_balance={self.account_balance!r})"
+
+
+class PlayerTable:
+    """
+    Columnar, compact in-memory store of players.
+
+    Instead of one dict and one Player per record, each field is kept in its own
+    column: interned ids and names, balances in an array('d'), created_at as
+    int64 microseconds since the epoch and each history list by reference (not
+    copied). Rows are only turned into objects on demand, as PlayerView or Player.
+
+    Attributes:
+        ids (List[str]): Player IDs (interned).
+        names (List[str]): Player names (interned, so repeated names share one string).
+        balances (array): Account balances ('d').
+        created (array): created_at as microseconds since 1970-01-01 ('q').
+        histories (List[List[str]]): History lists, shared with the source records.
+    """
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.balances = array('d')
+        self.created = array('q')
+        self.histories: List[List[str]] = []
+        # ID → row, built on first lookup (it would cost as much as the ID column)
+        self._rows: Optional[Dict[str, int]] = None
+        # Row → original created_at text that does not round-trip through the epoch column
+        self._created_text: Dict[int, str] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> PlayerTable:
+        """
+        Builds a table from raw player records with unique IDs (e.g. the values
+        of the players.json mapping).
+        """
+        table = cls()
+        for record in records:
+            table._append_row(record)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self._row_index()
+
+    def __iter__(self) -> Iterator[PlayerView]:
+        for row in range(len(self.ids)):
+            yield PlayerView(self, row)
+
+    def __getitem__(self, row: int) -> PlayerView:
+        if not 0 <= row < len(self.ids):
+            raise IndexError(row)
+        return PlayerView(self, row)
+
+    def get(self, player_id: str) -> Optional[PlayerView]:
+        """View of a player by ID, or None."""
+        row = self._row_index().get(player_id)
+        return None if row is None else PlayerView(self, row)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Adds one raw record; a record whose ID is already present replaces that row.
+        """
+        row = self._row_index().get(record["id"])
+        if row is None:
+            self._rows[record["id"]] = len(self.ids)
+            self._append_row(record)
+            return
+        self.names[row] = sys.intern(record["name"])
+        self.balances[row] = record["account_balance"]
+        self.histories[row] = record.get("history", [])
+        self._set_created(row, record.get("created_at"))
+
+    def remove(self, player_id: str) -> bool:
+        """
+        Removes a player by moving the last row into its place (row order is not kept).
+
+        Returns:
+            bool: True if the player was present.
+        """
+        row = self._row_index().pop(player_id, None)
+        if row is None:
+            return False
+        last = len(self.ids) - 1
+        if row != last:
+            self.ids[row] = self.ids[last]
+            self.names[row] = self.names[last]
+            self.balances[row] = self.balances[last]
+            self.created[row] = self.created[last]
+            self.histories[row] = self.histories[last]
+            self._rows[self.ids[row]] = row
+            if last in self._created_text:
+                self._created_text[row] = self._created_text.pop(last)
+            else:
+                self._created_text.pop(row, None)
+        else:
+            self._created_text.pop(row, None)
+        self.ids.pop()
+        self.names.pop()
+        self.balances.pop()
+        self.created.pop()
+        self.histories.pop()
+        return True
+
+    def created_at_iso(self, row: int) -> str:
+        """created_at of a row as the ISO string stored in players.json."""
+        text = self._created_text.get(row)
+        if text is not None:
+            return text
+        return (_EPOCH + datetime.timedelta(microseconds=self.created[row])).isoformat()
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Raw record of a row (the history list is the shared one)."""
+        return {
+            "id": self.ids[row],
+            "name": self.names[row],
+            "account_balance": self.balances[row],
+            "created_at": self.created_at_iso(row),
+            "history": self.histories[row],
+        }
+
+    def _append_row(self, record: Dict[str, Any]) -> None:
+        """Appends a record as a new row, without checking for its ID."""
+        self.ids.append(sys.intern(record["id"]))
+        self.names.append(sys.intern(record["name"]))
+        self.balances.append(record["account_balance"])
+        self.created.append(0)
+        self.histories.append(record.get("history", []))
+        self._set_created(len(self.ids) - 1, record.get("created_at"))
+
+    def _row_index(self) -> Dict[str, int]:
+        """ID → row mapping, built on first use."""
+        if self._rows is None:
+            self._rows = {player_id: row for row, player_id in enumerate(self.ids)}
+        return self._rows
+
+    def _set_created(self, row: int, value: Optional[str]) -> None:
+        """Stores created_at as epoch microseconds, or as text if it would not round-trip."""
+        self._created_text.pop(row, None)
+        try:
+            moment = datetime.datetime.fromisoformat(value)
+            if moment.tzinfo is not None or moment.isoformat() != value:
+                raise ValueError(value)
+            self.created[row] = (moment - _EPOCH) // _MICROSECOND
+        except (TypeError, ValueError):
+            self.created[row] = _NO_TIMESTAMP
+            self._created_text[row] = value or ""
@@ -0,0 +1,135 @@
+from typing import Callable, Optional, Tuple
+import atexit
+import gc
+import marshal
+import struct
+import threading
+import time
+
+from pybet.helpers.FileManager import FileManager
+from pybet.models.PlayerIndex import PlayerIndexes
+
+WARM_START_FILE = './pybet/data/warm_start.bin'
+# Bumped whenever the saved layout changes: older files are then ignored
+WARM_START_FORMAT = 1
+# Seconds without changes before the file is rewritten
+WARM_START_DELAY = 2.0
+
+_MAGIC = 'PYBETWS'
+# Length of the marshalled header that follows it
+_HEADER_SIZE = struct.Struct('<I')
+
+
+class WarmStart:
+    """
+    On-disk copy of the PlayerIndexes (parsed records, balances overlaid, and
+    sorted indexes), so a new process gets them with one read of a marshal
+    file instead of parsing every player file and sorting the indexes again.
+
+    The file starts with a small header holding the fingerprint of the data it
+    reflects (DataPersistence._stamp: the player files plus the settlement
+    count), checked before the rest is read: a file that does not match the
+    current data is never used. It is rewritten by a background thread once
+    the indexes stop changing for WARM_START_DELAY seconds (and at exit if a
+    rewrite is pending), so a stale file only costs the usual full load.
+
+    marshal only holds plain data (no classes), so loading a file cannot run
+    code; it is not meant to be read by other Python versions, which simply
+    rebuild it.
+    """
+
+    def __init__(self, path: str = WARM_START_FILE, delay: float = WARM_START_DELAY) -> None:
+        self.path = path
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._capture: Optional[Callable[[], Optional[Tuple[str, tuple]]]] = None
+        self._due = 0.0
+        self._worker: Optional[threading.Thread] = None
+        self._exit_hook = False
+
+    def load(self, fingerprint: str) -> Optional[PlayerIndexes]:
+        """
+        The saved indexes if they reflect `fingerprint`, else None (missing, stale,
+        of another format or damaged).
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                size, = _HEADER_SIZE.unpack(f.read(_HEADER_SIZE.size))
+                if marshal.loads(f.read(size)) != (_MAGIC, WARM_START_FORMAT, fingerprint):
+                    return None
+                # One read: marshal.load() on the file reads it in small pieces
+                body = f.read()
+        except (OSError, EOFError, ValueError, TypeError, struct.error):
+            return None
+        # Millions of new containers would otherwise trigger garbage collections for nothing
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return PlayerIndexes.restore(marshal.loads(body), fingerprint)
+        except (EOFError, ValueError, TypeError):
+            return None
+        finally:
+            if collecting:
+                gc.enable()
+
+    def save(self, fingerprint: str, state: tuple) -> None:
+        """
+        Writes indexes (a PlayerIndexes.state()) reflecting `fingerprint`.
+
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        header = marshal.dumps((_MAGIC, WARM_START_FORMAT, fingerprint))
+        content = _HEADER_SIZE.pack(len(header)) + header + marshal.dumps(state)
+        write_res = FileManager.write_file(self.path, content, mode='w')
+        if not write_res.ok:
+            raise OSError(write_res.error)
+
+    def schedule(self, capture: Callable[[], Optional[Tuple[str, tuple]]]) -> None:
+        """
+        Rewrites the file in the background once no other schedule() call came for
+        `delay` seconds.
+
+        Args:
+            capture (Callable): Returns (fingerprint, PlayerIndexes.state()) of the
+                indexes to save, or None if there is nothing to save; called from
+                the background thread.
+        """
+        with self._lock:
+            self._capture = capture
+            self._due = time.monotonic() + self.delay
+            if not self._exit_hook:
+                atexit.register(self.flush)
+                self._exit_hook = True
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='pybet-warm-start', daemon=True)
+                self._worker.start()
+
+    def flush(self) -> None:
+        """Writes a pending rewrite now (registered to run at exit)."""
+        with self._lock:
+            capture, self._capture = self._capture, None
+        self._write(capture)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                wait = self._due - time.monotonic()
+                if wait <= 0:
+                    capture, self._capture = self._capture, None
+                    self._worker = None
+                    break
+            time.sleep(wait)
+        self._write(capture)
+
+    def _write(self, capture: Optional[Callable[[], Optional[Tuple[str, tuple]]]]) -> None:
+        if capture is None:
+            return
+        captured = capture()
+        if captured is None:
+            return
+        try:
+            self.save(*captured)
+        except OSError:
+            # Only a slower next start: the indexes are built from the player files
+            pass